@@ -0,0 +1,146 @@
+"""
+Annotations module for EyeShield EMR application.
+Simplifies freehand annotation strokes and packs them into a compact binary blob.
+"""
+
+import math
+import struct
+from typing import Optional
+
+
+# Blob layout (all integers unsigned LEB128 varints unless noted):
+#   b"ESA" + version byte
+#   image width, image height, stroke count
+#   per stroke: point count, then x/y as zigzag deltas in 1/QUANTUM pixels
+ANNOTATION_MAGIC = b"ESA"
+ANNOTATION_VERSION = 1
+ANNOTATION_QUANTUM = 4
+# Douglas-Peucker tolerance in source-image pixels
+SIMPLIFY_TOLERANCE = 0.75
+
+
+# ============================================================
+# SIMPLIFICATION
+# ============================================================
+
+def _point_segment_distance(point: tuple, start: tuple, end: tuple) -> float:
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0:
+        return math.hypot(point[0] - start[0], point[1] - start[1])
+    t = max(0.0, min(1.0, ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length_sq))
+    return math.hypot(point[0] - (start[0] + t * dx), point[1] - (start[1] + t * dy))
+
+
+def simplify_stroke(points: list, tolerance: float = SIMPLIFY_TOLERANCE) -> list:
+    """Douglas-Peucker simplification; keeps endpoints and any point farther than ``tolerance``"""
+    if len(points) < 3:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    # Iterative to stay clear of the recursion limit on very long strokes
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, distance = 0, 0.0
+        for index in range(first + 1, last):
+            candidate = _point_segment_distance(points[index], points[first], points[last])
+            if candidate > distance:
+                farthest, distance = index, candidate
+        if distance > tolerance:
+            keep[farthest] = True
+            stack.append((first, farthest))
+            stack.append((farthest, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+# ============================================================
+# BINARY FORMAT
+# ============================================================
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: bytes, offset: int) -> tuple:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated annotation data")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+def encode_annotations(strokes: list, image_size: tuple = (0, 0)) -> Optional[bytes]:
+    """Pack strokes (lists of (x, y) image points) into a blob; None when there is nothing to store"""
+    strokes = [stroke for stroke in strokes if stroke]
+    if not strokes:
+        return None
+
+    out = bytearray(ANNOTATION_MAGIC)
+    out += struct.pack("B", ANNOTATION_VERSION)
+    _write_varint(out, int(image_size[0]))
+    _write_varint(out, int(image_size[1]))
+    _write_varint(out, len(strokes))
+    for stroke in strokes:
+        _write_varint(out, len(stroke))
+        last_x = last_y = 0
+        for x, y in stroke:
+            qx = int(round(x * ANNOTATION_QUANTUM))
+            qy = int(round(y * ANNOTATION_QUANTUM))
+            _write_varint(out, _zigzag(qx - last_x))
+            _write_varint(out, _zigzag(qy - last_y))
+            last_x, last_y = qx, qy
+    return bytes(out)
+
+
+def decode_annotations(blob: Optional[bytes]) -> tuple:
+    """Return (strokes, (image width, image height)) from a blob written by encode_annotations"""
+    if not blob:
+        return [], (0, 0)
+    blob = bytes(blob)
+    if blob[:3] != ANNOTATION_MAGIC:
+        raise ValueError("Not an annotation blob")
+    if blob[3] != ANNOTATION_VERSION:
+        raise ValueError(f"Unsupported annotation version {blob[3]}")
+
+    offset = 4
+    width, offset = _read_varint(blob, offset)
+    height, offset = _read_varint(blob, offset)
+    count, offset = _read_varint(blob, offset)
+    strokes = []
+    for _ in range(count):
+        points, offset = _read_varint(blob, offset)
+        stroke = []
+        x = y = 0
+        for _ in range(points):
+            dx, offset = _read_varint(blob, offset)
+            dy, offset = _read_varint(blob, offset)
+            x += _unzigzag(dx)
+            y += _unzigzag(dy)
+            stroke.append((x / ANNOTATION_QUANTUM, y / ANNOTATION_QUANTUM))
+        strokes.append(stroke)
+    return strokes, (width, height)
@@ -0,0 +1,224 @@
+"""
+Audit module for EyeShield EMR application.
+Queues user and record actions in memory and appends them to audit_log in batched transactions.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional
+
+from auth import DatabaseConnection
+from migrations import AUDIT_LOG_TABLE
+
+# A batch is written when this many events are queued or the interval elapses
+AUDIT_FLUSH_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL_MS = 250
+# Events kept in memory while the database is unavailable; older ones are dropped first
+AUDIT_MAX_PENDING = 10000
+AUDIT_PAGE_SIZE = 200
+
+# action -> label shown in the audit log filter
+AUDIT_ACTIONS = {
+    "auth.login": "Signed in",
+    "auth.login_failed": "Sign-in failed",
+    "user.create": "User created",
+    "user.delete": "User deleted",
+    "user.role": "Role changed",
+    "user.password_reset": "Password reset",
+    "record.create": "Screening saved",
+    "record.import": "Batch screenings saved",
+    "record.view_image": "Image viewed",
+    "record.archive": "Record archived",
+    "record.restore": "Record restored",
+    "record.delete": "Record deleted",
+    "record.export": "Records exported",
+}
+
+AUDIT_FIELDS = ("id", "logged_at", "username", "action", "target_type", "target_id", "detail")
+
+
+def current_username() -> str:
+    return os.environ.get("EYESHIELD_CURRENT_USER", "")
+
+
+# ============================================================
+# BATCHED WRITER
+# ============================================================
+
+class AuditLogWriter:
+    """Append-only audit trail with an asynchronous, batched writer.
+
+    ``record`` stamps the event and appends it to an in-memory queue, so the
+    calling path pays for a lock and a list append only. A daemon thread
+    writes the queue in one transaction every ``AUDIT_FLUSH_INTERVAL_MS``, or
+    sooner once ``AUDIT_FLUSH_BATCH_SIZE`` events are waiting. A failed
+    write keeps the batch for the next attempt; ``stop`` writes whatever is
+    left before the application exits.
+    """
+
+    def __init__(self, batch_size: int = AUDIT_FLUSH_BATCH_SIZE, interval_ms: int = AUDIT_FLUSH_INTERVAL_MS):
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self.written = 0
+        self.dropped = 0
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        action: str,
+        target_type: str = "",
+        target_id="",
+        detail: str = "",
+        username: Optional[str] = None,
+    ) -> None:
+        """Queue one event; never touches the database on the calling thread"""
+        event = (
+            datetime.now().isoformat(" ", "milliseconds"),
+            username if username is not None else current_username(),
+            action,
+            target_type,
+            "" if target_id is None else str(target_id),
+            detail or "",
+        )
+        with self._lock:
+            self._pending.append(event)
+            queued = len(self._pending)
+            if queued > AUDIT_MAX_PENDING:
+                del self._pending[0]
+                self.dropped += 1
+        if queued >= self.batch_size:
+            self._wake.set()
+        if self._thread is None:
+            self.start()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="EyeShieldAudit", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the writer thread after it has written every queued event"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> int:
+        """Write every queued event in one transaction; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                with DatabaseConnection.transaction() as conn:
+                    conn.executemany(
+                        f"INSERT INTO {AUDIT_LOG_TABLE} "
+                        "(logged_at, username, action, target_type, target_id, detail) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+            except sqlite3.Error as err:
+                with self._lock:
+                    # Keep order: the failed batch goes back ahead of newer events
+                    self._pending[:0] = batch
+                    overflow = len(self._pending) - AUDIT_MAX_PENDING
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.dropped += overflow
+                print(f"[EyeShield] Audit log write deferred: {err}")
+                return 0
+            self.written += len(batch)
+            return len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_ms / 1000)
+            self._wake.clear()
+            self.flush()
+
+
+audit_log = AuditLogWriter()
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def audit_source(
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> tuple:
+    """FROM/WHERE SQL and parameters for audit_log rows matching the filters.
+
+    ``since`` is inclusive and ``until`` exclusive; both compare against the
+    ``YYYY-MM-DD HH:MM:SS`` text in logged_at, so a bare date works too.
+    """
+    clauses = []
+    params = []
+    if username:
+        clauses.append("username = ?")
+        params.append(username)
+    if action:
+        clauses.append("action = ?")
+        params.append(action)
+    if since:
+        clauses.append("logged_at >= ?")
+        params.append(since)
+    if until:
+        clauses.append("logged_at < ?")
+        params.append(until)
+    return f"{AUDIT_LOG_TABLE} WHERE {' AND '.join(clauses) or '1'}", params
+
+
+def query_audit_log(
+    username: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    before_id: Optional[int] = None,
+    limit: int = AUDIT_PAGE_SIZE,
+) -> list:
+    """One page of matching events, newest first; pass the last id seen as ``before_id``.
+
+    Queued events are written first so the page includes actions taken a
+    moment ago. Call from a worker thread.
+    """
+    audit_log.flush()
+    source, params = audit_source(username, action, since, until)
+    if before_id is not None:
+        source += " AND id < ?"
+        params.append(before_id)
+    with DatabaseConnection.connection() as conn:
+        return conn.execute(
+            f"SELECT {', '.join(AUDIT_FIELDS)} FROM {source} ORDER BY id DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+
+
+def audit_usernames() -> list:
+    """Distinct usernames present in the audit log, for filter lists"""
+    audit_log.flush()
+    with DatabaseConnection.connection() as conn:
+        rows = conn.execute(
+            f"SELECT DISTINCT username FROM {AUDIT_LOG_TABLE} WHERE username != '' ORDER BY username"
+        ).fetchall()
+    return [row[0] for row in rows]
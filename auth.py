@@ -3,15 +3,20 @@ Authentication module for EyeShield EMR application.
 Handles user database, login verification, and user management.
 """
 
+import concurrent.futures
 import contextlib
 import sqlite3
 import hashlib
 import hmac
+import itertools
 import os
 import json
 import re
 import secrets
-from typing import Optional
+import threading
+from typing import Iterator, Optional
+
+from migrations import apply_migrations
 
 DB_FILE = "users.db"
 VALID_ROLES = {"clinician", "admin", "viewer"}
@@ -25,12 +30,175 @@ USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{3,32}$")
 # ============================================================
 
 class DatabaseConnection:
-    """Manages database connections"""
-    
+    """Manages a bounded pool of configured SQLite connections.
+
+    Each thread checks out at most one connection at a time; nested
+    ``connection()`` blocks on the same thread reuse it. Connections are
+    returned to the pool when the outermost block exits, so the schema
+    cache and prepared statements survive between queries. A nested
+    ``transaction()`` runs in a SAVEPOINT, so only the outermost one commits.
+    """
+
+    MAX_POOL_SIZE = 8
+    CHECKOUT_TIMEOUT_SECONDS = 10.0
+    STATEMENT_CACHE_SIZE = 256
+    PRAGMAS = (
+        ("busy_timeout", "5000"),
+        ("foreign_keys", "ON"),
+    )
+
+    _condition = threading.Condition(threading.Lock())
+    _idle: list[sqlite3.Connection] = []
+    _open_count = 0
+    _local = threading.local()
+    _extra_pragmas: tuple = ()
+    _generation = 0
+    _connection_generation: dict[int, int] = {}
+    _savepoint_ids = itertools.count(1)
+
+    @classmethod
+    def open_connection(cls) -> sqlite3.Connection:
+        """Open a new, fully configured connection owned by the caller"""
+        conn = sqlite3.connect(
+            DB_FILE,
+            check_same_thread=False,
+            cached_statements=cls.STATEMENT_CACHE_SIZE,
+        )
+        cur = conn.cursor()
+        for name, value in cls.PRAGMAS + cls._extra_pragmas:
+            cur.execute(f"PRAGMA {name} = {value}")
+        cur.close()
+        return conn
+
+    @classmethod
+    def set_pragmas(cls, pragmas: tuple) -> None:
+        """Replace the storage PRAGMAs applied to every pooled connection.
+
+        Idle connections are closed immediately; connections currently in use
+        are closed when they are returned, so every later checkout sees the
+        new settings.
+        """
+        with cls._condition:
+            cls._extra_pragmas = tuple(pragmas)
+            cls._generation += 1
+            idle, cls._idle = cls._idle, []
+            cls._open_count -= len(idle)
+            cls._condition.notify_all()
+            for conn in idle:
+                cls._connection_generation.pop(id(conn), None)
+        for conn in idle:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
+
     @staticmethod
     def get_connection() -> sqlite3.Connection:
-        """Get a database connection"""
-        return sqlite3.connect(DB_FILE)
+        """Get a standalone database connection (caller must close it)"""
+        return DatabaseConnection.open_connection()
+
+    @classmethod
+    def _checkout(cls) -> sqlite3.Connection:
+        with cls._condition:
+            while True:
+                if cls._idle:
+                    return cls._idle.pop()
+                if cls._open_count < cls.MAX_POOL_SIZE:
+                    cls._open_count += 1
+                    # Taken before opening: a set_pragmas call while the connection
+                    # opens makes it stale, and it is closed on checkin
+                    generation = cls._generation
+                    break
+                if not cls._condition.wait(cls.CHECKOUT_TIMEOUT_SECONDS):
+                    raise sqlite3.OperationalError("Timed out waiting for a pooled database connection")
+
+        try:
+            conn = cls.open_connection()
+        except sqlite3.Error:
+            with cls._condition:
+                cls._open_count -= 1
+                cls._condition.notify()
+            raise
+        with cls._condition:
+            cls._connection_generation[id(conn)] = generation
+        return conn
+
+    @classmethod
+    def _checkin(cls, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            with contextlib.suppress(sqlite3.Error):
+                conn.rollback()
+        with cls._condition:
+            stale = cls._connection_generation.get(id(conn)) != cls._generation
+            if stale:
+                cls._open_count -= 1
+                cls._connection_generation.pop(id(conn), None)
+            else:
+                cls._idle.append(conn)
+            cls._condition.notify()
+        if stale:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
+
+    @classmethod
+    @contextlib.contextmanager
+    def connection(cls) -> Iterator[sqlite3.Connection]:
+        """Borrow this thread's pooled connection for the duration of the block"""
+        local = cls._local
+        conn = getattr(local, "conn", None)
+        if conn is not None:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+
+        conn = cls._checkout()
+        local.conn = conn
+        local.depth = 1
+        try:
+            yield conn
+        finally:
+            local.depth = 0
+            local.conn = None
+            cls._checkin(conn)
+
+    @classmethod
+    @contextlib.contextmanager
+    def transaction(cls) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection and commit (or roll back) when the block exits.
+
+        Inside an open transaction on the same thread the block becomes a
+        SAVEPOINT: an error rolls back only the block, and the outer caller
+        still decides whether everything commits.
+        """
+        with cls.connection() as conn:
+            if not conn.in_transaction:
+                with conn:
+                    conn.execute("BEGIN")
+                    yield conn
+                return
+
+            name = f"nested_{next(cls._savepoint_ids)}"
+            conn.execute(f"SAVEPOINT {name}")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+                raise
+            conn.execute(f"RELEASE {name}")
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close every idle pooled connection (call on application shutdown)"""
+        with cls._condition:
+            idle, cls._idle = cls._idle, []
+            cls._open_count -= len(idle)
+            for conn in idle:
+                cls._connection_generation.pop(id(conn), None)
+        for conn in idle:
+            with contextlib.suppress(sqlite3.Error):
+                conn.close()
 
 
 def get_connection() -> sqlite3.Connection:
@@ -64,6 +232,16 @@ class PasswordManager:
             f"{salt.hex()}${digest.hex()}"
         )
 
+    @staticmethod
+    def hash_passwords(passwords: list, max_workers: Optional[int] = None) -> list:
+        """Hash many passwords in parallel; pbkdf2_hmac releases the GIL, so threads use every core"""
+        passwords = list(passwords)
+        if len(passwords) < 2:
+            return [PasswordManager.hash_password(password) for password in passwords]
+        workers = max_workers or min(len(passwords), os.cpu_count() or 2)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="EyeShieldHash") as pool:
+            return list(pool.map(PasswordManager.hash_password, passwords))
+
     @staticmethod
     def needs_upgrade(password_hash: str) -> bool:
         return not password_hash.startswith(f"{PasswordManager._ALGO}$")
@@ -118,79 +296,25 @@ def hash_password(password: str) -> str:
 class UserManager:
     """Manages user database operations"""
 
-    _PATIENT_RECORD_COLUMNS = {
-        "archived_at": "TEXT",
-        "archived_by": "TEXT",
-        "archive_reason": "TEXT",
-    }
-    
     def __init__(self):
-        self.conn = self._init_db()
+        self._init_db()
     
     @staticmethod
-    def _init_db() -> sqlite3.Connection:
+    def _init_db() -> None:
         """Initialize the database"""
         first_run = not os.path.exists(DB_FILE)
 
-        conn = get_connection()
-        cur = conn.cursor()
-        # Users table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL
-            )
-        """)
-
-        # Patient records table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS patient_records (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id TEXT,
-                name TEXT,
-                birthdate TEXT,
-                age TEXT,
-                sex TEXT,
-                contact TEXT,
-                eyes TEXT,
-                diabetes_type TEXT,
-                duration TEXT,
-                hba1c TEXT,
-                prev_treatment TEXT,
-                notes TEXT,
-                result TEXT,
-                confidence TEXT,
-                archived_at TEXT,
-                archived_by TEXT,
-                archive_reason TEXT
-            )
-        """)
-
-        UserManager._ensure_patient_record_columns(conn)
+        with DatabaseConnection.connection() as conn:
+            UserManager._create_schema(conn, first_run)
 
-        conn.commit()
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection, first_run: bool) -> None:
+        """Migrate the schema and seed initial accounts on the given connection."""
+        apply_migrations(conn)
 
         UserManager._migrate_users_json(conn)
         UserManager._ensure_admin_user(conn, first_run)
 
-        return conn
-
-    @staticmethod
-    def _ensure_patient_record_columns(conn: sqlite3.Connection) -> None:
-        """Add archive-related columns for existing patient_records tables."""
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(patient_records)")
-        existing_columns = {row[1] for row in cur.fetchall()}
-
-        for column_name, column_type in UserManager._PATIENT_RECORD_COLUMNS.items():
-            if column_name in existing_columns:
-                continue
-            cur.execute(
-                f"ALTER TABLE patient_records ADD COLUMN {column_name} {column_type}"
-            )
-
     @staticmethod
     def _migrate_users_json(conn: sqlite3.Connection) -> None:
         """Migrate legacy JSON users into SQLite (one-time safe import)."""
@@ -208,28 +332,29 @@ class UserManager:
             return
 
         cur = conn.cursor()
+        pending = {}
         for user in users:
             if not isinstance(user, dict):
                 continue
             username = str(user.get("username", "")).strip()
             raw_password = str(user.get("password", ""))
             role = str(user.get("role", "clinician") or "clinician")
-            if not username or not raw_password:
+            if not username or not raw_password or username in pending:
                 continue
 
             cur.execute("SELECT 1 FROM users WHERE username = ?", (username,))
             if cur.fetchone():
                 continue
+            pending[username] = (raw_password, role)
 
-            if raw_password.startswith("sha256:"):
-                password_hash = raw_password
-            else:
-                password_hash = PasswordManager.hash_password(raw_password)
+        # Plain-text legacy passwords are hashed together across all cores.
+        plain = [username for username, (raw, _) in pending.items() if not raw.startswith("sha256:")]
+        hashed = dict(zip(plain, PasswordManager.hash_passwords([pending[name][0] for name in plain])))
 
-            cur.execute(
-                "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                (username, password_hash, role),
-            )
+        cur.executemany(
+            "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            [(username, hashed.get(username, raw), role) for username, (raw, role) in pending.items()],
+        )
         conn.commit()
 
     @staticmethod
@@ -346,26 +471,24 @@ class UserManager:
         if not UserManager._can_manage_users(acting_role):
             return False
         
-        conn = get_connection()
-        cur = conn.cursor()
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
+
+            if not UserManager._verify_admin_actor(conn, acting_username, acting_role, acting_password):
+                return False
+
+            pw_hash = PasswordManager.hash_password(password)
+
+            try:
+                cur.execute(
+                    "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+                    (username, pw_hash, normalized_role)
+                )
+                conn.commit()
+                success = True
+            except sqlite3.IntegrityError:
+                success = False
 
-        if not UserManager._verify_admin_actor(conn, acting_username, acting_role, acting_password):
-            conn.close()
-            return False
-        
-        pw_hash = PasswordManager.hash_password(password)
-        
-        try:
-            cur.execute(
-                "INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)",
-                (username, pw_hash, normalized_role)
-            )
-            conn.commit()
-            success = True
-        except sqlite3.IntegrityError:
-            success = False
-        
-        conn.close()
         return success
     
     @staticmethod
@@ -374,20 +497,21 @@ class UserManager:
         if not username or not password:
             return None
         
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT id, password_hash, role FROM users WHERE username = ?", (username,))
-        
-        row = cur.fetchone()
-        
-        if not row:
-            conn.close()
-            return None
-        
-        user_id, pw_hash, role = row
-        
-        if PasswordManager.verify_password(password, pw_hash):
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
+
+            cur.execute("SELECT id, password_hash, role FROM users WHERE username = ?", (username,))
+
+            row = cur.fetchone()
+
+            if not row:
+                return None
+
+            user_id, pw_hash, role = row
+
+            if not PasswordManager.verify_password(password, pw_hash):
+                return None
+
             if PasswordManager.needs_upgrade(pw_hash):
                 with contextlib.suppress(sqlite3.Error):
                     upgraded_hash = PasswordManager.hash_password(password)
@@ -396,22 +520,16 @@ class UserManager:
                         (upgraded_hash, user_id),
                     )
                     conn.commit()
-            conn.close()
             return role
-
-        conn.close()
-        return None
     
     @staticmethod
     def get_all_users() -> list[tuple]:
         """Get all users"""
-        conn = get_connection()
-        cur = conn.cursor()
-        
-        cur.execute("SELECT username, role FROM users")
-        users = cur.fetchall()
-        
-        conn.close()
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT username, role FROM users")
+            users = cur.fetchall()
+
         return users
     
     @staticmethod
@@ -430,33 +548,29 @@ class UserManager:
         if not UserManager._can_manage_users(acting_role):
             return False
         
-        conn = get_connection()
-        cur = conn.cursor()
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
 
-        current_role = UserManager._get_user_role(conn, username)
-        if current_role is None:
-            conn.close()
-            return False
+            current_role = UserManager._get_user_role(conn, username)
+            if current_role is None:
+                return False
 
-        if current_role == normalized_role:
-            conn.close()
-            return True
+            if current_role == normalized_role:
+                return True
+
+            if current_role == ADMIN_ROLE and normalized_role != ADMIN_ROLE and UserManager._count_admins(conn) <= 1:
+                return False
+
+            try:
+                cur.execute(
+                    "UPDATE users SET role = ? WHERE username = ?",
+                    (normalized_role, username)
+                )
+                conn.commit()
+                success = cur.rowcount > 0
+            except sqlite3.Error:
+                success = False
 
-        if current_role == ADMIN_ROLE and normalized_role != ADMIN_ROLE and UserManager._count_admins(conn) <= 1:
-            conn.close()
-            return False
-        
-        try:
-            cur.execute(
-                "UPDATE users SET role = ? WHERE username = ?",
-                (normalized_role, username)
-            )
-            conn.commit()
-            success = cur.rowcount > 0
-        except sqlite3.Error:
-            success = False
-        
-        conn.close()
         return success
     
     @staticmethod
@@ -470,26 +584,23 @@ class UserManager:
         if not username or not UserManager._can_manage_users(acting_role):
             return False
 
-        conn = get_connection()
-        cur = conn.cursor()
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
 
-        role = UserManager._get_user_role(conn, username)
-        if role is None:
-            conn.close()
-            return False
+            role = UserManager._get_user_role(conn, username)
+            if role is None:
+                return False
+
+            if role == ADMIN_ROLE and UserManager._count_admins(conn) <= 1:
+                return False
+
+            try:
+                cur.execute("DELETE FROM users WHERE username = ?", (username,))
+                conn.commit()
+                success = cur.rowcount > 0
+            except sqlite3.Error:
+                success = False
 
-        if role == ADMIN_ROLE and UserManager._count_admins(conn) <= 1:
-            conn.close()
-            return False
-        
-        try:
-            cur.execute("DELETE FROM users WHERE username = ?", (username,))
-            conn.commit()
-            success = cur.rowcount > 0
-        except sqlite3.Error:
-            success = False
-        
-        conn.close()
         return success
 
     @staticmethod
@@ -508,22 +619,20 @@ class UserManager:
         if not UserManager._is_valid_password(new_password):
             return False
 
-        conn = get_connection()
-        cur = conn.cursor()
-
         pw_hash = PasswordManager.hash_password(new_password)
 
-        try:
-            cur.execute(
-                "UPDATE users SET password_hash = ? WHERE username = ?",
-                (pw_hash, username),
-            )
-            conn.commit()
-            success = cur.rowcount > 0
-        except sqlite3.Error:
-            success = False
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(
+                    "UPDATE users SET password_hash = ? WHERE username = ?",
+                    (pw_hash, username),
+                )
+                conn.commit()
+                success = cur.rowcount > 0
+            except sqlite3.Error:
+                success = False
 
-        conn.close()
         return success
 
 
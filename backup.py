@@ -0,0 +1,328 @@
+"""
+Backup module for EyeShield EMR application.
+Takes online snapshots of users.db with the SQLite backup API while the app keeps saving.
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject
+
+from auth import DB_FILE, DatabaseConnection
+from db_executor import TaskExecutor
+from maintenance import last_logged_run, record_step
+
+
+BACKUP_DIR = os.environ.get(
+    "EYESHIELD_BACKUP_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(DB_FILE)), "backups"),
+)
+# Pages copied per backup step (16 MiB at 4 KiB pages); the source is read-locked
+# only for one step, which under WAL never blocks saves
+BACKUP_STEP_PAGES = 4096
+# Pause between steps so page copying never saturates the disk
+BACKUP_STEP_PAUSE = 0.002
+# A write from another connection restarts an incremental backup; after this
+# many restarts the copy is taken in one step from a single read snapshot
+MAX_BACKUP_RESTARTS = 2
+COMPRESS_CHUNK_SIZE = 1024 * 1024
+SNAPSHOT_PREFIX = os.path.splitext(os.path.basename(DB_FILE))[0] + "-"
+SNAPSHOT_EXTENSIONS = (".db", ".db.gz")
+POLL_SECONDS = 60
+
+
+class BackupCancelled(Exception):
+    """Raised from the backup progress callback to abandon a snapshot"""
+
+
+class _BackupRestarted(Exception):
+    pass
+
+
+# ============================================================
+# SNAPSHOTS
+# ============================================================
+
+def list_snapshots(directory: str = BACKUP_DIR) -> list:
+    """Snapshot file paths in ``directory``, newest first"""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    snapshots = [
+        name for name in names
+        if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_EXTENSIONS)
+    ]
+    # Timestamped names sort chronologically
+    return [os.path.join(directory, name) for name in sorted(snapshots, reverse=True)]
+
+
+def verify_snapshot(path: str) -> str:
+    """Run integrity_check on an uncompressed snapshot; returns "ok" or the problems found"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = [row[0] for row in conn.execute("PRAGMA integrity_check(20)").fetchall()]
+        # Touch the main table so a snapshot missing it fails here, not at restore time
+        conn.execute("SELECT COUNT(*) FROM patient_records").fetchone()
+    except sqlite3.Error as err:
+        return str(err)
+    finally:
+        conn.close()
+    return "ok" if rows == ["ok"] else "; ".join(rows)
+
+
+def _compress(source_path: str, target_path: str) -> None:
+    with open(source_path, "rb") as source, gzip.open(target_path, "wb", compresslevel=6) as target:
+        shutil.copyfileobj(source, target, COMPRESS_CHUNK_SIZE)
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class BackupScheduler:
+    """Writes verified, timestamped snapshots of the database on a background thread.
+
+    The live database is copied with ``sqlite3.Connection.backup`` in
+    ``BACKUP_STEP_PAGES`` batches, so saves elsewhere in the app carry on
+    between steps. The copy lands in a temporary file, passes
+    integrity_check, is optionally gzip-compressed and only then renamed to
+    ``users-YYYYMMDD-HHMMSS.db[.gz]``; the oldest snapshots beyond ``keep``
+    are removed. Each run is recorded in maintenance_log as step "backup".
+    """
+
+    def __init__(self, directory: str = BACKUP_DIR, interval_hours: int = 24, keep: int = 7, compress: bool = True):
+        self.directory = directory
+        self.interval_hours = interval_hours
+        self.keep = keep
+        self.compress = compress
+        self.last_result: Optional[dict] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, interval_hours: Optional[int] = None, keep: Optional[int] = None, compress: Optional[bool] = None) -> None:
+        if interval_hours is not None:
+            self.interval_hours = max(0, int(interval_hours))
+        if keep is not None:
+            self.keep = max(1, int(keep))
+        if compress is not None:
+            self.compress = bool(compress)
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="EyeShieldBackup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the scheduler; a snapshot in progress is abandoned at its next step"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(POLL_SECONDS):
+            if not self.is_due():
+                continue
+            try:
+                self.run_now()
+            except BackupCancelled:
+                return
+            except (OSError, sqlite3.Error) as err:
+                print(f"[EyeShield] Backup failed: {err}")
+                # Wait a full interval rather than retrying a failing disk every minute
+                self.last_result = {"ok": False, "error": str(err), "finished_at": time.strftime("%H:%M:%S")}
+                self._stop.wait(self.interval_hours * 3600)
+
+    def is_due(self) -> bool:
+        """True when scheduled backups are on and the last one is older than the interval"""
+        if not self.interval_hours:
+            return False
+        last = last_logged_run("backup")
+        return last is None or datetime.now() - last >= timedelta(hours=self.interval_hours)
+
+    # ---------- snapshot ----------
+
+    def run_now(self, progress: Optional[Callable[[int, int], None]] = None) -> dict:
+        """Take, verify and rotate one snapshot; returns its path, size and throughput.
+
+        ``progress`` receives (pages copied, total pages) after each step.
+        Raises BackupCancelled if the scheduler is stopped mid-copy.
+        """
+        with self._run_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".backup-", suffix=".db")
+            os.close(fd)
+            compressed_path = temp_path + ".gz"
+            try:
+                started = time.perf_counter()
+                source = DatabaseConnection.open_connection()
+                try:
+                    copy_ms, longest_step_ms, pages, restarts = self._copy(source, temp_path, progress)
+                    page_size = source.execute("PRAGMA page_size").fetchone()[0]
+
+                    check_started = time.perf_counter()
+                    verdict = verify_snapshot(temp_path)
+                    verify_ms = (time.perf_counter() - check_started) * 1000
+                    if verdict != "ok":
+                        record_step(source, "backup", (time.perf_counter() - started) * 1000, longest_step_ms, f"failed verification: {verdict}")
+                        raise sqlite3.DatabaseError(f"snapshot failed verification: {verdict}")
+
+                    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+                    if self.compress:
+                        _compress(temp_path, compressed_path)
+                        final_path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{stamp}.db.gz")
+                        os.replace(compressed_path, final_path)
+                    else:
+                        final_path = os.path.join(self.directory, f"{SNAPSHOT_PREFIX}{stamp}.db")
+                        os.replace(temp_path, final_path)
+                    removed = self._rotate()
+
+                    duration_ms = (time.perf_counter() - started) * 1000
+                    db_bytes = pages * page_size
+                    mib_per_second = db_bytes / (1024 * 1024) / max(copy_ms / 1000, 0.001)
+                    result = record_step(
+                        source,
+                        "backup",
+                        duration_ms,
+                        longest_step_ms,
+                        f"ok; {os.path.basename(final_path)}; {mib_per_second:.1f} MiB/s; restarts {restarts}",
+                    )
+                finally:
+                    source.close()
+            finally:
+                for path in (temp_path, temp_path + "-wal", temp_path + "-shm", compressed_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+            result.update({
+                "ok": True,
+                "path": final_path,
+                "file_bytes": os.path.getsize(final_path),
+                "copied_bytes": db_bytes,
+                "copy_ms": round(copy_ms, 2),
+                "verify_ms": round(verify_ms, 2),
+                "mib_per_second": round(mib_per_second, 1),
+                "restarts": restarts,
+                "removed": removed,
+                "finished_at": time.strftime("%H:%M:%S"),
+            })
+            self.last_result = result
+            return result
+
+    def _copy(self, source: sqlite3.Connection, temp_path: str, progress: Optional[Callable[[int, int], None]]) -> tuple:
+        """Copy the live database into ``temp_path``; returns (ms, longest step ms, pages, restarts)"""
+        longest_step_ms = 0.0
+        restarts = 0
+        started = time.perf_counter()
+        while True:
+            copied = [-1]
+            step_started = [time.perf_counter()]
+
+            def on_step(_status, remaining, total):
+                nonlocal longest_step_ms
+                longest_step_ms = max(longest_step_ms, (time.perf_counter() - step_started[0]) * 1000)
+                if self._stop.is_set():
+                    raise BackupCancelled()
+                done = total - remaining
+                if done < copied[0]:
+                    # Another connection wrote to the database; SQLite starts the copy over
+                    raise _BackupRestarted()
+                copied[0] = done
+                if progress is not None:
+                    progress(done, total)
+                time.sleep(BACKUP_STEP_PAUSE)
+                step_started[0] = time.perf_counter()
+
+            target = sqlite3.connect(temp_path)
+            try:
+                if restarts < MAX_BACKUP_RESTARTS:
+                    source.backup(target, pages=BACKUP_STEP_PAGES, progress=on_step)
+                else:
+                    # One step from one read snapshot; under WAL this still does not block saves
+                    source.backup(target, pages=-1, progress=on_step)
+                # The copy inherits WAL mode; a snapshot should be one self-contained file
+                target.execute("PRAGMA journal_mode = DELETE")
+                pages = target.execute("PRAGMA page_count").fetchone()[0]
+                return (time.perf_counter() - started) * 1000, longest_step_ms, pages, restarts
+            except _BackupRestarted:
+                restarts += 1
+            finally:
+                target.close()
+
+    def _rotate(self) -> list:
+        removed = []
+        for path in list_snapshots(self.directory)[self.keep:]:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError as err:
+                print(f"[EyeShield] Could not remove old backup {path}: {err}")
+        return removed
+
+
+backup_scheduler = BackupScheduler()
+
+
+class BackupRunner(TaskExecutor):
+    """Runs on-demand backups off the GUI thread"""
+
+    MAX_THREADS = 1
+
+    def back_up_now(
+        self,
+        on_result: Optional[Callable[[dict], None]] = None,
+        on_error: Optional[Callable] = None,
+        context: Optional[QObject] = None,
+    ):
+        return self.submit(backup_scheduler.run_now, on_result=on_result, on_error=on_error, key="backup", context=context)
+
+
+backup_runner = BackupRunner()
+
+
+def format_backup_result(result: Optional[dict]) -> str:
+    if not result:
+        return "No backup taken this session"
+    if not result.get("ok"):
+        return f"Last backup failed at {result.get('finished_at', '?')}: {result.get('error', 'unknown error')}"
+    return (
+        f"Last backup at {result['finished_at']}: {os.path.basename(result['path'])}, "
+        f"{result['file_bytes'] // 1024:,} KiB in {result['duration_ms'] / 1000:.1f} s "
+        f"({result['mib_per_second']} MiB/s copy)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Take or list EyeShield database backups.")
+    parser.add_argument("--run", action="store_true", help="take a snapshot now")
+    parser.add_argument("--keep", type=int, default=None, help="snapshots to keep (default: saved setting)")
+    parser.add_argument("--no-compress", action="store_true", help="store the snapshot uncompressed")
+    args = parser.parse_args()
+
+    from auth import UserManager
+    from storage import StorageConfig
+    UserManager._init_db()
+    StorageConfig.apply()
+    backup_scheduler.configure(keep=args.keep, compress=False if args.no_compress else None)
+
+    if args.run:
+        print(f"[EyeShield] {format_backup_result(backup_scheduler.run_now())}")
+    for path in list_snapshots(backup_scheduler.directory):
+        print(f"{os.path.getsize(path) / (1024 * 1024):>10,.1f} MiB  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
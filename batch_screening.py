@@ -0,0 +1,426 @@
+"""
+Batch screening module for EyeShield EMR application.
+Grades a folder or manifest of fundus images in parallel and saves the results in one transaction.
+"""
+
+import concurrent.futures
+import csv
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import (
+    QDialog, QFileDialog, QHBoxLayout, QLabel, QMessageBox, QProgressBar,
+    QPushButton, QVBoxLayout,
+)
+
+from audit import audit_log
+from data_changes import data_changes
+from image_store import image_store
+from inference import inference_service
+from migrations import numeric_value
+from preprocessing import preprocess_in_worker
+from record_repository import record_repository
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MICRO_BATCH_SIZE = 16
+BATCH_COLUMNS = ("patient_id", "name", "eyes", "notes", "result", "confidence", "confidence_value", "image_ref")
+# Manifest headers accepted for each field, first match wins
+MANIFEST_COLUMNS = {
+    "image": ("image", "image_path", "file", "filename", "path"),
+    "patient_id": ("patient_id", "patient id", "id"),
+    "name": ("name", "patient_name", "patient name"),
+    "eye": ("eye", "eyes", "laterality"),
+}
+
+
+# ============================================================
+# INPUT COLLECTION
+# ============================================================
+
+class BatchItem:
+    """One image to grade, with optional patient details from a manifest"""
+
+    def __init__(self, image_path: str, patient_id: str = "", name: str = "", eye: str = ""):
+        self.image_path = image_path
+        self.patient_id = patient_id
+        self.name = name
+        self.eye = eye
+
+
+def collect_directory(directory: str) -> list:
+    """Every supported image directly inside ``directory``, sorted by file name"""
+    items = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name.lower()):
+        if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+            items.append(BatchItem(entry.path))
+    return items
+
+
+def read_manifest(manifest_path: str) -> list:
+    """Read a CSV mapping images to patients; relative image paths resolve against the CSV"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, newline="", encoding="utf-8-sig") as handle:
+        reader = csv.DictReader(handle)
+        headers = {(h or "").strip().lower(): h for h in reader.fieldnames or ()}
+        columns = {
+            field: next((headers[a] for a in aliases if a in headers), None)
+            for field, aliases in MANIFEST_COLUMNS.items()
+        }
+        if columns["image"] is None:
+            raise ValueError("Manifest needs an 'image' column")
+
+        items = []
+        for row in reader:
+            def value(field):
+                column = columns[field]
+                return (row.get(column) or "").strip() if column else ""
+
+            image = value("image")
+            if not image:
+                continue
+            items.append(BatchItem(
+                os.path.join(base_dir, image),
+                patient_id=value("patient_id"),
+                name=value("name"),
+                eye=value("eye"),
+            ))
+    return items
+
+
+# ============================================================
+# BATCH JOB
+# ============================================================
+
+class BatchScreeningJob:
+    """Preprocess in a process pool, infer in micro-batches, then insert everything at once.
+
+    Nothing is written unless the whole batch finishes; a cancelled job leaves
+    patient_records untouched.
+    """
+
+    def __init__(
+        self,
+        items: list,
+        progress: Optional[Callable[[int, int, float], None]] = None,
+        micro_batch_size: int = MICRO_BATCH_SIZE,
+        workers: Optional[int] = None,
+    ):
+        self.items = items
+        self.progress = progress
+        self.micro_batch_size = micro_batch_size
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> dict:
+        summary = {
+            "total": len(self.items),
+            "graded": 0,
+            "failed": [],
+            "saved": 0,
+            # (image path, manifest patient ID, ID saved instead) for IDs already on file
+            "reassigned": [],
+            "cancelled": False,
+            "elapsed": 0.0,
+            "images_per_second": 0.0,
+            "error": "",
+        }
+        engine = inference_service.load_engine()
+        if engine is None:
+            summary["error"] = f"Automated grading unavailable: {inference_service.load_error}"
+            return summary
+
+        started = time.perf_counter()
+        rows = []
+        batch = []
+        done = 0
+
+        def report():
+            elapsed = time.perf_counter() - started
+            if self.progress is not None:
+                self.progress(done, len(self.items), done / elapsed if elapsed else 0.0)
+
+        def flush():
+            nonlocal done
+            if batch:
+                results = engine.predict_batch([tensor for _, tensor in batch])
+                rows.extend((item, result) for (item, _), result in zip(batch, results))
+                done += len(batch)
+                batch.clear()
+            report()
+
+        # spawn: forking a process that is running Qt threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            # Bounded look-ahead keeps memory flat for very large folders
+            window = deque()
+            pending = iter(self.items)
+            limit = self.workers * self.micro_batch_size * 2
+
+            def refill():
+                while len(window) < limit:
+                    item = next(pending, None)
+                    if item is None:
+                        return
+                    window.append((item, pool.submit(preprocess_in_worker, item.image_path, engine.input_size)))
+
+            refill()
+            while window and not self.is_cancelled():
+                item, future = window.popleft()
+                tensor, error = future.result()
+                refill()
+                if tensor is None:
+                    summary["failed"].append((item.image_path, error))
+                    done += 1
+                else:
+                    batch.append((item, tensor))
+                if len(batch) >= self.micro_batch_size:
+                    flush()
+            if self.is_cancelled():
+                pool.shutdown(cancel_futures=True)
+            else:
+                flush()
+
+        summary["elapsed"] = time.perf_counter() - started
+        summary["graded"] = len(rows)
+        if summary["elapsed"]:
+            summary["images_per_second"] = done / summary["elapsed"]
+        if self.is_cancelled():
+            summary["cancelled"] = True
+            return summary
+
+        summary["saved"], summary["reassigned"] = self._save(rows)
+        return summary
+
+    @staticmethod
+    def _save(rows: list) -> tuple:
+        """Insert all graded images in a single transaction.
+
+        Returns (rows saved, reassigned) where reassigned lists each manifest
+        patient ID that was already on file and the new ID saved instead.
+        """
+        if not rows:
+            return 0, []
+        # Copy images first so the transaction only holds the write lock for the inserts
+        with image_store.holding([item.image_path for item, _ in rows]) as image_refs:
+            # One executemany; manifest IDs already on file are replaced with freshly allocated ones
+            saved_ids = record_repository.insert_many(BATCH_COLUMNS, [
+                (
+                    item.patient_id,
+                    item.name,
+                    item.eye,
+                    f"Batch screening: {os.path.basename(item.image_path)}",
+                    result.result_class,
+                    result.confidence_text,
+                    numeric_value(result.confidence_text),
+                    image_ref,
+                )
+                for (item, result), image_ref in zip(rows, image_refs)
+            ])
+        reassigned = [
+            (item.image_path, item.patient_id.strip(), saved_id)
+            for (item, _), saved_id in zip(rows, saved_ids)
+            if item.patient_id.strip() and saved_id != item.patient_id.strip()
+        ]
+        return len(saved_ids), reassigned
+
+
+# ============================================================
+# DIALOG
+# ============================================================
+
+class _BatchSignals(QObject):
+    progress = Signal(int, int, float)
+    finished = Signal(object)
+
+
+class BatchScreeningDialog(QDialog):
+    """Queue a folder or manifest of images for unattended grading."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self.job = None
+        self._signals = _BatchSignals(self)
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+
+        self.setWindowTitle("Batch Screening")
+        self.resize(640, 320)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+
+        title = QLabel("Batch Screening")
+        title.setStyleSheet("font-size:22px;font-weight:700;color:#007bff;")
+        subtitle = QLabel(
+            "Grade a folder of fundus images, or a CSV manifest with image, patient_id and name columns. "
+            "Results are saved together once the whole batch has been graded."
+        )
+        subtitle.setStyleSheet("font-size:13px;color:#6c757d;")
+        subtitle.setWordWrap(True)
+        layout.addWidget(title)
+        layout.addWidget(subtitle)
+
+        source_row = QHBoxLayout()
+        self.btn_folder = QPushButton("Choose Folder...")
+        self.btn_folder.clicked.connect(self.choose_folder)
+        self.btn_manifest = QPushButton("Open Manifest CSV...")
+        self.btn_manifest.clicked.connect(self.choose_manifest)
+        source_row.addWidget(self.btn_folder)
+        source_row.addWidget(self.btn_manifest)
+        source_row.addStretch()
+        layout.addLayout(source_row)
+
+        self.source_label = QLabel("No images queued")
+        self.source_label.setObjectName("statusLabel")
+        self.source_label.setWordWrap(True)
+        layout.addWidget(self.source_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setObjectName("statusLabel")
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+        layout.addStretch()
+
+        action_row = QHBoxLayout()
+        action_row.addStretch()
+        self.btn_start = QPushButton("Start Screening")
+        self.btn_start.setObjectName("primaryAction")
+        self.btn_start.setEnabled(False)
+        self.btn_start.clicked.connect(self.start)
+        self.btn_cancel = QPushButton("Close")
+        self.btn_cancel.setObjectName("dangerAction")
+        self.btn_cancel.clicked.connect(self.cancel_or_close)
+        action_row.addWidget(self.btn_start)
+        action_row.addWidget(self.btn_cancel)
+        layout.addLayout(action_row)
+
+        inference_service.warm_up()
+
+    def _set_items(self, items, source):
+        self.items = items
+        self.source_label.setText(f"{len(items)} image(s) queued from {source}")
+        self.progress_bar.setRange(0, max(1, len(items)))
+        self.progress_bar.setValue(0)
+        self.status_label.clear()
+        self.btn_start.setEnabled(bool(items))
+
+    def choose_folder(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Image Folder")
+        if directory:
+            self._set_items(collect_directory(directory), directory)
+
+    def choose_manifest(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Select Manifest", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            items = read_manifest(path)
+        except (OSError, ValueError, csv.Error) as err:
+            QMessageBox.warning(self, "Manifest Error", f"Unable to read manifest:\n{err}")
+            return
+        self._set_items(items, os.path.basename(path))
+
+    def is_running(self) -> bool:
+        return self.job is not None
+
+    def start(self):
+        if self.is_running() or not self.items:
+            return
+        self.job = BatchScreeningJob(self.items, progress=self._signals.progress.emit)
+        self.btn_start.setEnabled(False)
+        self.btn_folder.setEnabled(False)
+        self.btn_manifest.setEnabled(False)
+        self.btn_cancel.setText("Cancel")
+        self.status_label.setText("Loading model and starting workers...")
+        threading.Thread(target=self._run_job, args=(self.job,), name="EyeShieldBatch", daemon=True).start()
+
+    def _run_job(self, job):
+        try:
+            summary = job.run()
+        except Exception as err:
+            summary = {"error": str(err)}
+        self._signals.finished.emit(summary)
+
+    def _on_progress(self, done, total, rate):
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"{done} of {total} images  •  {rate:.1f} images/s")
+
+    def _on_finished(self, summary):
+        self.job = None
+        self.btn_folder.setEnabled(True)
+        self.btn_manifest.setEnabled(True)
+        self.btn_start.setEnabled(bool(self.items))
+        self.btn_cancel.setText("Close")
+        self.btn_cancel.setEnabled(True)
+
+        if summary.get("error"):
+            self.status_label.setText(summary["error"])
+            return
+        if summary["cancelled"]:
+            self.status_label.setText(
+                f"Cancelled after {summary['graded']} image(s); nothing was saved."
+            )
+            return
+
+        reassigned = summary["reassigned"]
+        audit_log.record(
+            "record.import",
+            "batch",
+            "",
+            f"{summary['saved']} screening(s), {len(summary['failed'])} unreadable, "
+            f"{len(reassigned)} patient ID(s) reassigned"
+            + "".join(f"; {old} -> {new}" for _, old, new in reassigned),
+        )
+        data_changes.poll()
+        message = (
+            f"Saved {summary['saved']} screening(s) in {summary['elapsed']:.1f} s "
+            f"({summary['images_per_second']:.1f} images/s)."
+        )
+        if summary["failed"]:
+            message += f" {len(summary['failed'])} image(s) could not be read:\n" + "\n".join(
+                f"{os.path.basename(path)}: {error}" for path, error in summary["failed"][:5]
+            )
+        self.status_label.setText(message)
+        if reassigned:
+            QMessageBox.warning(
+                self,
+                "Patient IDs Reassigned",
+                f"{len(reassigned)} manifest patient ID(s) already belong to other records, so these "
+                "screenings were saved under new IDs and are not linked to the existing patients:\n\n"
+                + "\n".join(
+                    f"{os.path.basename(path)}: {old} -> {new}" for path, old, new in reassigned[:20]
+                )
+                + (f"\n... and {len(reassigned) - 20} more" if len(reassigned) > 20 else ""),
+            )
+
+    def cancel_or_close(self):
+        if self.is_running():
+            self.job.cancel()
+            self.btn_cancel.setEnabled(False)
+            self.status_label.setText("Cancelling...")
+            return
+        self.close()
+
+    def closeEvent(self, event):
+        if self.is_running():
+            self.job.cancel()
+        super().closeEvent(event)
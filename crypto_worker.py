@@ -0,0 +1,23 @@
+"""
+Crypto worker module for EyeShield EMR application.
+Runs PBKDF2 password hashing and verification off the GUI thread.
+"""
+
+import os
+
+from db_executor import TaskExecutor
+
+
+class CryptoWorker(TaskExecutor):
+    """Thread pool for password work with GUI-thread callbacks.
+
+    hashlib.pbkdf2_hmac releases the GIL, so each thread hashes on its own
+    core while the event loop keeps painting. Callers submit whole
+    operations (sign-in, user creation, password reset) so the lookup and
+    the hashing run together on one worker thread.
+    """
+
+    MAX_THREADS = max(2, os.cpu_count() or 2)
+
+
+crypto_worker = CryptoWorker()
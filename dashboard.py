@@ -6,16 +6,15 @@ Contains main application window and dashboard functionality.
 import contextlib
 import os
 import random
-import sqlite3
+import string
 from datetime import datetime
 
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QStackedWidget, QGroupBox, QMessageBox, QGridLayout
 )
-from PySide6.QtCore import Qt, QSize, QByteArray
-from PySide6.QtGui import QIcon, QPixmap, QImage, QPainter, QFont
-from PySide6.QtSvg import QSvgRenderer
+from PySide6.QtCore import Qt, QSize, QTimer
+from PySide6.QtGui import QIcon, QPixmap, QFont
 
 from screening import ScreeningPage
 from reports import ReportsPage
@@ -23,7 +22,269 @@ from users import UsersPage
 from settings import SettingsPage, DARK_STYLESHEET
 from help_support import HelpSupportPage
 from camera import CameraPage
-from auth import DB_FILE
+from auth import DatabaseConnection
+from data_changes import data_changes
+from db_executor import LoadingBar, database_executor
+from icon_cache import svg_icons
+from kpis import DashboardSummary
+from migrations import is_high_attention
+from record_repository import record_repository
+
+
+# (active, inactive, disabled) nav icon colors per theme, keyed by dark mode
+NAV_ICON_COLORS = {
+    False: ("#007bff", "#495057", "#adb5bd"),
+    True: ("#89b4fa", "#a6adc8", "#6c7086"),
+}
+NAV_ICON_SIZE = 24
+TITLE_ICON_SIZE = 38
+RECENT_ACTIVITY_LIMIT = 8
+
+# Dashboard colours keyed by dark mode
+DASHBOARD_PALETTES = {
+    False: {
+        "page_bg": "#f8f9fa",
+        "card_bg": "white",
+        "card_border": "#dee2e6",
+        "text_primary": "#212529",
+        "text_secondary": "#6c757d",
+        "text_muted": "#adb5bd",
+        "accent": "#0066cc",
+        "danger": "#d32f2f",
+        "warning": "#ed6c02",
+        "success": "#2e7d32",
+        "col_header_bg": "#f1f3f5",
+        "col_header_text": "#868e96",
+        "row_hover": "#f1f3f5",
+        "bar_track": "#e9ecef",
+        "btn_primary_bg": "#0066cc",
+        "btn_primary_text": "white",
+        "btn_primary_hover": "#0052a3",
+        "btn_outline": "#0066cc",
+        "btn_outline_hover_bg": "#e8f0fe",
+    },
+    True: {
+        "page_bg": "#1e1e2e",
+        "card_bg": "#313244",
+        "card_border": "#45475a",
+        "text_primary": "#cdd6f4",
+        "text_secondary": "#a6adc8",
+        "text_muted": "#6c7086",
+        "accent": "#89b4fa",
+        "danger": "#f38ba8",
+        "warning": "#fab387",
+        "success": "#a6e3a1",
+        "col_header_bg": "#45475a",
+        "col_header_text": "#a6adc8",
+        "row_hover": "#3a3a4f",
+        "bar_track": "#45475a",
+        "btn_primary_bg": "#89b4fa",
+        "btn_primary_text": "#1e1e2e",
+        "btn_primary_hover": "#74a8f7",
+        "btn_outline": "#89b4fa",
+        "btn_outline_hover_bg": "#313244",
+    },
+}
+
+# Styled by object name and dynamic property (dashRole, tone, severity)
+# so data refreshes only flip properties instead of rebuilding stylesheets.
+DASHBOARD_TEMPLATE = string.Template("""
+    QWidget#dashboardPage {
+        background: $page_bg;
+    }
+    QLabel#welcomeGreeting {
+        color: $text_primary;
+        font-size: 22px;
+        font-weight: 600;
+        background: transparent;
+    }
+    QLabel#welcomeRole {
+        color: $text_secondary;
+        font-size: 14px;
+        font-weight: 500;
+        background: transparent;
+    }
+    QLabel#dashDate {
+        color: $accent;
+        font-size: 14px;
+        font-weight: 600;
+        background: transparent;
+    }
+    QWidget[dashCard="true"] {
+        background: $card_bg;
+        border: 1px solid $card_border;
+        border-radius: 8px;
+    }
+    QWidget[dashCard="true"][tone="accent"] { border-top: 3px solid $accent; }
+    QWidget[dashCard="true"][tone="danger"] { border-top: 3px solid $danger; }
+    QWidget[dashCard="true"][tone="warning"] { border-top: 3px solid $warning; }
+    QWidget[dashCard="true"][tone="muted"] { border-top: 3px solid $text_muted; }
+    QLabel[dashRole="sectionTitle"] {
+        color: $text_secondary;
+        font-size: 11px;
+        font-weight: 700;
+        letter-spacing: 0.5px;
+        text-transform: uppercase;
+        background: transparent;
+    }
+    QLabel[dashRole="kpiValue"] {
+        font-size: 34px;
+        font-weight: 700;
+        color: $text_primary;
+        background: transparent;
+    }
+    QLabel[dashRole="caption"] {
+        font-size: 11px;
+        color: $text_secondary;
+        background: transparent;
+    }
+    QWidget#confBarTrack {
+        background: $bar_track;
+        border-radius: 3px;
+    }
+    QWidget#confBarFill {
+        background: $accent;
+        border-radius: 3px;
+    }
+    QWidget#confBarFill[tone="success"] { background: $success; }
+    QWidget#confBarFill[tone="warning"] { background: $warning; }
+    QWidget#confBarFill[tone="danger"] { background: $danger; }
+    QWidget#colHeader {
+        background: $col_header_bg;
+        border-radius: 4px;
+    }
+    QLabel[dashRole="columnHeader"] {
+        font-size: 10px;
+        font-weight: 700;
+        color: $col_header_text;
+        background: transparent;
+        text-transform: uppercase;
+    }
+    QWidget#activityRows, QWidget#dashSidebar {
+        background: transparent;
+    }
+    QWidget[dashRole="activityRow"] {
+        background: transparent;
+    }
+    QWidget[dashRole="activityRow"]:hover {
+        background: $row_hover;
+        border-radius: 4px;
+    }
+    QLabel[dashRole="cell"] {
+        font-size: 12px;
+        color: $text_primary;
+        background: transparent;
+    }
+    QLabel[dashRole="cellSecondary"], QLabel[dashRole="result"] {
+        font-size: 12px;
+        color: $text_secondary;
+        background: transparent;
+    }
+    QLabel[dashRole="result"][severity="high"] {
+        color: $danger;
+        font-weight: 600;
+    }
+    QLabel[dashRole="result"][severity="pending"] {
+        color: $warning;
+        font-style: italic;
+    }
+    QLabel[dashRole="dot"] {
+        font-size: 10px;
+        color: $success;
+        background: transparent;
+    }
+    QLabel[dashRole="dot"][severity="high"] { color: $danger; }
+    QLabel[dashRole="dot"][severity="pending"] { color: $warning; }
+    QLabel#emptyActivity {
+        color: $text_muted;
+        font-size: 13px;
+        font-style: italic;
+        padding: 24px;
+        background: transparent;
+    }
+    QLabel#insightLabel {
+        font-size: 12px;
+        color: $text_secondary;
+        background: transparent;
+    }
+    QPushButton#dashPrimaryAction {
+        background: $btn_primary_bg;
+        color: $btn_primary_text;
+        border: none;
+        border-radius: 6px;
+        font-size: 13px;
+        font-weight: 600;
+        padding: 0 16px;
+    }
+    QPushButton#dashPrimaryAction:hover { background: $btn_primary_hover; }
+    QPushButton#dashOutlineAction {
+        background: transparent;
+        color: $btn_outline;
+        border: 1px solid $btn_outline;
+        border-radius: 6px;
+        font-size: 13px;
+        font-weight: 600;
+        padding: 0 16px;
+    }
+    QPushButton#dashOutlineAction:hover { background: $btn_outline_hover_bg; }
+""")
+DASHBOARD_STYLESHEETS = {dark: DASHBOARD_TEMPLATE.substitute(palette) for dark, palette in DASHBOARD_PALETTES.items()}
+
+
+def _set_style_property(widget: QWidget, name: str, value) -> None:
+    """Set a dynamic property used by stylesheet selectors, re-polishing only on change"""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+class ActivityRow(QWidget):
+    """One recycled "Recent Screenings" row; only relabels when its record changes"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._values = None
+        self.setProperty("dashRole", "activityRow")
+        self.setFixedHeight(32)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 0, 8, 0)
+        layout.setSpacing(0)
+
+        self.dot = QLabel("\u25cf")
+        self.dot.setProperty("dashRole", "dot")
+        self.dot.setFixedWidth(16)
+        self.dot.setAlignment(Qt.AlignCenter)
+        self.pid_label = QLabel()
+        self.pid_label.setProperty("dashRole", "cell")
+        self.name_label = QLabel()
+        self.name_label.setProperty("dashRole", "cell")
+        self.result_label = QLabel()
+        self.result_label.setProperty("dashRole", "result")
+        self.conf_label = QLabel()
+        self.conf_label.setProperty("dashRole", "cellSecondary")
+
+        layout.addWidget(self.dot, 0)
+        layout.addWidget(self.pid_label, 2)
+        layout.addWidget(self.name_label, 3)
+        layout.addWidget(self.result_label, 3)
+        layout.addWidget(self.conf_label, 2)
+
+    def set_record(self, patient_id, name, result_text: str, confidence_value, severity: str) -> bool:
+        """Show a record; returns False when the row already displays it"""
+        values = (patient_id, name, result_text, confidence_value, severity)
+        if values == self._values:
+            return False
+        self._values = values
+        self.pid_label.setText(str(patient_id or ""))
+        self.name_label.setText(str(name or ""))
+        self.result_label.setText(result_text or "Pending")
+        self.conf_label.setText(f"{confidence_value:.0f}%" if confidence_value is not None else "—")
+        _set_style_property(self.dot, "severity", severity)
+        _set_style_property(self.result_label, "severity", severity)
+        return True
 
 
 class EyeShieldApp(QMainWindow):
@@ -37,6 +298,9 @@ class EyeShieldApp(QMainWindow):
         self._dark_mode = False
         self._saved_styles = {}
         self._logging_out = False
+        # Free the window and its pages on close; the login window that opened
+        # it keeps a reference, and a live window would keep reacting to changes
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
 
         self.setWindowTitle("EyeShield – DR Screening")
         self.setMinimumSize(1100, 700)
@@ -87,9 +351,7 @@ class EyeShieldApp(QMainWindow):
         icon_label = QLabel()
         self.nav_icon_label = icon_label
         self._icon_path = _icon_path
-        icon_pixmap = self._load_svg_pixmap_colored(_icon_path, "#007bff", 256).scaled(
-            QSize(38, 38), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
+        icon_pixmap = self._load_svg_pixmap_colored(_icon_path, "#007bff", TITLE_ICON_SIZE, self.devicePixelRatioF())
         if not icon_pixmap.isNull():
             icon_label.setPixmap(icon_pixmap)
         icon_label.setFixedSize(38, 38)
@@ -114,7 +376,7 @@ class EyeShieldApp(QMainWindow):
             btn.setProperty("navIconPath", icon_path)
             btn.setStyleSheet(self.get_nav_button_style(icon_only=True))
             btn.setFixedSize(50, 40)
-            btn.setIconSize(QSize(24, 24))
+            btn.setIconSize(QSize(NAV_ICON_SIZE, NAV_ICON_SIZE))
 
             label = QLabel(text)
             label.setAlignment(Qt.AlignHCenter)
@@ -244,11 +506,13 @@ class EyeShieldApp(QMainWindow):
 
         self.pages = QStackedWidget()
 
+        # Views load from here on; later changes arrive through the change bus
+        data_changes.start()
+
         # Create main pages first so dashboard can query live data
         self.screening_page = ScreeningPage()
         self.camera_page = CameraPage()
         self.reports_page = ReportsPage(self.username, self.role)
-        self.reports_page.records_changed_callback = self.refresh_dashboard
         self.users_page = UsersPage()
         self.settings_page = SettingsPage()
         self.help_support_page = HelpSupportPage()
@@ -266,6 +530,9 @@ class EyeShieldApp(QMainWindow):
         self.pages.addWidget(self.settings_page)
         self.pages.addWidget(self.help_support_page)
         self.pages.currentChanged.connect(self._on_page_changed)
+        self._dashboard_stale = False
+        data_changes.records_changed.connect(self._on_records_changed)
+        data_changes.resync_required.connect(self._on_records_changed)
 
         main_layout.addWidget(self.pages)
         root_layout.addWidget(main)
@@ -281,48 +548,18 @@ class EyeShieldApp(QMainWindow):
         if saved_theme == "Dark":
             self.apply_theme("Dark")
 
+        # Render the remaining icon states once the window is up
+        QTimer.singleShot(0, self._prewarm_icons)
+
     @staticmethod
     def _load_svg_pixmap(svg_path: str, size: int = 64) -> QPixmap:
         """Render an SVG file to a QPixmap at the requested size."""
-        renderer = QSvgRenderer(svg_path)
-        if not renderer.isValid():
-            return QPixmap()
-        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
-        image.fill(0)
-        painter = QPainter(image)
-        renderer.render(painter)
-        painter.end()
-        return QPixmap.fromImage(image)
+        return svg_icons.pixmap(svg_path, None, size)
 
     @staticmethod
-    def _load_svg_pixmap_colored(svg_path: str, color: str, size: int = 64) -> QPixmap:
+    def _load_svg_pixmap_colored(svg_path: str, color: str, size: int = 64, device_pixel_ratio: float = 1.0) -> QPixmap:
         """Render an SVG with all black strokes/fills replaced by the given color."""
-        try:
-            with open(svg_path, "r", encoding="utf-8") as f:
-                svg_text = f.read()
-        except OSError:
-            return QPixmap()
-        svg_text = svg_text.replace('stroke="currentColor"', f'stroke="{color}"')
-        svg_text = svg_text.replace('fill="currentColor"', f'fill="{color}"')
-        svg_text = svg_text.replace('stroke="black"', f'stroke="{color}"')
-        svg_text = svg_text.replace('fill="black"', f'fill="{color}"')
-        svg_text = svg_text.replace('stroke="#000"', f'stroke="{color}"')
-        svg_text = svg_text.replace('fill="#000"', f'fill="{color}"')
-        svg_text = svg_text.replace('stroke="#000000"', f'stroke="{color}"')
-        svg_text = svg_text.replace('fill="#000000"', f'fill="{color}"')
-        svg_text = svg_text.replace('stroke="#e3e3e3"', f'stroke="{color}"')
-        svg_text = svg_text.replace('fill="#e3e3e3"', f'fill="{color}"')
-        svg_text = svg_text.replace('fill="white"', 'fill="transparent"')
-        data = QByteArray(svg_text.encode("utf-8"))
-        renderer = QSvgRenderer(data)
-        if not renderer.isValid():
-            return QPixmap()
-        image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
-        image.fill(0)
-        painter = QPainter(image)
-        renderer.render(painter)
-        painter.end()
-        return QPixmap.fromImage(image)
+        return svg_icons.pixmap(svg_path, color, size, device_pixel_ratio)
 
     @staticmethod
     def _resolve_existing_path(*paths: str) -> str:
@@ -334,30 +571,36 @@ class EyeShieldApp(QMainWindow):
 
     def _set_button_svg_icon(self, button: QPushButton, svg_path: str, color: str, size: QSize):
         """Apply a recolored SVG icon to a button."""
-        if not svg_path:
-            button.setIcon(QIcon())
+        ratio = button.devicePixelRatioF()
+        icon_key = f"{svg_path}|{color}|{size.width()}|{ratio}"
+        if button.property("svgIconKey") == icon_key:
             return
-        pixmap = self._load_svg_pixmap_colored(svg_path, color, 256)
-        if pixmap.isNull():
-            button.setIcon(QIcon())
-            return
-        button.setIcon(QIcon(pixmap))
+        button.setProperty("svgIconKey", icon_key)
+        button.setIcon(svg_icons.icon(svg_path, color, size.width(), ratio))
         button.setIconSize(size)
 
+    def _prewarm_icons(self):
+        """Render every nav icon state for both themes so later switches are cache hits."""
+        if not hasattr(self, "nav_buttons"):
+            return
+        ratio = self.devicePixelRatioF()
+        paths = [btn.property("navIconPath") or "" for btn in self.nav_buttons]
+        for colors in NAV_ICON_COLORS.values():
+            svg_icons.prewarm(paths, colors, NAV_ICON_SIZE, ratio)
+        svg_icons.prewarm([self._icon_path], ("#007bff", "#cdd6f4"), TITLE_ICON_SIZE, ratio)
+
     def _refresh_nav_button_icons(self, active_index: int):
         """Recolor navigation SVG icons to match active/inactive and theme state."""
         if not hasattr(self, "nav_buttons"):
             return
         dark = getattr(self, "_dark_mode", False)
-        active_color = "#89b4fa" if dark else "#007bff"
-        inactive_color = "#a6adc8" if dark else "#495057"
-        disabled_color = "#6c7086" if dark else "#adb5bd"
-        icon_size = QSize(24, 24)
+        active_color, inactive_color, disabled_color = NAV_ICON_COLORS[dark]
+        icon_size = QSize(NAV_ICON_SIZE, NAV_ICON_SIZE)
         for btn in self.nav_buttons:
             icon_path = btn.property("navIconPath") or ""
             if not btn.isEnabled():
                 color = disabled_color
-            elif int(btn.property("pageIndex") or -1) == active_index:
+            elif btn.property("pageIndex") == active_index:
                 color = active_color
             else:
                 color = inactive_color
@@ -451,9 +694,7 @@ class EyeShieldApp(QMainWindow):
         if not hasattr(self, "nav_icon_label") or not hasattr(self, "_icon_path"):
             return
         color = "#cdd6f4" if dark else "#007bff"
-        pixmap = self._load_svg_pixmap_colored(self._icon_path, color, 256).scaled(
-            QSize(38, 38), Qt.KeepAspectRatio, Qt.SmoothTransformation
-        )
+        pixmap = self._load_svg_pixmap_colored(self._icon_path, color, TITLE_ICON_SIZE, self.devicePixelRatioF())
         if not pixmap.isNull():
             self.nav_icon_label.setPixmap(pixmap)
 
@@ -471,10 +712,17 @@ class EyeShieldApp(QMainWindow):
             self.camera_page.enter_page()
         else:
             self.camera_page.leave_page()
-        if index == 3:
-            self.reports_page.refresh_report()
-        if index == 0:
+        if index == 0 and self._dashboard_stale:
             self.refresh_dashboard()
+        # Views only reload when the change log shows committed changes
+        data_changes.poll()
+
+    def _on_records_changed(self, changes=None):
+        """Reload the dashboard now if it is showing, otherwise when it is next opened."""
+        if self.pages.currentIndex() == 0:
+            self.refresh_dashboard()
+        else:
+            self._dashboard_stale = True
 
     def _set_active_nav(self, index: int):
         """Highlight the active navigation button and dim the rest."""
@@ -538,12 +786,12 @@ class EyeShieldApp(QMainWindow):
             inactive_label = "font-size: 10px; color: #495057; margin-top: 0px; text-decoration: none; border: none;"
 
         for btn in self.nav_buttons:
-            if int(btn.property("pageIndex") or -1) == index:
+            if btn.property("pageIndex") == index:
                 btn.setStyleSheet(active_btn_style)
             elif btn.isEnabled():
                 btn.setStyleSheet(inactive_btn_style)
         for i, label in enumerate(self.nav_labels):
-            if int(label.property("pageIndex") or -1) == index:
+            if label.property("pageIndex") == index:
                 label.setStyleSheet(active_label)
             elif self.nav_buttons[i].isEnabled():
                 label.setStyleSheet(inactive_label)
@@ -561,6 +809,9 @@ class EyeShieldApp(QMainWindow):
             nav_protected.add(id(self.nav_bar))
             for w in self.nav_bar.findChildren(QWidget):
                 nav_protected.add(id(w))
+        # The dashboard page carries its own per-theme stylesheet, swapped below
+        if hasattr(self, "dashboard_page"):
+            nav_protected.add(id(self.dashboard_page))
 
         if theme == "Dark":
             if self._dark_mode:
@@ -603,12 +854,14 @@ class EyeShieldApp(QMainWindow):
         # Update nav icon for the new theme
         self._update_nav_icon(self._dark_mode)
 
-        # Refresh entire dashboard with correct theme colors
-        self.refresh_dashboard()
+        # Dashboard colours follow from its stylesheet; no data reload needed
+        if hasattr(self, "dashboard_page"):
+            self.dashboard_page.setStyleSheet(DASHBOARD_STYLESHEETS[self._dark_mode])
 
     def closeEvent(self, event):
         """Ask for confirmation before closing the application."""
         if getattr(self, '_logging_out', False):
+            self._disconnect_changes()
             event.accept()
             return
         reply = QMessageBox.question(
@@ -619,10 +872,17 @@ class EyeShieldApp(QMainWindow):
             QMessageBox.StandardButton.No,
         )
         if reply == QMessageBox.StandardButton.Yes:
+            self._disconnect_changes()
             event.accept()
         else:
             event.ignore()
 
+    def _disconnect_changes(self):
+        """Detach this window and its pages from the shared change bus"""
+        data_changes.records_changed.disconnect(self._on_records_changed)
+        data_changes.resync_required.disconnect(self._on_records_changed)
+        self.reports_page.disconnect_changes()
+
     def handle_logout(self):
         reply = QMessageBox.question(
             self,
@@ -643,33 +903,23 @@ class EyeShieldApp(QMainWindow):
         """Create the redesigned clinician-focused dashboard page."""
         page = QWidget()
         page.setObjectName("dashboardPage")
-        page.setStyleSheet("QWidget#dashboardPage { background: #f8f9fa; }")
+        page.setStyleSheet(DASHBOARD_STYLESHEETS[self._dark_mode])
         layout = QVBoxLayout(page)
         layout.setContentsMargins(24, 18, 24, 18)
         layout.setSpacing(14)
 
-        # ── Colour constants (light-theme defaults; dark overridden in refresh) ──
-        # These are used here for initial build; refresh_dashboard re-applies them.
+        # Colours come from DASHBOARD_STYLESHEETS (object names and dashRole/tone/severity properties)
 
         # ── 0. WELCOME ROW (greeting + role left, date right) ────────
         self.welcome_label = QLabel(f"Welcome back, {self.username}")
         self.welcome_label.setObjectName("welcomeGreeting")
-        self.welcome_label.setStyleSheet(
-            "color: #212529; font-size: 22px; font-weight: 600; background: transparent;"
-        )
 
         self.welcome_role_label = QLabel(f"{self.role.capitalize()}")
         self.welcome_role_label.setObjectName("welcomeRole")
-        self.welcome_role_label.setStyleSheet(
-            "color: #6c757d; font-size: 14px; font-weight: 500; background: transparent;"
-        )
 
         self.dashboard_date_label = QLabel("")
         self.dashboard_date_label.setObjectName("dashDate")
         self.dashboard_date_label.setAlignment(Qt.AlignRight)
-        self.dashboard_date_label.setStyleSheet(
-            "color: #0066cc; font-size: 14px; font-weight: 600; background: transparent;"
-        )
 
         welcome_row = QHBoxLayout()
         welcome_row.setSpacing(0)
@@ -682,40 +932,34 @@ class EyeShieldApp(QMainWindow):
         welcome_row.addWidget(self.dashboard_date_label, 0, Qt.AlignVCenter)
         layout.addLayout(welcome_row)
 
+        self.dashboard_loading_bar = LoadingBar()
+        layout.addWidget(self.dashboard_loading_bar)
+
         # ── KPI STRIP (4 equal cards) ───────────────────────────────────
         kpi_row = QHBoxLayout()
         kpi_row.setSpacing(14)
 
-        def make_kpi_card(object_name, title_text, accent):
+        def make_kpi_card(object_name, title_text, tone):
             """Build a single KPI card with title, big value, and subtitle."""
             card = QWidget()
             card.setObjectName(object_name)
+            card.setProperty("dashCard", True)
+            card.setProperty("tone", tone)
             card.setMinimumHeight(110)
-            card.setStyleSheet(f"""
-                QWidget#{object_name} {{
-                    background: white;
-                    border: 1px solid #dee2e6;
-                    border-top: 3px solid {accent};
-                    border-radius: 8px;
-                }}
-            """)
             v = QVBoxLayout(card)
             v.setContentsMargins(16, 12, 16, 12)
             v.setSpacing(4)
 
             title = QLabel(title_text)
             title.setObjectName(f"{object_name}_title")
-            title.setStyleSheet(
-                "color: #6c757d; font-size: 11px; font-weight: 700;"
-                "letter-spacing: 0.5px; text-transform: uppercase; background: transparent;"
-            )
+            title.setProperty("dashRole", "sectionTitle")
             value = QLabel("—")
             value.setObjectName(f"{object_name}_value")
-            value.setStyleSheet("font-size: 34px; font-weight: 700; color: #212529; background: transparent;")
+            value.setProperty("dashRole", "kpiValue")
 
             subtitle = QLabel("")
             subtitle.setObjectName(f"{object_name}_sub")
-            subtitle.setStyleSheet("font-size: 11px; color: #6c757d; background: transparent;")
+            subtitle.setProperty("dashRole", "caption")
 
             v.addWidget(title)
             v.addWidget(value)
@@ -724,38 +968,34 @@ class EyeShieldApp(QMainWindow):
             return card, value, subtitle
 
         # Card 1: Total Screenings
-        card_total, self.total_screenings_value, self.total_sub = \
-            make_kpi_card("kpiTotal", "TOTAL SCREENINGS", "#0066cc")
+        self.kpi_total_card, self.total_screenings_value, self.total_sub = \
+            make_kpi_card("kpiTotal", "TOTAL SCREENINGS", "accent")
 
         # Card 2: Flagged for Review  (the mission-critical number)
-        card_flagged, self.high_attention_value, self.high_attention_hint = \
-            make_kpi_card("kpiFlagged", "FLAGGED FOR REVIEW", "#d32f2f")
+        self.kpi_flagged_card, self.high_attention_value, self.high_attention_hint = \
+            make_kpi_card("kpiFlagged", "FLAGGED FOR REVIEW", "danger")
 
         # Card 3: Pending Review
-        card_pending, self.pending_value, self.pending_sub = \
-            make_kpi_card("kpiPending", "PENDING REVIEW", "#ed6c02")
+        self.kpi_pending_card, self.pending_value, self.pending_sub = \
+            make_kpi_card("kpiPending", "PENDING REVIEW", "warning")
 
         # Card 4: Average Confidence (with progress bar below value)
         card_conf, self.avg_confidence_value, self.conf_sub = \
-            make_kpi_card("kpiConf", "MODEL CONFIDENCE", "#0066cc")
+            make_kpi_card("kpiConf", "MODEL CONFIDENCE", "accent")
 
         # Add a visual progress bar under the confidence value
         self.conf_bar_track = QWidget()
+        self.conf_bar_track.setObjectName("confBarTrack")
         self.conf_bar_track.setFixedHeight(6)
-        self.conf_bar_track.setStyleSheet(
-            "background: #e9ecef; border-radius: 3px;"
-        )
         self.conf_bar_fill = QWidget(self.conf_bar_track)
+        self.conf_bar_fill.setObjectName("confBarFill")
         self.conf_bar_fill.setFixedHeight(6)
-        self.conf_bar_fill.setStyleSheet(
-            "background: #0066cc; border-radius: 3px;"
-        )
         self.conf_bar_fill.setFixedWidth(0)
         card_conf.layout().insertWidget(3, self.conf_bar_track)
 
-        kpi_row.addWidget(card_total, 1)
-        kpi_row.addWidget(card_flagged, 1)
-        kpi_row.addWidget(card_pending, 1)
+        kpi_row.addWidget(self.kpi_total_card, 1)
+        kpi_row.addWidget(self.kpi_flagged_card, 1)
+        kpi_row.addWidget(self.kpi_pending_card, 1)
         kpi_row.addWidget(card_conf, 1)
         layout.addLayout(kpi_row)
 
@@ -766,31 +1006,20 @@ class EyeShieldApp(QMainWindow):
         # ── Left: Recent Screenings ──
         activity_card = QWidget()
         activity_card.setObjectName("activityCard")
+        activity_card.setProperty("dashCard", True)
         activity_card.setMinimumHeight(260)
-        activity_card.setStyleSheet("""
-            QWidget#activityCard {
-                background: white;
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-            }
-        """)
         activity_v = QVBoxLayout(activity_card)
         activity_v.setContentsMargins(16, 14, 16, 14)
         activity_v.setSpacing(8)
 
         activity_header = QHBoxLayout()
         activity_title = QLabel("RECENT SCREENINGS")
-        activity_title.setStyleSheet(
-            "color: #6c757d; font-size: 11px; font-weight: 700;"
-            "letter-spacing: 0.5px; text-transform: uppercase; background: transparent;"
-        )
+        activity_title.setProperty("dashRole", "sectionTitle")
         activity_header.addWidget(activity_title)
         activity_header.addStretch()
 
         self.activity_count_label = QLabel("")
-        self.activity_count_label.setStyleSheet(
-            "color: #6c757d; font-size: 11px; background: transparent;"
-        )
+        self.activity_count_label.setProperty("dashRole", "caption")
         activity_header.addWidget(self.activity_count_label)
         activity_v.addLayout(activity_header)
 
@@ -798,16 +1027,12 @@ class EyeShieldApp(QMainWindow):
         col_header = QWidget()
         col_header.setObjectName("colHeader")
         col_header.setFixedHeight(26)
-        col_header.setStyleSheet(
-            "QWidget#colHeader { background: #f1f3f5; border-radius: 4px; }"
-        )
         ch_layout = QHBoxLayout(col_header)
         ch_layout.setContentsMargins(8, 0, 8, 0)
         ch_layout.setSpacing(0)
-        header_style = "font-size: 10px; font-weight: 700; color: #868e96; background: transparent; text-transform: uppercase;"
         for text, stretch in [("", 0), ("Patient ID", 2), ("Name", 3), ("Result", 3), ("Confidence", 2)]:
             lbl = QLabel(text)
-            lbl.setStyleSheet(header_style)
+            lbl.setProperty("dashRole", "columnHeader")
             if stretch == 0:
                 lbl.setFixedWidth(16)
             ch_layout.addWidget(lbl, stretch)
@@ -816,18 +1041,23 @@ class EyeShieldApp(QMainWindow):
 
         # Scrollable rows container
         self.activity_rows_widget = QWidget()
-        self.activity_rows_widget.setStyleSheet("background: transparent;")
+        self.activity_rows_widget.setObjectName("activityRows")
         self.activity_rows_layout = QVBoxLayout(self.activity_rows_widget)
         self.activity_rows_layout.setContentsMargins(0, 0, 0, 0)
         self.activity_rows_layout.setSpacing(2)
+        # Fixed pool of rows, relabelled in place on every refresh
+        self.activity_rows = []
+        for _ in range(RECENT_ACTIVITY_LIMIT):
+            row = ActivityRow()
+            row.setVisible(False)
+            self.activity_rows_layout.addWidget(row)
+            self.activity_rows.append(row)
+        self.activity_rows_layout.addStretch()
         activity_v.addWidget(self.activity_rows_widget, 1)
 
         # Empty-state label (hidden when data present)
         self.empty_activity_label = QLabel("No screening records yet. Start by running a new screening.")
         self.empty_activity_label.setObjectName("emptyActivity")
-        self.empty_activity_label.setStyleSheet(
-            "color: #6c757d; font-size: 13px; font-style: italic; padding: 24px; background: transparent;"
-        )
         self.empty_activity_label.setAlignment(Qt.AlignCenter)
         self.empty_activity_label.setWordWrap(True)
         activity_v.addWidget(self.empty_activity_label)
@@ -837,7 +1067,6 @@ class EyeShieldApp(QMainWindow):
         # ── Right: Session + Quick Actions + Insight ──
         sidebar = QWidget()
         sidebar.setObjectName("dashSidebar")
-        sidebar.setStyleSheet("QWidget#dashSidebar { background: transparent; }")
         sidebar_v = QVBoxLayout(sidebar)
         sidebar_v.setContentsMargins(0, 0, 0, 0)
         sidebar_v.setSpacing(14)
@@ -845,49 +1074,26 @@ class EyeShieldApp(QMainWindow):
         # Quick Actions card
         actions_card = QWidget()
         actions_card.setObjectName("actionsCard")
-        actions_card.setStyleSheet("""
-            QWidget#actionsCard {
-                background: white;
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-            }
-        """)
+        actions_card.setProperty("dashCard", True)
         actions_v = QVBoxLayout(actions_card)
         actions_v.setContentsMargins(16, 12, 16, 12)
         actions_v.setSpacing(8)
 
         actions_title = QLabel("QUICK ACTIONS")
-        actions_title.setStyleSheet(
-            "color: #6c757d; font-size: 11px; font-weight: 700;"
-            "letter-spacing: 0.5px; background: transparent;"
-        )
+        actions_title.setProperty("dashRole", "sectionTitle")
         actions_v.addWidget(actions_title)
 
         btn_new_screening = QPushButton("  New Screening")
+        btn_new_screening.setObjectName("dashPrimaryAction")
         btn_new_screening.setCursor(Qt.PointingHandCursor)
         btn_new_screening.setFixedHeight(36)
-        btn_new_screening.setStyleSheet("""
-            QPushButton {
-                background: #0066cc; color: white; border: none;
-                border-radius: 6px; font-size: 13px; font-weight: 600;
-                padding: 0 16px;
-            }
-            QPushButton:hover { background: #0052a3; }
-        """)
         btn_new_screening.clicked.connect(lambda: self.pages.setCurrentIndex(1))
         actions_v.addWidget(btn_new_screening)
 
         btn_view_reports = QPushButton("  View Reports")
+        btn_view_reports.setObjectName("dashOutlineAction")
         btn_view_reports.setCursor(Qt.PointingHandCursor)
         btn_view_reports.setFixedHeight(36)
-        btn_view_reports.setStyleSheet("""
-            QPushButton {
-                background: transparent; color: #0066cc;
-                border: 1px solid #0066cc; border-radius: 6px;
-                font-size: 13px; font-weight: 600; padding: 0 16px;
-            }
-            QPushButton:hover { background: #e8f0fe; }
-        """)
         btn_view_reports.clicked.connect(lambda: self.pages.setCurrentIndex(3))
         actions_v.addWidget(btn_view_reports)
         self._dash_btn_new = btn_new_screening
@@ -897,24 +1103,14 @@ class EyeShieldApp(QMainWindow):
         # Clinical Insight card
         insight_card = QWidget()
         insight_card.setObjectName("insightCard")
-        insight_card.setStyleSheet("""
-            QWidget#insightCard {
-                background: white;
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-            }
-        """)
+        insight_card.setProperty("dashCard", True)
         insight_v = QVBoxLayout(insight_card)
         insight_v.setContentsMargins(16, 12, 16, 12)
         insight_v.setSpacing(6)
         insight_title = QLabel("CLINICAL INSIGHT")
-        insight_title.setStyleSheet(
-            "color: #6c757d; font-size: 11px; font-weight: 700;"
-            "letter-spacing: 0.5px; background: transparent;"
-        )
+        insight_title.setProperty("dashRole", "sectionTitle")
         self.insight_label = QLabel("Start a screening to generate insight.")
         self.insight_label.setObjectName("insightLabel")
-        self.insight_label.setStyleSheet("font-size: 12px; color: #495057; background: transparent;")
         self.insight_label.setWordWrap(True)
         insight_v.addWidget(insight_title)
         insight_v.addWidget(self.insight_label)
@@ -928,313 +1124,104 @@ class EyeShieldApp(QMainWindow):
         return page
 
     def refresh_dashboard(self):
-        """Refresh all dashboard widgets with current data and correct theme colors."""
-        dark = getattr(self, "_dark_mode", False)
-
-        # ── Theme palette ──
-        if dark:
-            bg_page = "#1e1e2e"
-            card_bg = "#313244"
-            card_border = "#45475a"
-            text_primary = "#cdd6f4"
-            text_secondary = "#a6adc8"
-            text_muted = "#6c7086"
-            accent_blue = "#89b4fa"
-            sev_red = "#f38ba8"
-            sev_amber = "#fab387"
-            sev_green = "#a6e3a1"
-            col_header_bg = "#45475a"
-            col_header_text = "#a6adc8"
-            row_hover = "#3a3a4f"
-            bar_track_bg = "#45475a"
-            btn_primary_bg = "#89b4fa"
-            btn_primary_text = "#1e1e2e"
-            btn_primary_hover = "#74a8f7"
-            btn_outline_color = "#89b4fa"
-            btn_outline_hover_bg = "#313244"
-        else:
-            bg_page = "#f8f9fa"
-            card_bg = "white"
-            card_border = "#dee2e6"
-            text_primary = "#212529"
-            text_secondary = "#6c757d"
-            text_muted = "#adb5bd"
-            accent_blue = "#0066cc"
-            sev_red = "#d32f2f"
-            sev_amber = "#ed6c02"
-            sev_green = "#2e7d32"
-            col_header_bg = "#f1f3f5"
-            col_header_text = "#868e96"
-            row_hover = "#f1f3f5"
-            bar_track_bg = "#e9ecef"
-            btn_primary_bg = "#0066cc"
-            btn_primary_text = "white"
-            btn_primary_hover = "#0052a3"
-            btn_outline_color = "#0066cc"
-            btn_outline_hover_bg = "#e8f0fe"
+        """Reload dashboard data in the background."""
+        self._dashboard_stale = False
+        database_executor.submit(
+            self._load_dashboard_data,
+            on_result=self._on_dashboard_data,
+            key="dashboard",
+            context=self,
+            indicator=getattr(self, "dashboard_loading_bar", None),
+        )
 
+    @staticmethod
+    def _load_dashboard_data():
+        with DatabaseConnection.connection() as conn:
+            summary = DashboardSummary.read(conn)
+            rows = record_repository.recent_active(RECENT_ACTIVITY_LIMIT, conn)
+        return {"summary": summary, "rows": rows}
+
+    def _on_dashboard_data(self, data):
+        self._dashboard_data = data
+        self._render_dashboard(data)
+
+    def _result_severity(self, result_text: str) -> str:
+        """Severity used by the dashboard's severity-keyed stylesheet rules."""
+        if is_high_attention(result_text):
+            return "high"
+        if not result_text or "pending" in result_text.lower():
+            return "pending"
+        return "normal"
+
+    def _render_dashboard(self, data):
+        """Refresh dashboard text and state properties; colours come from the theme stylesheet."""
         # ── Fetch data ──
         total = 0
         high_attention = 0
         pending_count = 0
-        confidence_values = []
+        confidence_count = 0
+        avg_conf = None
         rows = []
-        with contextlib.suppress(Exception):
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            cur.execute(
-                "SELECT patient_id, name, result, confidence "
-                "FROM patient_records WHERE archived_at IS NULL ORDER BY id DESC"
-            )
-            rows = cur.fetchall()
-            conn.close()
-
-            total = len(rows)
-            for _, _, result, confidence_text in rows:
-                result = str(result or "")
-                if self._is_high_attention_result(result):
-                    high_attention += 1
-                if not result or "pending" in result.lower():
-                    pending_count += 1
-                conf_value = self._extract_confidence_value(str(confidence_text or ""))
-                if conf_value is not None:
-                    confidence_values.append(conf_value)
-
-        avg_conf = sum(confidence_values) / len(confidence_values) if confidence_values else None
-
-        # ── Page background ──
-        if hasattr(self, "dashboard_page"):
-            self.dashboard_page.setStyleSheet(
-                f"QWidget#dashboardPage {{ background: {bg_page}; }}"
-            )
+        if data:
+            summary = data["summary"]
+            rows = data["rows"]
+            total = summary["total_active"]
+            high_attention = summary["high_attention"]
+            pending_count = summary["pending"]
+            confidence_count = summary["confidence_count"]
+            avg_conf = summary["avg_confidence"]
 
         # ── 0. Welcome row ──
-        if hasattr(self, "welcome_label"):
-            self.welcome_label.setStyleSheet(
-                f"color: {text_primary}; font-size: 22px; font-weight: 600; background: transparent;"
-            )
         if hasattr(self, "dashboard_date_label"):
-            today = datetime.now().strftime("%A, %B %d, %Y")
-            self.dashboard_date_label.setText(today)
-            self.dashboard_date_label.setStyleSheet(
-                f"color: {accent_blue}; font-size: 14px; font-weight: 600; background: transparent;"
-            )
-        if hasattr(self, "welcome_role_label"):
-            self.welcome_role_label.setStyleSheet(
-                f"color: {text_secondary}; font-size: 14px; font-weight: 500; background: transparent;"
-            )
+            self.dashboard_date_label.setText(datetime.now().strftime("%A, %B %d, %Y"))
 
         # ── KPI cards ──
-        kpi_title_style = (
-            f"color: {text_secondary}; font-size: 11px; font-weight: 700;"
-            "letter-spacing: 0.5px; text-transform: uppercase; background: transparent;"
+        self.total_screenings_value.setText(str(total))
+        self.total_sub.setText("All saved DR screenings")
+
+        _set_style_property(self.kpi_flagged_card, "tone", "danger" if high_attention > 0 else "muted")
+        self.high_attention_value.setText(str(high_attention))
+        self.high_attention_hint.setText("Cases flagged for follow-up" if high_attention > 0 else "No cases flagged")
+
+        _set_style_property(self.kpi_pending_card, "tone", "warning" if pending_count > 0 else "muted")
+        self.pending_value.setText(str(pending_count))
+        self.pending_sub.setText("Awaiting review" if pending_count > 0 else "All reviews complete")
+
+        self.avg_confidence_value.setText(f"{avg_conf:.1f}%" if avg_conf is not None else "—")
+        self.conf_sub.setText(
+            f"Across {confidence_count} record{'s' if confidence_count != 1 else ''}"
+            if confidence_count else "No confidence data yet"
         )
-        kpi_value_style = f"font-size: 34px; font-weight: 700; color: {text_primary}; background: transparent;"
-        kpi_sub_style = f"font-size: 11px; color: {text_secondary}; background: transparent;"
-
-        def style_kpi(obj_name, accent, value_widget, sub_widget, value_text, sub_text):
-            card = self.findChild(QWidget, obj_name)
-            if card:
-                card.setStyleSheet(
-                    f"QWidget#{obj_name} {{ background: {card_bg};"
-                    f"  border: 1px solid {card_border}; border-top: 3px solid {accent};"
-                    f"  border-radius: 8px; }}"
-                )
-            title_w = self.findChild(QLabel, f"{obj_name}_title")
-            if title_w:
-                title_w.setStyleSheet(kpi_title_style)
-            if value_widget:
-                value_widget.setStyleSheet(kpi_value_style)
-                value_widget.setText(value_text)
-            if sub_widget:
-                sub_widget.setStyleSheet(kpi_sub_style)
-                sub_widget.setText(sub_text)
-
-        style_kpi("kpiTotal", accent_blue,
-                  self.total_screenings_value, self.total_sub,
-                  str(total), "All saved DR screenings")
-
-        flagged_accent = sev_red if high_attention > 0 else text_muted
-        style_kpi("kpiFlagged", flagged_accent,
-                  self.high_attention_value, self.high_attention_hint,
-                  str(high_attention),
-                  "Cases flagged for follow-up" if high_attention > 0 else "No cases flagged")
-
-        style_kpi("kpiPending", sev_amber if pending_count > 0 else text_muted,
-                  self.pending_value, self.pending_sub,
-                  str(pending_count),
-                  "Awaiting review" if pending_count > 0 else "All reviews complete")
-
-        conf_display = f"{avg_conf:.1f}%" if avg_conf is not None else "—"
-        style_kpi("kpiConf", accent_blue,
-                  self.avg_confidence_value, self.conf_sub,
-                  conf_display,
-                  f"Across {len(confidence_values)} record{'s' if len(confidence_values) != 1 else ''}"
-                  if confidence_values else "No confidence data yet")
 
         # Confidence progress bar
         if hasattr(self, "conf_bar_track"):
-            self.conf_bar_track.setStyleSheet(
-                f"background: {bar_track_bg}; border-radius: 3px;"
-            )
             track_w = self.conf_bar_track.width() or 200
             fill_w = int(track_w * (avg_conf / 100.0)) if avg_conf is not None else 0
-            bar_color = sev_green if (avg_conf or 0) >= 75 else (sev_amber if (avg_conf or 0) >= 50 else sev_red)
-            self.conf_bar_fill.setStyleSheet(
-                f"background: {bar_color}; border-radius: 3px;"
-            )
+            bar_tone = "success" if (avg_conf or 0) >= 75 else ("warning" if (avg_conf or 0) >= 50 else "danger")
+            _set_style_property(self.conf_bar_fill, "tone", bar_tone)
             self.conf_bar_fill.setFixedWidth(max(0, min(fill_w, track_w)))
 
         # ── 3. Recent Screenings table ──
-        if hasattr(self, "activity_rows_layout"):
-            # Clear existing rows
-            while self.activity_rows_layout.count():
-                item = self.activity_rows_layout.takeAt(0)
-                if item.widget():
-                    item.widget().deleteLater()
-
-            # Theme the card
-            if hasattr(self, "col_header_widget"):
-                self.col_header_widget.setStyleSheet(
-                    f"QWidget#colHeader {{ background: {col_header_bg}; border-radius: 4px; }}"
-                )
-                for lbl in self.col_header_widget.findChildren(QLabel):
-                    lbl.setStyleSheet(
-                        f"font-size: 10px; font-weight: 700; color: {col_header_text};"
-                        " background: transparent; text-transform: uppercase;"
-                    )
-
-            activity_card = self.findChild(QWidget, "activityCard")
-            if activity_card:
-                activity_card.setStyleSheet(
-                    f"QWidget#activityCard {{ background: {card_bg};"
-                    f"  border: 1px solid {card_border}; border-radius: 8px; }}"
-                )
-
+        if hasattr(self, "activity_rows"):
             if hasattr(self, "activity_count_label"):
                 self.activity_count_label.setText(
-                    f"Showing {min(len(rows), 8)} of {total}" if total else ""
-                )
-                self.activity_count_label.setStyleSheet(
-                    f"color: {text_secondary}; font-size: 11px; background: transparent;"
+                    f"Showing {min(len(rows), RECENT_ACTIVITY_LIMIT)} of {total}" if total else ""
                 )
 
-            # Activity title
-            for lbl in (self.findChild(QWidget, "activityCard") or QWidget()).findChildren(QLabel):
-                if lbl.text() == "RECENT SCREENINGS":
-                    lbl.setStyleSheet(
-                        f"color: {text_secondary}; font-size: 11px; font-weight: 700;"
-                        "letter-spacing: 0.5px; text-transform: uppercase; background: transparent;"
-                    )
-                    break
-
-            recent = rows[:8]
-            if recent:
-                self.empty_activity_label.setVisible(False)
-                self.col_header_widget.setVisible(True)
-                for patient_id, name, result, confidence in recent:
-                    row_w = QWidget()
-                    row_w.setFixedHeight(32)
-                    row_w.setStyleSheet(
-                        f"QWidget {{ background: transparent; }}"
-                        f"QWidget:hover {{ background: {row_hover}; border-radius: 4px; }}"
-                    )
-                    rh = QHBoxLayout(row_w)
-                    rh.setContentsMargins(8, 0, 8, 0)
-                    rh.setSpacing(0)
-
+            recent = rows[:RECENT_ACTIVITY_LIMIT]
+            for index, row_widget in enumerate(self.activity_rows):
+                if index < len(recent):
+                    patient_id, name, result, confidence_value = recent[index]
                     result_str = str(result or "")
-                    # Severity dot
-                    if self._is_high_attention_result(result_str):
-                        dot_color = sev_red
-                    elif not result_str or "pending" in result_str.lower():
-                        dot_color = sev_amber
-                    else:
-                        dot_color = sev_green
-
-                    dot = QLabel("\u25cf")
-                    dot.setFixedWidth(16)
-                    dot.setStyleSheet(f"color: {dot_color}; font-size: 10px; background: transparent;")
-                    dot.setAlignment(Qt.AlignCenter)
-
-                    cell_style = f"font-size: 12px; color: {text_primary}; background: transparent;"
-                    cell_secondary = f"font-size: 12px; color: {text_secondary}; background: transparent;"
-
-                    pid_lbl = QLabel(str(patient_id or ""))
-                    pid_lbl.setStyleSheet(cell_style)
-
-                    name_lbl = QLabel(str(name or ""))
-                    name_lbl.setStyleSheet(cell_style)
-
-                    result_lbl = QLabel(result_str or "Pending")
-                    if self._is_high_attention_result(result_str):
-                        result_lbl.setStyleSheet(
-                            f"font-size: 12px; color: {sev_red}; font-weight: 600; background: transparent;"
-                        )
-                    elif not result_str or "pending" in result_str.lower():
-                        result_lbl.setStyleSheet(
-                            f"font-size: 12px; color: {sev_amber}; font-style: italic; background: transparent;"
-                        )
-                    else:
-                        result_lbl.setStyleSheet(cell_secondary)
-
-                    conf_val = self._extract_confidence_value(str(confidence or ""))
-                    conf_lbl = QLabel(f"{conf_val:.0f}%" if conf_val is not None else "—")
-                    conf_lbl.setStyleSheet(cell_secondary)
-
-                    rh.addWidget(dot, 0)
-                    rh.addWidget(pid_lbl, 2)
-                    rh.addWidget(name_lbl, 3)
-                    rh.addWidget(result_lbl, 3)
-                    rh.addWidget(conf_lbl, 2)
-                    self.activity_rows_layout.addWidget(row_w)
-                self.activity_rows_layout.addStretch()
-            else:
-                self.empty_activity_label.setVisible(True)
-                self.col_header_widget.setVisible(False)
-                self.empty_activity_label.setStyleSheet(
-                    f"color: {text_muted}; font-size: 13px; font-style: italic;"
-                    " padding: 24px; background: transparent;"
-                )
-
-        # ── 4. Sidebar cards ──
-        for card_name in ("actionsCard", "insightCard"):
-            card = self.findChild(QWidget, card_name)
-            if card:
-                card.setStyleSheet(
-                    f"QWidget#{card_name} {{ background: {card_bg};"
-                    f"  border: 1px solid {card_border}; border-radius: 8px; }}"
-                )
-
-        # Style section title labels in sidebar
-        for card_name in ("actionsCard", "insightCard"):
-            card = self.findChild(QWidget, card_name)
-            if card:
-                for lbl in card.findChildren(QLabel):
-                    if lbl.text() in ("QUICK ACTIONS", "CLINICAL INSIGHT"):
-                        lbl.setStyleSheet(
-                            f"color: {text_secondary}; font-size: 11px; font-weight: 700;"
-                            "letter-spacing: 0.5px; background: transparent;"
-                        )
-
-        # Quick-action buttons
-        if hasattr(self, "_dash_btn_new"):
-            self._dash_btn_new.setStyleSheet(f"""
-                QPushButton {{
-                    background: {btn_primary_bg}; color: {btn_primary_text}; border: none;
-                    border-radius: 6px; font-size: 13px; font-weight: 600; padding: 0 16px;
-                }}
-                QPushButton:hover {{ background: {btn_primary_hover}; }}
-            """)
-        if hasattr(self, "_dash_btn_reports"):
-            self._dash_btn_reports.setStyleSheet(f"""
-                QPushButton {{
-                    background: transparent; color: {btn_outline_color};
-                    border: 1px solid {btn_outline_color}; border-radius: 6px;
-                    font-size: 13px; font-weight: 600; padding: 0 16px;
-                }}
-                QPushButton:hover {{ background: {btn_outline_hover_bg}; }}
-            """)
+                    row_widget.set_record(
+                        patient_id, name, result_str, confidence_value, self._result_severity(result_str)
+                    )
+                    if row_widget.isHidden():
+                        row_widget.setVisible(True)
+                elif not row_widget.isHidden():
+                    row_widget.setVisible(False)
+            self.empty_activity_label.setVisible(not recent)
+            self.col_header_widget.setVisible(bool(recent))
 
         # Clinical insight text
         if hasattr(self, "insight_label"):
@@ -1251,26 +1238,6 @@ class EyeShieldApp(QMainWindow):
             else:
                 insight = "All screenings reviewed — no action needed. Continue routine monitoring."
             self.insight_label.setText(insight)
-            self.insight_label.setStyleSheet(
-                f"font-size: 12px; color: {text_secondary}; background: transparent;"
-            )
-
-    @staticmethod
-    def _is_high_attention_result(result_text):
-        text = str(result_text or "").lower()
-        keywords = ("moderate", "severe", "proliferative", "refer", "urgent", "dr detected")
-        return any(word in text for word in keywords)
-
-    @staticmethod
-    def _extract_confidence_value(conf_text):
-        text = str(conf_text or "")
-        numeric = "".join(ch for ch in text if ch.isdigit() or ch == ".")
-        if not numeric:
-            return None
-        try:
-            return float(numeric)
-        except ValueError:
-            return None
 
     @staticmethod
     def get_nav_button_style(icon_only=False):
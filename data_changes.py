@@ -0,0 +1,87 @@
+"""
+Data changes module for EyeShield EMR application.
+Turns the trigger-maintained patient_records change log into Qt signals.
+"""
+
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from auth import DatabaseConnection
+from db_executor import database_executor
+from migrations import CHANGE_LOG_TABLE
+
+# Older entries are pruned; a reader that falls further behind resyncs in full
+CHANGE_LOG_RETENTION = 10000
+
+
+class DataChangeBus(QObject):
+    """Publishes patient_records changes committed since the last poll.
+
+    Every insert, delete and update of a displayed column appends a row to
+    the change log through SQLite triggers, so writes from any page, worker
+    or second application instance are seen. ``poll()`` reads only the
+    entries past the last sequence number on the database executor; when
+    nothing changed no signal is emitted and views skip their reload.
+    """
+
+    # {record_id: "insert" | "update" | "delete"}, last operation per record
+    records_changed = Signal(object)
+    # The log no longer covers everything since the last poll; reload in full
+    resync_required = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self._cursor: Optional[int] = None
+
+    def start(self) -> None:
+        """Mark the current log position as seen; call before the views first load"""
+        with DatabaseConnection.connection() as conn:
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (CHANGE_LOG_TABLE,)).fetchone()
+        self._cursor = int(row[0]) if row else 0
+
+    def poll(self) -> None:
+        """Check the change log in the background and emit if anything changed"""
+        if self._cursor is None:
+            self.start()
+        database_executor.submit(
+            self._read_changes,
+            self._cursor,
+            on_result=self._publish,
+            key="data-changes",
+            context=self,
+        )
+
+    @staticmethod
+    def _read_changes(cursor: int) -> tuple:
+        """(new cursor, {record_id: op}, complete) for log entries after ``cursor``"""
+        with DatabaseConnection.connection() as conn:
+            oldest = conn.execute(f"SELECT MIN(seq) FROM {CHANGE_LOG_TABLE}").fetchone()[0]
+            rows = conn.execute(
+                f"SELECT seq, record_id, op FROM {CHANGE_LOG_TABLE} WHERE seq > ? ORDER BY seq",
+                (cursor,),
+            ).fetchall()
+            if not rows:
+                return cursor, {}, True
+            latest = rows[-1][0]
+            if oldest is not None and latest - oldest >= CHANGE_LOG_RETENTION:
+                with conn:
+                    conn.execute(
+                        f"DELETE FROM {CHANGE_LOG_TABLE} WHERE seq <= ?",
+                        (latest - CHANGE_LOG_RETENTION,),
+                    )
+        complete = oldest is not None and oldest <= cursor + 1
+        return latest, {record_id: op for _, record_id, op in rows}, complete
+
+    def _publish(self, result: tuple) -> None:
+        cursor, changes, complete = result
+        if self._cursor is not None and cursor <= self._cursor:
+            return
+        self._cursor = cursor
+        if not complete:
+            self.resync_required.emit()
+        elif changes:
+            self.records_changed.emit(changes)
+
+
+data_changes = DataChangeBus()
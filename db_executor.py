@@ -0,0 +1,152 @@
+"""
+Database executor module for EyeShield EMR application.
+Runs SQLite work on a thread pool and delivers results to the GUI thread via signals.
+"""
+
+from typing import Callable, Optional
+
+import shiboken6
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtWidgets import QProgressBar
+
+
+# ============================================================
+# EXECUTOR
+# ============================================================
+
+class _TaskSignals(QObject):
+    succeeded = Signal(object)
+    failed = Signal(object)
+
+
+class BackgroundTask(QRunnable):
+    """One unit of background work; emits its result or exception when done"""
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = _TaskSignals()
+        self._fn = fn
+        self._args = args
+        self._kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self._fn(*self._args, **self._kwargs)
+        except Exception as err:
+            self.signals.failed.emit(err)
+        else:
+            self.signals.succeeded.emit(result)
+
+
+class TaskExecutor(QObject):
+    """Thread pool for blocking calls with GUI-thread callbacks.
+
+    Tasks submitted under the same ``key`` supersede each other: only the
+    newest task's callbacks run, so rapid refreshes never apply stale data.
+    Callbacks are skipped when their ``context`` widget has been destroyed.
+    """
+
+    MAX_THREADS = 2
+
+    busy_changed = Signal(bool)
+
+    def __init__(self, max_threads: Optional[int] = None):
+        super().__init__()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max_threads or self.MAX_THREADS)
+        self._pending = set()
+        self._latest = {}
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        on_result: Optional[Callable] = None,
+        on_error: Optional[Callable] = None,
+        key: Optional[str] = None,
+        context: Optional[QObject] = None,
+        indicator: Optional["LoadingBar"] = None,
+        **kwargs,
+    ) -> BackgroundTask:
+        task = BackgroundTask(fn, args, kwargs)
+        if key is not None:
+            self._latest[key] = task
+        if indicator is not None:
+            indicator.begin()
+
+        def finish(result, error):
+            self._pending.discard(task)
+            if indicator is not None and shiboken6.isValid(indicator):
+                indicator.end()
+            if not self._pending:
+                self.busy_changed.emit(False)
+            if key is not None:
+                if self._latest.get(key) is not task:
+                    return
+                del self._latest[key]
+            if context is not None and not shiboken6.isValid(context):
+                return
+            if error is None:
+                if on_result is not None:
+                    on_result(result)
+            elif on_error is not None:
+                on_error(error)
+            else:
+                print(f"[EyeShield] Background task {getattr(fn, '__name__', fn)} failed: {error}")
+
+        task.signals.succeeded.connect(lambda result: finish(result, None))
+        task.signals.failed.connect(lambda error: finish(None, error))
+
+        if not self._pending:
+            self.busy_changed.emit(True)
+        self._pending.add(task)
+        self._pool.start(task)
+        return task
+
+    def is_busy(self) -> bool:
+        return bool(self._pending)
+
+    def wait_for_done(self, timeout_ms: int = 5000) -> bool:
+        return self._pool.waitForDone(timeout_ms)
+
+    def shutdown(self) -> None:
+        self._pool.clear()
+        self.wait_for_done()
+
+
+class DatabaseExecutor(TaskExecutor):
+    """Executor for SQLite work; two threads keep reads flowing beside a writer"""
+
+    MAX_THREADS = 2
+
+
+database_executor = DatabaseExecutor()
+
+
+class LoadingBar(QProgressBar):
+    """Thin indeterminate progress bar shown while background tasks are running"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._active = 0
+        self.setRange(0, 0)
+        self.setTextVisible(False)
+        self.setFixedHeight(3)
+        policy = self.sizePolicy()
+        policy.setRetainSizeWhenHidden(True)
+        self.setSizePolicy(policy)
+        self.setStyleSheet(
+            "QProgressBar { background: transparent; border: none; }"
+            "QProgressBar::chunk { background: #0d6efd; }"
+        )
+        self.setVisible(False)
+
+    def begin(self) -> None:
+        self._active += 1
+        self.setVisible(True)
+
+    def end(self) -> None:
+        self._active = max(0, self._active - 1)
+        if not self._active:
+            self.setVisible(False)
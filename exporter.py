@@ -0,0 +1,246 @@
+"""
+Exporter module for EyeShield EMR application.
+Streams patient_records to CSV, gzip CSV, Parquet or Arrow files on a background thread.
+"""
+
+import csv
+import gzip
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+from auth import DatabaseConnection
+from migrations import CONFIDENCE_VALUE_SQL, HBA1C_VALUE_SQL
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pc = None
+    pq = None
+
+
+# Rows pulled from the SQLite cursor per step; memory use is bounded by this
+EXPORT_BATCH_SIZE = 5000
+# Rows buffered per Parquet row group / Arrow record batch
+COLUMNAR_GROUP_SIZE = 50000
+
+# (CSV header, column name in columnar files, SQL expression)
+EXPORT_COLUMNS = (
+    ("Patient ID", "patient_id", "patient_id"),
+    ("Name", "name", "name"),
+    ("Result", "result", "result"),
+    ("Confidence", "confidence", "confidence"),
+    ("Diabetes Type", "diabetes_type", "diabetes_type"),
+    ("HbA1c", "hba1c", "hba1c"),
+    ("Record Status", "record_status", "CASE WHEN archived_at IS NULL THEN 'Active' ELSE 'Archived' END"),
+    ("Archived At", "archived_at", "archived_at"),
+    ("Archived By", "archived_by", "archived_by"),
+)
+
+# (column name, Arrow type, SQL expression) for Parquet and Arrow files. Confidence
+# and HbA1c come from the numeric backfill columns, parsed from the text for rows
+# the backfill has not reached yet; archived_at is stored as a timestamp.
+COLUMNAR_COLUMNS = (
+    ("patient_id", "string", "patient_id"),
+    ("name", "string", "name"),
+    ("result", "string", "result"),
+    ("confidence", "float64", f"COALESCE(confidence_value, {CONFIDENCE_VALUE_SQL.format(row='')})"),
+    ("diabetes_type", "string", "diabetes_type"),
+    ("hba1c", "float64", f"COALESCE(hba1c_value, {HBA1C_VALUE_SQL.format(row='')})"),
+    ("record_status", "string", "CASE WHEN archived_at IS NULL THEN 'Active' ELSE 'Archived' END"),
+    ("archived_at", "timestamp", "archived_at"),
+    ("archived_by", "string", "archived_by"),
+)
+# Format of archived_at and the other timestamps written by the app
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# format -> (file dialog filter, default extension, needs pyarrow)
+EXPORT_FORMATS = {
+    "csv": ("CSV Files (*.csv)", ".csv", False),
+    "csv.gz": ("Compressed CSV (*.csv.gz)", ".csv.gz", False),
+    "parquet": ("Parquet Files (*.parquet)", ".parquet", True),
+    "arrow": ("Arrow IPC Files (*.arrow)", ".arrow", True),
+}
+
+
+def available_formats() -> list:
+    """Export formats usable in this installation, CSV first"""
+    return [name for name, (_, _, columnar) in EXPORT_FORMATS.items() if pa is not None or not columnar]
+
+
+def format_for_filter(name_filter: str) -> str:
+    for name, (dialog_filter, _, _) in EXPORT_FORMATS.items():
+        if dialog_filter == name_filter:
+            return name
+    return "csv"
+
+
+def with_extension(path: str, export_format: str) -> str:
+    extension = EXPORT_FORMATS[export_format][1]
+    return path if path.lower().endswith(extension) else path + extension
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _arrow_type(kind: str):
+    if kind == "float64":
+        return pa.float64()
+    if kind == "timestamp":
+        return pa.timestamp("s")
+    return pa.string()
+
+
+def _arrow_array(values: list, kind: str):
+    """Build one column; timestamp text is parsed in bulk, unparseable values become null"""
+    if kind == "float64":
+        return pa.array([_float(value) for value in values], pa.float64())
+    if kind == "timestamp":
+        text = pa.array([_text(value) for value in values], pa.string())
+        return pc.strptime(text, format=TIMESTAMP_FORMAT, unit="s", error_is_null=True)
+    return pa.array([_text(value) for value in values], pa.string())
+
+
+# ============================================================
+# EXPORT JOB
+# ============================================================
+
+class RecordExportJob:
+    """Copy every row of a patient_records query to a file without materializing it.
+
+    Rows are stepped from a dedicated read connection in ``EXPORT_BATCH_SIZE``
+    chunks inside one read transaction, so the file is a consistent snapshot
+    and memory stays flat at any row count. Output goes to a temporary file
+    beside the target and replaces it only when the export completes; a
+    cancelled or failed export leaves no partial file behind.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        export_format: str,
+        source: str,
+        params=(),
+        order_by: str = "id DESC",
+        progress: Optional[Callable[[int, int], None]] = None,
+    ):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        if EXPORT_FORMATS[export_format][2] and pa is None:
+            raise RuntimeError("Parquet and Arrow export need the optional 'pyarrow' package")
+        self.path = path
+        self.export_format = export_format
+        self.source = source
+        self.params = list(params)
+        self.order_by = order_by
+        self.progress = progress
+        self._cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def run(self) -> dict:
+        summary = {"path": self.path, "rows": 0, "total": 0, "cancelled": False, "elapsed": 0.0, "error": ""}
+        started = time.perf_counter()
+        conn = DatabaseConnection.open_connection()
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), prefix=".export-")
+        os.close(fd)
+        try:
+            conn.execute("BEGIN")
+            summary["total"] = conn.execute(f"SELECT COUNT(*) FROM {self.source}", self.params).fetchone()[0]
+            columnar = EXPORT_FORMATS[self.export_format][2]
+            columns = COLUMNAR_COLUMNS if columnar else EXPORT_COLUMNS
+            cursor = conn.execute(
+                f"SELECT {', '.join(sql for _, _, sql in columns)} "
+                f"FROM {self.source} ORDER BY {self.order_by}",
+                self.params,
+            )
+            writer = self._write_columnar if columnar else self._write_csv
+            summary["rows"] = writer(cursor, temp_path, summary["total"])
+            if self.is_cancelled():
+                summary["cancelled"] = True
+            else:
+                os.replace(temp_path, self.path)
+        finally:
+            conn.rollback()
+            conn.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        summary["elapsed"] = time.perf_counter() - started
+        return summary
+
+    def _batches(self, cursor, total: int):
+        """Yield row batches until the cursor is drained or the job is cancelled"""
+        written = 0
+        while not self.is_cancelled():
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            yield rows
+            written += len(rows)
+            if self.progress is not None:
+                self.progress(written, total)
+
+    def _write_csv(self, cursor, temp_path: str, total: int) -> int:
+        if self.export_format == "csv.gz":
+            handle = gzip.open(temp_path, "wt", newline="", encoding="utf-8", compresslevel=6)
+        else:
+            handle = open(temp_path, "w", newline="", encoding="utf-8")
+        written = 0
+        with handle:
+            writer = csv.writer(handle)
+            writer.writerow([header for header, _, _ in EXPORT_COLUMNS])
+            for rows in self._batches(cursor, total):
+                writer.writerows(rows)
+                written += len(rows)
+        return written
+
+    def _write_columnar(self, cursor, temp_path: str, total: int) -> int:
+        schema = pa.schema([(name, _arrow_type(kind)) for name, kind, _ in COLUMNAR_COLUMNS])
+        if self.export_format == "parquet":
+            writer = pq.ParquetWriter(temp_path, schema, compression="zstd")
+        else:
+            writer = pa.ipc.new_file(temp_path, schema)
+
+        columns = [[] for _ in COLUMNAR_COLUMNS]
+        buffered = 0
+        written = 0
+
+        def flush():
+            nonlocal buffered
+            if buffered:
+                arrays = [_arrow_array(values, kind) for values, (_, kind, _) in zip(columns, COLUMNAR_COLUMNS)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                for values in columns:
+                    values.clear()
+                buffered = 0
+
+        try:
+            for rows in self._batches(cursor, total):
+                for row in rows:
+                    for values, value in zip(columns, row):
+                        values.append(value)
+                buffered += len(rows)
+                written += len(rows)
+                if buffered >= COLUMNAR_GROUP_SIZE:
+                    flush()
+            flush()
+        finally:
+            writer.close()
+        return written
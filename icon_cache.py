@@ -0,0 +1,108 @@
+"""
+Icon cache module for EyeShield EMR application.
+Renders recolored SVG icons once per (path, color, size, pixel ratio) and serves repeats from memory.
+"""
+
+import os
+import re
+from typing import Iterable, Optional
+
+from PySide6.QtCore import QByteArray
+from PySide6.QtGui import QIcon, QImage, QPainter, QPixmap
+from PySide6.QtSvg import QSvgRenderer
+
+
+# Stroke/fill values in the bundled icons that stand for "the icon color"
+_RECOLOR_PATTERN = re.compile(r'(stroke|fill)="(?:currentColor|black|#000|#000000|#e3e3e3)"')
+
+
+def recolor_svg(svg_text: str, color: str) -> str:
+    """Replace the placeholder stroke/fill colors with ``color`` and drop white fills"""
+    svg_text = _RECOLOR_PATTERN.sub(lambda match: f'{match.group(1)}="{color}"', svg_text)
+    return svg_text.replace('fill="white"', 'fill="transparent"')
+
+
+def render_svg(data, size: int, device_pixel_ratio: float = 1.0) -> QPixmap:
+    """Rasterize SVG bytes (or a path) into a square pixmap of ``size`` logical pixels"""
+    renderer = QSvgRenderer(data)
+    if not renderer.isValid():
+        return QPixmap()
+    pixels = max(1, round(size * device_pixel_ratio))
+    image = QImage(pixels, pixels, QImage.Format_ARGB32_Premultiplied)
+    image.fill(0)
+    painter = QPainter(image)
+    renderer.render(painter)
+    painter.end()
+    image.setDevicePixelRatio(device_pixel_ratio)
+    return QPixmap.fromImage(image)
+
+
+class SvgIconCache:
+    """Recolored, rasterized SVG icons keyed by (path, color, size, device pixel ratio).
+
+    SVG sources are read once and re-read only when their mtime changes, so
+    page changes and theme switches hand back pixmaps that are already
+    rendered. GUI thread only (QPixmap).
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._pixmaps = {}
+        self._icons = {}
+
+    def _source(self, path: str) -> Optional[tuple]:
+        """(mtime, svg text) for ``path``; None if it cannot be read"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._sources.get(path)
+        if cached and cached[0] == mtime:
+            return cached
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cached = (mtime, f.read())
+        except OSError:
+            return None
+        self._sources[path] = cached
+        return cached
+
+    def pixmap(self, path: str, color: Optional[str] = None, size: int = 64, device_pixel_ratio: float = 1.0) -> QPixmap:
+        """Icon at ``size`` logical pixels; ``color`` None keeps the SVG's own colors"""
+        source = self._source(path) if path else None
+        if source is None:
+            return QPixmap()
+        key = (path, source[0], color, size, device_pixel_ratio)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is None:
+            svg_text = recolor_svg(source[1], color) if color else source[1]
+            pixmap = render_svg(QByteArray(svg_text.encode("utf-8")), size, device_pixel_ratio)
+            self._pixmaps[key] = pixmap
+        return pixmap
+
+    def icon(self, path: str, color: Optional[str] = None, size: int = 64, device_pixel_ratio: float = 1.0) -> QIcon:
+        source = self._source(path) if path else None
+        if source is None:
+            return QIcon()
+        key = (path, source[0], color, size, device_pixel_ratio)
+        icon = self._icons.get(key)
+        if icon is None:
+            pixmap = self.pixmap(path, color, size, device_pixel_ratio)
+            icon = QIcon(pixmap) if not pixmap.isNull() else QIcon()
+            self._icons[key] = icon
+        return icon
+
+    def prewarm(self, paths: Iterable[str], colors: Iterable[Optional[str]], size: int, device_pixel_ratio: float = 1.0):
+        """Render every path/color combination ahead of first use"""
+        colors = list(colors)
+        for path in paths:
+            for color in colors:
+                self.icon(path, color, size, device_pixel_ratio)
+
+    def clear(self):
+        self._sources.clear()
+        self._pixmaps.clear()
+        self._icons.clear()
+
+
+svg_icons = SvgIconCache()
@@ -0,0 +1,262 @@
+"""
+Image cache module for EyeShield EMR application.
+Decodes fundus images off the GUI thread and keeps scaled copies in a content-keyed LRU cache.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QObject, QSize, Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+from db_executor import TaskExecutor
+
+
+IMAGE_CACHE_BUDGET_BYTES = 192 * 1024 * 1024
+# Preview boxes used by the screening upload panel and the results page
+UPLOAD_PREVIEW_SIZE = (450, 400)
+RESULTS_PREVIEW_SIZE = (460, 360)
+
+
+# ============================================================
+# DECODING (safe on any thread)
+# ============================================================
+
+def _reader(source) -> tuple:
+    """QImageReader over a path, bytes or open device; the buffer is returned so it outlives the read"""
+    if isinstance(source, (bytes, bytearray, QByteArray)):
+        buffer = QBuffer()
+        buffer.setData(QByteArray(source))
+        buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        reader = QImageReader(buffer)
+    elif isinstance(source, QIODevice):
+        # Decodes straight from the device without reading the whole file first
+        buffer = None
+        reader = QImageReader(source)
+    else:
+        buffer = None
+        reader = QImageReader(source)
+    reader.setAutoTransform(True)
+    return reader, buffer
+
+
+def read_image(source, max_size: Optional[tuple] = None) -> QImage:
+    """Decode a path, bytes or open device, letting the codec downscale to fit ``max_size``.
+
+    JPEG decoders scale during decode, which is far cheaper than decoding
+    full resolution and calling QImage.scaled afterwards.
+    """
+    return _read(source, max_size)[0]
+
+
+def _read(source, max_size: Optional[tuple] = None) -> tuple:
+    """Decode like read_image and also return the original (pre-scaling) size"""
+    reader, _buffer = _reader(source)
+    original = reader.size()
+    if max_size is not None:
+        bounds = QSize(*max_size)
+        if original.isValid() and (original.width() > bounds.width() or original.height() > bounds.height()):
+            reader.setScaledSize(original.scaled(bounds, Qt.AspectRatioMode.KeepAspectRatio))
+
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Unable to read image: {reader.errorString()}")
+    return image, original if original.isValid() else image.size()
+
+
+def _fit(image: QImage, max_size: tuple) -> QImage:
+    width, height = max_size
+    if image.width() <= width and image.height() <= height:
+        return image
+    return image.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class ImageCache:
+    """Thread-safe LRU of decoded QImages bounded by total pixel memory"""
+
+    def __init__(self, budget_bytes: int = IMAGE_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[QImage]:
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key, image: QImage) -> None:
+        cost = image.sizeInBytes()
+        if cost > self.budget_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._used -= previous.sizeInBytes()
+            self._entries[key] = image
+            self._used += cost
+            while self._used > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._used -= evicted.sizeInBytes()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._used = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return self._used
+
+
+class ImageHandle:
+    """One decoded source image shared by every panel that shows it.
+
+    Holds the scaled previews requested at load time; the full-resolution
+    image is decoded on demand through ``ImageDecodeService.load_full``.
+    """
+
+    def __init__(self, key: str, path: str, source_size: QSize, previews: dict):
+        self.key = key
+        self.path = path
+        self.source_size = source_size
+        self._previews = previews
+        self._pixmaps = {}
+
+    def image(self, max_size: tuple) -> Optional[QImage]:
+        return self._previews.get(tuple(max_size))
+
+    def pixmap(self, max_size: tuple) -> QPixmap:
+        """GUI thread only; converted once and reused"""
+        max_size = tuple(max_size)
+        pixmap = self._pixmaps.get(max_size)
+        if pixmap is None:
+            image = self._previews.get(max_size)
+            pixmap = QPixmap.fromImage(image) if image is not None else QPixmap()
+            self._pixmaps[max_size] = pixmap
+        return pixmap
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class ImageDecodeService(TaskExecutor):
+    """Decodes images on worker threads and serves repeats from the cache.
+
+    Cache keys are content hashes, so the same file picked twice (or copied
+    under another name) is decoded once. A path/mtime memo skips rehashing
+    files that have not changed.
+    """
+
+    MAX_THREADS = 2
+
+    def __init__(self, cache: Optional[ImageCache] = None):
+        super().__init__()
+        self.cache = cache or ImageCache()
+        self._path_keys = {}
+        self._source_sizes = {}
+        self._keys_lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path: str) -> tuple:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _known_key(self, path: str) -> Optional[str]:
+        try:
+            stamp = self._stamp(path)
+        except OSError:
+            return None
+        with self._keys_lock:
+            known = self._path_keys.get(path)
+        return known[1] if known and known[0] == stamp else None
+
+    def _read_source(self, path: str) -> tuple:
+        """Return (content key, raw bytes); bytes are None when the key was memoised"""
+        key = self._known_key(path)
+        if key is not None:
+            return key, None
+        stamp = self._stamp(path)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        key = hashlib.sha1(data).hexdigest()
+        with self._keys_lock:
+            self._path_keys[path] = (stamp, key)
+        return key, data
+
+    def _load(self, path: str, sizes: tuple) -> ImageHandle:
+        key, data = self._read_source(path)
+        previews = {size: self.cache.get((key, size)) for size in sizes}
+        with self._keys_lock:
+            source_size = self._source_sizes.get(key)
+        missing = [size for size, image in previews.items() if image is None]
+
+        if missing:
+            if data is None:
+                with open(path, "rb") as handle:
+                    data = handle.read()
+            largest = (max(w for w, _ in missing), max(h for _, h in missing))
+            decoded, source_size = _read(data, largest)
+            for size in missing:
+                previews[size] = _fit(decoded, size)
+                self.cache.put((key, size), previews[size])
+            with self._keys_lock:
+                self._source_sizes[key] = source_size
+
+        return ImageHandle(key, path, source_size or QSize(), previews)
+
+    def _load_full(self, handle: ImageHandle) -> QImage:
+        image = self.cache.get((handle.key, None))
+        if image is None:
+            image = read_image(handle.path)
+            self.cache.put((handle.key, None), image)
+        return image
+
+    def peek(self, path: str, max_size: tuple) -> Optional[QImage]:
+        """Cached preview for ``path`` without touching a worker; None on a miss"""
+        key = self._known_key(path)
+        return self.cache.get((key, tuple(max_size))) if key else None
+
+    def load(
+        self,
+        path: str,
+        sizes: tuple,
+        on_result: Callable[[ImageHandle], None],
+        on_error: Optional[Callable] = None,
+        key: Optional[str] = None,
+        context: Optional[QObject] = None,
+        indicator=None,
+    ):
+        """Decode ``path`` once and deliver an ImageHandle with a preview per (w, h) in ``sizes``"""
+        return self.submit(
+            self._load,
+            path,
+            tuple(tuple(size) for size in sizes),
+            on_result=on_result,
+            on_error=on_error,
+            key=key,
+            context=context,
+            indicator=indicator,
+        )
+
+    def load_full(
+        self,
+        handle: ImageHandle,
+        on_result: Callable[[QImage], None],
+        on_error: Optional[Callable] = None,
+        context: Optional[QObject] = None,
+    ):
+        return self.submit(self._load_full, handle, on_result=on_result, on_error=on_error, context=context)
+
+
+image_decoder = ImageDecodeService()
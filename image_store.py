@@ -0,0 +1,204 @@
+"""
+Image store module for EyeShield EMR application.
+Keeps uploaded fundus images in a content-addressed, deduplicated on-disk store.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Sequence
+
+from PySide6.QtCore import QFile, QIODevice
+from PySide6.QtGui import QImageReader, QImageWriter
+
+from auth import DB_FILE
+
+
+# Sits beside the database so backups of the data directory carry both
+IMAGE_STORE_DIR = os.environ.get(
+    "EYESHIELD_IMAGE_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(DB_FILE)), "image_store"),
+)
+READ_CHUNK_SIZE = 256 * 1024
+# Partial writes older than this belong to a crashed save
+STALE_TEMP_SECONDS = 60 * 60
+TEMP_PREFIX = ".incoming-"
+# Formats already compact enough to keep byte-for-byte
+PASSTHROUGH_FORMATS = {"jpeg", "jpg", "png", "webp"}
+
+
+class ImageStore:
+    """Content-addressed image files under ``<root>/<ab>/<cd>/<sha256>.<ext>``.
+
+    The reference is the SHA-256 of the uploaded bytes, so storing the same
+    file twice is a hash and a stat. Uncompressed formats (BMP, TIFF, ...)
+    can be re-encoded to lossless PNG; the reference still names the
+    original content.
+    """
+
+    def __init__(self, root: str = IMAGE_STORE_DIR, reencode_lossless: bool = True):
+        self.root = root
+        self.reencode_lossless = reencode_lossless
+        self._known = {}
+        self._lock = threading.Lock()
+        # References a save has stored but not yet recorded; removal leaves them alone
+        self._held = Counter()
+        self._removal_lock = threading.Lock()
+
+    # ---------- addressing ----------
+
+    @staticmethod
+    def is_ref(ref: str) -> bool:
+        return isinstance(ref, str) and len(ref) == 64 and all(c in "0123456789abcdef" for c in ref)
+
+    def _shard_dir(self, ref: str) -> str:
+        return os.path.join(self.root, ref[:2], ref[2:4])
+
+    def path_for(self, ref: str) -> Optional[str]:
+        """Path of the stored file for ``ref``, or None if it is not in the store"""
+        if not self.is_ref(ref):
+            return None
+        shard = self._shard_dir(ref)
+        try:
+            names = os.listdir(shard)
+        except OSError:
+            return None
+        for name in names:
+            if name.startswith(ref + "."):
+                return os.path.join(shard, name)
+        return None
+
+    def contains(self, ref: str) -> bool:
+        return self.path_for(ref) is not None
+
+    # ---------- writing ----------
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(READ_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _content_ref(self, path: str) -> str:
+        """SHA-256 of ``path``, memoised by mtime and size so repeat uploads skip hashing"""
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            known = self._known.get(path)
+        if known and known[0] == stamp:
+            return known[1]
+        ref = self.hash_file(path)
+        with self._lock:
+            self._known[path] = (stamp, ref)
+        return ref
+
+    @contextmanager
+    def holding(self, source_paths: Sequence[str]) -> Iterator[list]:
+        """Store ``source_paths`` and yield their references.
+
+        Record the references inside the block: until it exits, deleting the
+        last record that uses the same image cannot remove the file.
+        """
+        refs = [self._content_ref(path) for path in source_paths]
+        with self._removal_lock:
+            self._held.update(refs)
+        try:
+            for path, ref in zip(source_paths, refs):
+                self._store(path, ref)
+            yield refs
+        finally:
+            with self._removal_lock:
+                self._held.subtract(refs)
+                self._held = +self._held
+
+    def _store(self, source_path: str, ref: str):
+        if self.contains(ref):
+            return
+        shard = self._shard_dir(ref)
+        os.makedirs(shard, exist_ok=True)
+        image_format = bytes(QImageReader.imageFormat(source_path)).decode("ascii", "ignore").lower()
+        fd, temp_path = tempfile.mkstemp(dir=shard, prefix=TEMP_PREFIX)
+        os.close(fd)
+        try:
+            extension = self._write_payload(source_path, image_format, temp_path)
+            # Atomic publish: readers never see a partially written file
+            os.replace(temp_path, os.path.join(shard, f"{ref}.{extension}"))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _write_payload(self, source_path: str, image_format: str, target_path: str) -> str:
+        if self.reencode_lossless and image_format and image_format not in PASSTHROUGH_FORMATS:
+            image = QImageReader(source_path).read()
+            if not image.isNull():
+                writer = QImageWriter(target_path, b"png")
+                # Qt's PNG writer derives the zlib level from quality; 0 is maximum compression
+                writer.setQuality(0)
+                if writer.write(image):
+                    return "png"
+        shutil.copyfile(source_path, target_path)
+        extension = os.path.splitext(source_path)[1].lstrip(".").lower()
+        return extension or image_format or "bin"
+
+    # ---------- reading ----------
+
+    def open(self, ref: str) -> QFile:
+        """Read-only device over the stored image, so QImageReader decodes it incrementally.
+
+        Raises FileNotFoundError if the image is missing.
+        """
+        path = self.path_for(ref)
+        if path is None:
+            raise FileNotFoundError(f"Image {ref} is not in the store")
+        device = QFile(path)
+        if not device.open(QIODevice.OpenModeFlag.ReadOnly):
+            raise FileNotFoundError(f"Image {ref} could not be opened: {device.errorString()}")
+        return device
+
+    # ---------- removal ----------
+
+    def _remove_unreferenced(self, path: str, ref: str, is_referenced: Callable[[str], bool]) -> bool:
+        # Checked under the lock so a save cannot store and record the ref in between
+        with self._removal_lock:
+            if self._held[ref] or is_referenced(ref):
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def remove(self, ref: str, is_referenced: Callable[[str], bool]) -> bool:
+        """Delete the stored file for ``ref`` once no record references it"""
+        path = self.path_for(ref)
+        return path is not None and self._remove_unreferenced(path, ref, is_referenced)
+
+    def sweep(self, is_referenced: Callable[[str], bool]) -> int:
+        """Remove files no record references, plus stale partial writes; returns the count"""
+        removed = 0
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for shard, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(shard, name)
+                ref = name.split(".", 1)[0]
+                if name.startswith(TEMP_PREFIX):
+                    try:
+                        if os.stat(path).st_mtime < stale_before:
+                            os.remove(path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+                elif self.is_ref(ref) and self._remove_unreferenced(path, ref, is_referenced):
+                    removed += 1
+        return removed
+
+
+image_store = ImageStore()
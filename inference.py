@@ -0,0 +1,302 @@
+"""
+Inference module for EyeShield EMR application.
+Classifies fundus images for diabetic retinopathy on a warm CPU backend off the GUI thread.
+"""
+
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject
+
+from db_executor import TaskExecutor
+from preprocessing import INPUT_SIZE, preprocess_image
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional dependency
+    ort = None
+
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+MODEL_DIR = os.environ.get(
+    "EYESHIELD_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"),
+)
+ONNX_MODEL_FILE = "dr_classifier.onnx"
+NUMPY_MODEL_FILE = "dr_classifier.npz"
+
+# Ordered by ICDR grade; the first label keeps the wording used across the UI
+# so RESULT_GRADE_SQL and the dashboard keep classifying saved results.
+DR_LABELS = ("No DR Detected", "Mild DR", "Moderate DR", "Severe DR", "Proliferative DR")
+
+
+# ============================================================
+# RESULTS
+# ============================================================
+
+class InferenceResult:
+    """Outcome of classifying one image, including per-stage latency"""
+
+    def __init__(
+        self,
+        result_class: str,
+        confidence: Optional[float] = None,
+        probabilities: Optional[dict] = None,
+        backend: str = "",
+        preprocess_ms: float = 0.0,
+        inference_ms: float = 0.0,
+        error: str = "",
+    ):
+        self.result_class = result_class
+        self.confidence = confidence
+        self.probabilities = probabilities or {}
+        self.backend = backend
+        self.preprocess_ms = preprocess_ms
+        self.inference_ms = inference_ms
+        self.error = error
+
+    @classmethod
+    def unavailable(cls, error: str) -> "InferenceResult":
+        return cls("Pending", error=error)
+
+    @property
+    def ok(self) -> bool:
+        return self.confidence is not None
+
+    @property
+    def total_ms(self) -> float:
+        return self.preprocess_ms + self.inference_ms
+
+    @property
+    def confidence_text(self) -> str:
+        if self.confidence is None:
+            return "Pending"
+        return f"Confidence: {self.confidence * 100:.1f}%"
+
+    @property
+    def latency_text(self) -> str:
+        if not self.ok:
+            return ""
+        return (
+            f"{self.backend}: {self.total_ms:.0f} ms "
+            f"(preprocess {self.preprocess_ms:.0f} ms, model {self.inference_ms:.0f} ms)"
+        )
+
+
+def _softmax(logits):
+    shifted = logits - np.max(logits, axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+# ============================================================
+# ENGINES
+# ============================================================
+
+class InferenceEngine(ABC):
+    """Backend interface: load weights once, then map a preprocessed tensor to grade probabilities"""
+
+    name = "engine"
+
+    def __init__(self, model_path: str):
+        self.model_path = model_path
+        self.input_size = INPUT_SIZE
+        self.labels = DR_LABELS
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the model weights; called once before the first prediction"""
+
+    @abstractmethod
+    def _run(self, batch):
+        """Map an Nx3xHxW batch to Nxgrades logits"""
+
+    def _result(self, probabilities, preprocess_ms: float, inference_ms: float) -> InferenceResult:
+        best = int(np.argmax(probabilities))
+        return InferenceResult(
+            self.labels[best],
+            float(probabilities[best]),
+            {label: float(p) for label, p in zip(self.labels, probabilities)},
+            backend=self.name,
+            preprocess_ms=preprocess_ms,
+            inference_ms=inference_ms,
+        )
+
+    def predict(self, image_path: str) -> InferenceResult:
+        started = time.perf_counter()
+        tensor = preprocess_image(image_path, self.input_size)
+        preprocessed = time.perf_counter()
+        probabilities = _softmax(np.asarray(self._run(tensor), dtype=np.float64).reshape(-1))
+        finished = time.perf_counter()
+        return self._result(probabilities, (preprocessed - started) * 1000, (finished - preprocessed) * 1000)
+
+    def predict_batch(self, tensors: list) -> list:
+        """Classify already-preprocessed 1x3xHxW tensors in one backend call.
+
+        Model time is split evenly across the batch; preprocessing happened elsewhere.
+        """
+        started = time.perf_counter()
+        logits = np.asarray(self._run(np.concatenate(tensors)), dtype=np.float64)
+        probabilities = _softmax(logits.reshape(len(tensors), -1))
+        per_image_ms = (time.perf_counter() - started) * 1000 / len(tensors)
+        return [self._result(row, 0.0, per_image_ms) for row in probabilities]
+
+
+class OnnxInferenceEngine(InferenceEngine):
+    """ONNX Runtime CPU session; expects a 1x3xHxW input and grade logits output"""
+
+    name = "ONNX Runtime"
+
+    def load(self) -> None:
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = max(1, (os.cpu_count() or 2) - 1)
+        self._session = ort.InferenceSession(
+            self.model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        # Exported models often pin the batch dimension to 1
+        self._fixed_batch = model_input.shape[0] == 1
+        height = model_input.shape[-1]
+        if isinstance(height, int):
+            self.input_size = height
+
+        # First run allocates arenas and picks kernels; pay it here, not on the first patient
+        self._run(np.zeros((1, 3, self.input_size, self.input_size), dtype=np.float32))
+
+    def _run(self, batch):
+        if self._fixed_batch and len(batch) > 1:
+            return np.concatenate([self._run(batch[i:i + 1]) for i in range(len(batch))])
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+class NumpyInferenceEngine(InferenceEngine):
+    """Pure NumPy reference model: per-channel pooled features through a linear head.
+
+    The .npz holds ``weights`` (grades x features) and ``bias`` (grades); features
+    are the global mean and standard deviation of each normalised channel.
+    """
+
+    name = "NumPy reference"
+
+    def load(self) -> None:
+        with np.load(self.model_path) as model:
+            self._weights = np.asarray(model["weights"], dtype=np.float32)
+            self._bias = np.asarray(model["bias"], dtype=np.float32)
+            if "input_size" in model:
+                self.input_size = int(model["input_size"])
+        if self._weights.shape != (len(self.labels), 6):
+            raise ValueError(f"Expected weights of shape ({len(self.labels)}, 6), got {self._weights.shape}")
+
+    def _run(self, batch):
+        channels = batch.reshape(len(batch), 3, -1)
+        features = np.concatenate([channels.mean(axis=2), channels.std(axis=2)], axis=1)
+        return features @ self._weights.T + self._bias
+
+
+def create_engine(model_dir: str = MODEL_DIR) -> InferenceEngine:
+    """Pick the best available backend for the model files present in ``model_dir``"""
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+
+    onnx_path = os.path.join(model_dir, ONNX_MODEL_FILE)
+    numpy_path = os.path.join(model_dir, NUMPY_MODEL_FILE)
+    if ort is not None and os.path.exists(onnx_path):
+        return OnnxInferenceEngine(onnx_path)
+    if os.path.exists(numpy_path):
+        return NumpyInferenceEngine(numpy_path)
+    if os.path.exists(onnx_path):
+        raise RuntimeError("onnxruntime is not installed")
+    raise RuntimeError(f"No DR model found in {model_dir}")
+
+
+# ============================================================
+# SERVICE
+# ============================================================
+
+class InferenceService(TaskExecutor):
+    """Loads the engine lazily on a background thread and keeps it warm.
+
+    One worker thread serialises predictions; the backend itself uses the
+    remaining cores, so stacking requests would only add contention.
+    """
+
+    MAX_THREADS = 1
+
+    def __init__(self, model_dir: str = MODEL_DIR):
+        super().__init__()
+        self.model_dir = model_dir
+        self._engine = None
+        self._load_error = ""
+        self._load_lock = threading.Lock()
+
+    @property
+    def load_error(self) -> str:
+        return self._load_error
+
+    def load_engine(self) -> Optional[InferenceEngine]:
+        """Load the engine on first use (blocking; call from a worker thread)"""
+        with self._load_lock:
+            if self._engine is None and not self._load_error:
+                started = time.perf_counter()
+                try:
+                    engine = create_engine(self.model_dir)
+                    engine.load()
+                except Exception as err:
+                    self._load_error = str(err)
+                    print(f"[EyeShield] DR model unavailable: {err}")
+                else:
+                    self._engine = engine
+                    print(
+                        f"[EyeShield] Loaded DR model ({engine.name}) in "
+                        f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                    )
+            return self._engine
+
+    def _classify(self, image_path: str) -> InferenceResult:
+        engine = self.load_engine()
+        if engine is None:
+            return InferenceResult.unavailable(self._load_error)
+        # Timing is reported through result.latency_text, which the results page shows
+        return engine.predict(image_path)
+
+    def warm_up(self) -> None:
+        """Start loading the model in the background without blocking the caller"""
+        if self._engine is None and not self._load_error:
+            self.submit(self.load_engine, key="warm-up")
+
+    def is_ready(self) -> bool:
+        return self._engine is not None
+
+    def classify(
+        self,
+        image_path: str,
+        on_result: Callable[[InferenceResult], None],
+        context: Optional[QObject] = None,
+        indicator=None,
+    ):
+        """Classify on the worker; errors are reported as an unavailable result"""
+        return self.submit(
+            self._classify,
+            image_path,
+            on_result=on_result,
+            on_error=lambda err: on_result(InferenceResult.unavailable(str(err))),
+            key="classify",
+            context=context,
+            indicator=indicator,
+        )
+
+
+inference_service = InferenceService()
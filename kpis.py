@@ -0,0 +1,85 @@
+"""
+KPI module for EyeShield EMR application.
+Reads, verifies and rebuilds the trigger-maintained dashboard_summary counters.
+"""
+
+import argparse
+import math
+import sqlite3
+from typing import Optional
+
+from auth import DatabaseConnection
+from migrations import DASHBOARD_SUMMARY_COLUMNS, DASHBOARD_SUMMARY_SQL, rebuild_dashboard_summary
+
+
+class DashboardSummary:
+    """Single-row dashboard KPIs kept current by patient_records triggers"""
+
+    @staticmethod
+    def _as_dict(values) -> dict:
+        summary = dict(zip(DASHBOARD_SUMMARY_COLUMNS, values))
+        count = summary["confidence_count"]
+        summary["avg_confidence"] = summary["confidence_sum"] / count if count else None
+        return summary
+
+    @classmethod
+    def read(cls, conn: Optional[sqlite3.Connection] = None) -> dict:
+        """Return the stored KPIs, rebuilding the row if it has gone missing"""
+        if conn is None:
+            with DatabaseConnection.connection() as pooled:
+                return cls.read(pooled)
+
+        row = conn.execute(
+            f"SELECT {', '.join(DASHBOARD_SUMMARY_COLUMNS)} FROM dashboard_summary WHERE id = 1"
+        ).fetchone()
+        if row is None:
+            with conn:
+                row = rebuild_dashboard_summary(conn)
+        return cls._as_dict(row)
+
+    @classmethod
+    def check(cls) -> dict:
+        """Compare stored counters with a full recount of active records"""
+        with DatabaseConnection.connection() as conn:
+            stored = cls.read(conn)
+            actual = cls._as_dict(conn.execute(DASHBOARD_SUMMARY_SQL).fetchone())
+
+        mismatched = [
+            column for column in DASHBOARD_SUMMARY_COLUMNS
+            if not math.isclose(stored[column], actual[column], rel_tol=1e-9, abs_tol=1e-6)
+        ]
+        return {"consistent": not mismatched, "mismatched": mismatched, "stored": stored, "actual": actual}
+
+    @classmethod
+    def rebuild(cls) -> dict:
+        """Recount active records and overwrite the stored counters"""
+        with DatabaseConnection.transaction() as conn:
+            return cls._as_dict(rebuild_dashboard_summary(conn))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check or rebuild EyeShield dashboard KPI counters.")
+    parser.add_argument("--rebuild", action="store_true", help="recount records and overwrite the counters")
+    args = parser.parse_args()
+
+    from auth import UserManager
+    UserManager._init_db()
+
+    if args.rebuild:
+        summary = DashboardSummary.rebuild()
+        print(f"[EyeShield] Dashboard summary rebuilt: {summary}")
+        return 0
+
+    result = DashboardSummary.check()
+    if result["consistent"]:
+        print(f"[EyeShield] Dashboard summary consistent: {result['stored']}")
+        return 0
+    print(f"[EyeShield] Dashboard summary out of sync in {', '.join(result['mismatched'])}")
+    print(f"  stored: {result['stored']}")
+    print(f"  actual: {result['actual']}")
+    print("  run with --rebuild to repair")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
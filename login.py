@@ -10,9 +10,13 @@ from PySide6.QtGui import QAction, QIcon
 from PySide6.QtCore import Qt
 
 try:
+    from audit import audit_log
     from user_auth import verify_user
+    from crypto_worker import crypto_worker
 except Exception:
+    from .audit import audit_log
     from .user_auth import verify_user
+    from .crypto_worker import crypto_worker
 
 
 def _add_eye_toggle(field):
@@ -118,6 +122,7 @@ class LoginWindow(QWidget):
         """)
 
         btn = QPushButton("Sign In")
+        self.login_btn = btn
         btn.setMinimumHeight(40)
         btn.setStyleSheet("""
             QPushButton {
@@ -132,6 +137,10 @@ class LoginWindow(QWidget):
             QPushButton:hover {
                 background: #0b5ed7;
             }
+            QPushButton:disabled {
+                background: #6ea8fe;
+                border: 1px solid #6ea8fe;
+            }
         """)
         btn.clicked.connect(self.handle_login)
 
@@ -148,19 +157,38 @@ class LoginWindow(QWidget):
         layout.addWidget(form_widget)
 
     def handle_login(self):
-        """Handle login button click"""
-        from dashboard import EyeShieldApp
-        
-        role = verify_user(
-            self.username_input.text(),
-            self.password_input.text()
+        """Handle login button click; credentials are checked on the crypto worker"""
+        if not self.login_btn.isEnabled():
+            return
+
+        username = self.username_input.text()
+        self._set_signing_in(True)
+        crypto_worker.submit(
+            verify_user,
+            username,
+            self.password_input.text(),
+            on_result=lambda role: self._finish_login(username, role),
+            on_error=lambda err: self._finish_login(username, None),
+            context=self,
         )
 
+    def _set_signing_in(self, busy):
+        self.login_btn.setEnabled(not busy)
+        self.login_btn.setText("Signing in..." if busy else "Sign In")
+        self.username_input.setReadOnly(busy)
+        self.password_input.setReadOnly(busy)
+
+    def _finish_login(self, username, role):
+        from dashboard import EyeShieldApp
+
+        self._set_signing_in(False)
         if role:
-            os.environ["EYESHIELD_CURRENT_USER"] = self.username_input.text().strip()
+            os.environ["EYESHIELD_CURRENT_USER"] = username.strip()
             os.environ["EYESHIELD_CURRENT_ROLE"] = role
-            self.main = EyeShieldApp(self.username_input.text(), role)
+            audit_log.record("auth.login", "user", username.strip(), f"Signed in as {role}")
+            self.main = EyeShieldApp(username, role)
             self.main.show()
             self.close()
         else:
+            audit_log.record("auth.login_failed", "user", username.strip(), "Invalid credentials", username="")
             QMessageBox.warning(self, "Login Failed", "Invalid credentials.")
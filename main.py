@@ -11,23 +11,23 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
 from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon, QPixmap, QImage, QPainter, QFont, QFontDatabase
-from PySide6.QtSvg import QSvgRenderer
-from auth import UserManager
+from PySide6.QtGui import QFont
+from audit import audit_log
+from auth import DatabaseConnection, UserManager
+from backup import backup_runner, backup_scheduler
+from crypto_worker import crypto_worker
+from db_executor import database_executor
+from icon_cache import svg_icons
+from image_cache import image_decoder
+from inference import inference_service
 from login import LoginWindow
+from maintenance import maintenance_scheduler
+from storage import checkpoint_scheduler, configure_storage
 
 
 def load_svg_icon(svg_path, size=256):
     """Render an SVG file to a QIcon."""
-    renderer = QSvgRenderer(svg_path)
-    if not renderer.isValid():
-        return QIcon()
-    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
-    image.fill(0)
-    painter = QPainter(image)
-    renderer.render(painter)
-    painter.end()
-    return QIcon(QPixmap.fromImage(image))
+    return svg_icons.icon(svg_path, size=size)
 
 
 if __name__ == "__main__":
@@ -51,6 +51,20 @@ if __name__ == "__main__":
 
     # Initialize the database
     UserManager._init_db()
+    configure_storage()
+    # Maintenance waits for a quiet spell in the app's own database work
+    database_executor.busy_changed.connect(maintenance_scheduler.note_activity)
+    app.aboutToQuit.connect(backup_scheduler.stop)
+    app.aboutToQuit.connect(backup_runner.shutdown)
+    app.aboutToQuit.connect(maintenance_scheduler.stop)
+    app.aboutToQuit.connect(checkpoint_scheduler.stop)
+    app.aboutToQuit.connect(crypto_worker.shutdown)
+    app.aboutToQuit.connect(image_decoder.shutdown)
+    app.aboutToQuit.connect(inference_service.shutdown)
+    app.aboutToQuit.connect(database_executor.shutdown)
+    # Write queued audit events before the pooled connections close
+    app.aboutToQuit.connect(audit_log.stop)
+    app.aboutToQuit.connect(DatabaseConnection.close_all)
 
     win = LoginWindow()
     win.show()
@@ -0,0 +1,357 @@
+"""
+Maintenance module for EyeShield EMR application.
+Refreshes planner statistics, reclaims free pages, checks the integrity of users.db and
+removes unreferenced stored images while the app is idle.
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from auth import DB_FILE, DatabaseConnection
+from image_store import image_store
+from record_repository import record_repository
+
+# Rows examined per index by ANALYZE; keeps PRAGMA optimize short on large tables
+ANALYSIS_LIMIT = 400
+INTEGRITY_CHECK_INTERVAL = timedelta(hours=24)
+# How long a write step waits for another writer before giving up until next cycle
+LOCK_WAIT_MS = 50
+# First incremental_vacuum step, before the page rate of this disk is known
+INITIAL_VACUUM_PAGES = 64
+MAX_VACUUM_PAGES = 8192
+# Pause between vacuum steps so other writers can take the lock
+VACUUM_STEP_PAUSE = 0.02
+IDLE_POLL_SECONDS = 15
+MAINTENANCE_LOG_RETENTION = 2000
+
+
+# ============================================================
+# DATABASE STATISTICS
+# ============================================================
+
+def database_stats(conn: sqlite3.Connection) -> dict:
+    """Size and fragmentation of the database file behind ``conn``"""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    try:
+        wal_bytes = os.path.getsize(DB_FILE + "-wal")
+    except OSError:
+        wal_bytes = 0
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "db_bytes": page_size * page_count,
+        "wal_bytes": wal_bytes,
+        "fragmentation": freelist_count / page_count if page_count else 0.0,
+    }
+
+
+def needs_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+
+
+def enable_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Switch the file to incremental auto-vacuum; returns True if it had to be rebuilt.
+
+    auto_vacuum only changes on an existing database after one full VACUUM,
+    which cannot be split into budgeted steps. The maintenance scheduler
+    runs it once, in an idle period; later cycles reclaim pages incrementally.
+    """
+    if not needs_incremental_vacuum(conn):
+        return False
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def record_step(conn: sqlite3.Connection, step: str, duration_ms: float, longest_lock_ms: float, detail: str) -> dict:
+    """Append one row to maintenance_log and return it with the current file statistics"""
+    stats = database_stats(conn)
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO maintenance_log (
+                run_at, step, duration_ms, longest_lock_ms, page_size, page_count, freelist_count, wal_bytes, detail
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                step,
+                round(duration_ms, 2),
+                round(longest_lock_ms, 2),
+                stats["page_size"],
+                stats["page_count"],
+                stats["freelist_count"],
+                stats["wal_bytes"],
+                detail,
+            ),
+        )
+    stats.update(
+        {"duration_ms": round(duration_ms, 2), "longest_lock_ms": round(longest_lock_ms, 2), "detail": detail}
+    )
+    return stats
+
+
+def last_logged_run(step: str) -> Optional[datetime]:
+    """When ``step`` last finished according to maintenance_log"""
+    try:
+        with DatabaseConnection.connection() as conn:
+            row = conn.execute(
+                "SELECT run_at FROM maintenance_log WHERE step = ? ORDER BY id DESC LIMIT 1", (step,)
+            ).fetchone()
+    except sqlite3.Error:
+        return None
+    return datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if row else None
+
+
+# ============================================================
+# SCHEDULER
+# ============================================================
+
+class MaintenanceScheduler:
+    """Runs PRAGMA optimize, incremental VACUUM and quick_check on a background thread.
+
+    A cycle becomes due ``interval_minutes`` after the last one recorded in
+    maintenance_log and starts only once no database work has been noted
+    for ``idle_seconds``. Write steps wait at most ``LOCK_WAIT_MS`` for the
+    lock and skip to the next cycle if another writer has it. Each vacuum
+    transaction is sized from the measured page rate to stay within
+    ``budget_ms``, and vacuuming stops as soon as other database work starts.
+    The one full VACUUM that switches an older file to incremental
+    auto-vacuum is also run here, in the first idle cycle, instead of at startup.
+    """
+
+    def __init__(self, interval_minutes: int = 60, budget_ms: int = 100, idle_seconds: int = 60):
+        self.interval_minutes = interval_minutes
+        self.budget_ms = budget_ms
+        self.idle_seconds = idle_seconds
+        self.last_result: Optional[dict] = None
+        self._last_activity = time.monotonic()
+        self._pages_per_ms: Optional[float] = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, interval_minutes: Optional[int] = None, budget_ms: Optional[int] = None) -> None:
+        if interval_minutes is not None:
+            self.interval_minutes = max(1, int(interval_minutes))
+        if budget_ms is not None:
+            self.budget_ms = max(1, int(budget_ms))
+
+    def note_activity(self, *_args) -> None:
+        """Record database work elsewhere in the app; postpones or interrupts maintenance"""
+        self._last_activity = time.monotonic()
+
+    def is_idle(self) -> bool:
+        return time.monotonic() - self._last_activity >= self.idle_seconds
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="EyeShieldMaintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        next_due = time.monotonic() + self._seconds_until_due()
+        while not self._stop.wait(IDLE_POLL_SECONDS):
+            if time.monotonic() < next_due or not self.is_idle():
+                continue
+            try:
+                self.run_now(interruptible=True)
+            except sqlite3.Error as err:
+                print(f"[EyeShield] Maintenance stopped: {err}")
+            next_due = time.monotonic() + self.interval_minutes * 60
+
+    def _seconds_until_due(self) -> float:
+        last = last_logged_run("optimize")
+        if last is None:
+            return 0.0
+        due = last + timedelta(minutes=self.interval_minutes)
+        return max(0.0, (due - datetime.now()).total_seconds())
+
+    # ---------- cycle ----------
+
+    def run_now(self, interruptible: bool = False, integrity_check: Optional[bool] = None) -> dict:
+        """Run one maintenance cycle on a dedicated connection and return each step's result.
+
+        ``integrity_check`` None runs quick_check only when the last one is
+        older than ``INTEGRITY_CHECK_INTERVAL``.
+        """
+        with self._run_lock:
+            started = time.monotonic()
+            interrupted = (lambda: self._last_activity > started) if interruptible else (lambda: False)
+            if integrity_check is None:
+                last_check = last_logged_run("quick_check")
+                integrity_check = last_check is None or datetime.now() - last_check >= INTEGRITY_CHECK_INTERVAL
+
+            conn = DatabaseConnection.open_connection()
+            try:
+                conn.execute(f"PRAGMA busy_timeout = {LOCK_WAIT_MS}")
+                results = {}
+                if needs_incremental_vacuum(conn) and not interrupted():
+                    results["auto_vacuum"] = record_step(conn, "auto_vacuum", *self._convert(conn))
+                results["optimize"] = record_step(conn, "optimize", *self._optimize(conn))
+                results["incremental_vacuum"] = record_step(conn, "incremental_vacuum", *self._vacuum(conn, interrupted))
+                if integrity_check and not interrupted():
+                    results["quick_check"] = record_step(conn, "quick_check", *self._quick_check(conn))
+                if not interrupted():
+                    results["image_sweep"] = record_step(conn, "image_sweep", *self._sweep_images())
+                with conn:
+                    conn.execute(
+                        "DELETE FROM maintenance_log WHERE id <= (SELECT MAX(id) FROM maintenance_log) - ?",
+                        (MAINTENANCE_LOG_RETENTION,),
+                    )
+            finally:
+                conn.close()
+            self.last_result = results
+            return results
+
+    @staticmethod
+    def _convert(conn: sqlite3.Connection) -> tuple:
+        """Rebuild the file once for incremental auto-vacuum; holds the write lock throughout"""
+        started = time.perf_counter()
+        try:
+            enable_incremental_vacuum(conn)
+        except sqlite3.OperationalError as err:
+            # Another writer had the lock; the next idle cycle tries again
+            return 0.0, 0.0, f"skipped: {err}"
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"[EyeShield] Database rebuilt for incremental auto-vacuum in {elapsed / 1000:.1f} s")
+        return elapsed, elapsed, "ok; rebuilt for incremental auto-vacuum"
+
+    @staticmethod
+    def _sweep_images() -> tuple:
+        """Delete stored images no record references, e.g. from saves that failed after the copy"""
+        started = time.perf_counter()
+        try:
+            removed = image_store.sweep(record_repository.image_ref_in_use)
+        except OSError as err:
+            return 0.0, 0.0, f"skipped: {err}"
+        elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, 0.0, f"ok; removed {removed} unreferenced image(s)"
+
+    @staticmethod
+    def _optimize(conn: sqlite3.Connection) -> tuple:
+        """ANALYZE only what the planner needs, with a bounded sample per index"""
+        conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        started = time.perf_counter()
+        try:
+            conn.execute("PRAGMA optimize").fetchall()
+        except sqlite3.OperationalError as err:
+            return 0.0, 0.0, f"skipped: {err}"
+        elapsed = (time.perf_counter() - started) * 1000
+        return elapsed, elapsed, "ok"
+
+    def _vacuum(self, conn: sqlite3.Connection, interrupted: Callable[[], bool]) -> tuple:
+        """Free pages in short write transactions sized to the lock budget"""
+        total_ms = 0.0
+        longest_ms = 0.0
+        freed = 0
+        pages = INITIAL_VACUUM_PAGES
+        detail = "ok"
+        while True:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                break
+            if interrupted():
+                detail = "interrupted by activity"
+                break
+            if self._pages_per_ms:
+                # Grow at most 2x per step so one slow stretch of disk cannot blow the budget
+                pages = min(int(self._pages_per_ms * self.budget_ms * 0.5), pages * 2)
+            pages = max(1, min(free, pages, MAX_VACUUM_PAGES))
+
+            started = time.perf_counter()
+            try:
+                # executescript steps the pragma to completion; execute() frees a single page
+                conn.executescript(f"BEGIN IMMEDIATE; PRAGMA incremental_vacuum({pages}); COMMIT;")
+            except sqlite3.OperationalError as err:
+                if conn.in_transaction:
+                    conn.rollback()
+                detail = f"skipped: {err}"
+                break
+            elapsed = (time.perf_counter() - started) * 1000
+            total_ms += elapsed
+            longest_ms = max(longest_ms, elapsed)
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            freed += free - remaining
+            rate = pages / max(elapsed, 0.01)
+            if elapsed > self.budget_ms:
+                rate /= 2
+            self._pages_per_ms = rate if self._pages_per_ms is None else min(rate, (self._pages_per_ms + rate) / 2)
+            time.sleep(VACUUM_STEP_PAUSE)
+        return total_ms, longest_ms, f"{detail}; freed {freed} pages"
+
+    @staticmethod
+    def _quick_check(conn: sqlite3.Connection) -> tuple:
+        """Read-only structural check; does not block writers under WAL"""
+        started = time.perf_counter()
+        rows = [row[0] for row in conn.execute("PRAGMA quick_check(20)").fetchall()]
+        elapsed = (time.perf_counter() - started) * 1000
+        if rows == ["ok"]:
+            return elapsed, 0.0, "ok"
+        print(f"[EyeShield] Database integrity problems found: {rows[:3]}")
+        return elapsed, 0.0, "; ".join(rows)
+
+    @staticmethod
+    def history(limit: int = 20, step: Optional[str] = None) -> list:
+        """Most recent maintenance_log rows, newest first"""
+        sql = (
+            "SELECT run_at, step, duration_ms, longest_lock_ms, page_size * page_count, "
+            "freelist_count, page_count, wal_bytes, detail FROM maintenance_log"
+        )
+        params = []
+        if step:
+            sql += " WHERE step = ?"
+            params.append(step)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with DatabaseConnection.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        keys = ("run_at", "step", "duration_ms", "longest_lock_ms", "db_bytes", "freelist_count", "page_count", "wal_bytes", "detail")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+maintenance_scheduler = MaintenanceScheduler()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run or review EyeShield database maintenance.")
+    parser.add_argument("--run", action="store_true", help="run optimize, incremental vacuum and quick_check now")
+    parser.add_argument("--history", type=int, default=10, metavar="N", help="show the last N log rows")
+    args = parser.parse_args()
+
+    from auth import UserManager
+    UserManager._init_db()
+
+    if args.run:
+        for step, result in maintenance_scheduler.run_now(integrity_check=True).items():
+            print(f"[EyeShield] {step}: {result['duration_ms']} ms, longest lock {result['longest_lock_ms']} ms, {result['detail']}")
+
+    for row in maintenance_scheduler.history(args.history):
+        fragmentation = row["freelist_count"] / row["page_count"] if row["page_count"] else 0.0
+        print(
+            f"{row['run_at']}  {row['step']:<18} {row['duration_ms']:>9.2f} ms  "
+            f"size {row['db_bytes'] / 1024:,.0f} KiB  free {fragmentation:.1%}  {row['detail']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
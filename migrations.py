@@ -0,0 +1,712 @@
+"""
+Schema migration module for EyeShield EMR application.
+Applies ordered, versioned schema changes to users.db exactly once.
+"""
+
+import re
+import sqlite3
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+# Normalized DR grade stored in patient_records.result_grade.
+# NULL means pending or unrecognised result text.
+RESULT_GRADES = {
+    "No DR": 0,
+    "Mild DR": 1,
+    "Moderate DR": 2,
+    "Severe DR": 3,
+    "Proliferative DR": 4,
+}
+
+RESULT_GRADE_SQL = """
+    CASE
+        WHEN lower({column}) LIKE '%no dr%' THEN 0
+        WHEN lower({column}) LIKE '%proliferative%' THEN 4
+        WHEN lower({column}) LIKE '%severe%' THEN 3
+        WHEN lower({column}) LIKE '%moderate%' THEN 2
+        WHEN lower({column}) LIKE '%mild%' THEN 1
+        ELSE NULL
+    END
+"""
+
+
+# Columns mirrored into the patient_records_fts external-content index.
+SEARCH_TABLE = "patient_records_fts"
+SEARCH_COLUMNS = (
+    "patient_id",
+    "name",
+    "result",
+    "confidence",
+    "diabetes_type",
+    "hba1c",
+    "archived_at",
+    "archived_by",
+    "archive_reason",
+)
+
+
+# Append-only log of patient_records changes, read by data_changes.DataChangeBus.
+CHANGE_LOG_TABLE = "record_changes"
+# Columns shown by the dashboard and reports; updates to anything else are not logged.
+CHANGE_LOG_COLUMNS = (
+    "patient_id",
+    "name",
+    "result",
+    "confidence",
+    "diabetes_type",
+    "hba1c",
+    "archived_at",
+    "archived_by",
+    "archive_reason",
+    "image_ref",
+)
+# Append-only audit trail of user and record actions, written by audit.AuditLogWriter.
+AUDIT_LOG_TABLE = "audit_log"
+# Old -> new patient IDs for duplicates renamed when patient_id became UNIQUE.
+PATIENT_ID_RENAMES_TABLE = "patient_id_renames"
+# Renames listed on the console when a migration rewrites duplicate IDs; all are kept in the table.
+RENAMES_PRINT_LIMIT = 20
+
+# Result keywords that flag a screening for follow-up on the dashboard and reports.
+# "dr detected" is only meaningful without "no dr" ("No DR Detected" is a healthy result).
+HIGH_ATTENTION_KEYWORDS = ("moderate", "severe", "proliferative", "refer", "urgent", "dr detected")
+NO_DR_KEYWORD = "no dr"
+
+HIGH_ATTENTION_SQL = (
+    f"(lower(COALESCE({{row}}result, '')) NOT LIKE '%{NO_DR_KEYWORD}%' AND ("
+    + " OR ".join(
+        f"lower(COALESCE({{row}}result, '')) LIKE '%{keyword}%'" for keyword in HIGH_ATTENTION_KEYWORDS
+    )
+    + "))"
+)
+PENDING_SQL = "(COALESCE({row}result, '') = '' OR lower({row}result) LIKE '%pending%')"
+# Leading number of labelled text: "Confidence: 93.8%" -> 93.8, "7.0%" -> 7.0.
+# NULL when the text holds no digits.
+NUMERIC_TEXT_SQL = (
+    "(CASE WHEN COALESCE({value}, '') GLOB '*[0-9]*' "
+    "THEN CAST(ltrim(lower({value}), 'abcdefghijklmnopqrstuvwxyz: ') AS REAL) END)"
+)
+CONFIDENCE_VALUE_SQL = NUMERIC_TEXT_SQL.format(value="{row}confidence")
+HBA1C_VALUE_SQL = NUMERIC_TEXT_SQL.format(value="{row}hba1c")
+
+_NUMERIC_PREFIX = re.compile(r"[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?")
+
+
+
+def _summary_aggregate_sql(confidence: str) -> str:
+    return f"""
+        SELECT COUNT(*),
+               COALESCE(SUM({HIGH_ATTENTION_SQL.format(row='')}), 0),
+               COALESCE(SUM({PENDING_SQL.format(row='')}), 0),
+               COUNT({confidence}),
+               COALESCE(SUM({confidence}), 0.0)
+        FROM patient_records
+        WHERE archived_at IS NULL
+    """
+
+
+# Aggregate over active records that dashboard_summary must always equal.
+DASHBOARD_SUMMARY_SQL = _summary_aggregate_sql("confidence_value")
+DASHBOARD_SUMMARY_COLUMNS = (
+    "total_active",
+    "high_attention",
+    "pending",
+    "confidence_count",
+    "confidence_sum",
+)
+
+
+def is_high_attention(result_text) -> bool:
+    """Python mirror of HIGH_ATTENTION_SQL."""
+    text = str(result_text or "").lower()
+    return NO_DR_KEYWORD not in text and any(keyword in text for keyword in HIGH_ATTENTION_KEYWORDS)
+
+
+def result_grade(result_text) -> Optional[int]:
+    """Python mirror of RESULT_GRADE_SQL for values not yet in the database."""
+    text = str(result_text or "").lower()
+    if "no dr" in text:
+        return 0
+    for keyword, grade in (("proliferative", 4), ("severe", 3), ("moderate", 2), ("mild", 1)):
+        if keyword in text:
+            return grade
+    return None
+
+
+def numeric_value(text) -> Optional[float]:
+    """Python mirror of NUMERIC_TEXT_SQL used when writing typed columns."""
+    text = str(text or "")
+    if not any(ch.isdigit() for ch in text):
+        return None
+    match = _NUMERIC_PREFIX.match(text.lower().lstrip("abcdefghijklmnopqrstuvwxyz: "))
+    return float(match.group(0)) if match else 0.0
+
+
+def has_search_index(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def _column_names(conn: sqlite3.Connection, table: str) -> set:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_columns(conn: sqlite3.Connection, table: str, columns: dict) -> None:
+    existing = _column_names(conn, table)
+    for column_name, column_type in columns.items():
+        if column_name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_name} {column_type}")
+
+
+# ============================================================
+# MIGRATION STEPS
+# ============================================================
+
+def _create_base_tables(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS patient_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id TEXT,
+            name TEXT,
+            birthdate TEXT,
+            age TEXT,
+            sex TEXT,
+            contact TEXT,
+            eyes TEXT,
+            diabetes_type TEXT,
+            duration TEXT,
+            hba1c TEXT,
+            prev_treatment TEXT,
+            notes TEXT,
+            result TEXT,
+            confidence TEXT,
+            archived_at TEXT,
+            archived_by TEXT,
+            archive_reason TEXT
+        )
+    """)
+
+
+def _add_archive_columns(conn: sqlite3.Connection) -> None:
+    _add_columns(conn, "patient_records", {
+        "archived_at": "TEXT",
+        "archived_by": "TEXT",
+        "archive_reason": "TEXT",
+    })
+
+
+def _add_result_grade(conn: sqlite3.Connection) -> None:
+    _add_columns(conn, "patient_records", {"result_grade": "INTEGER"})
+    conn.execute(f"UPDATE patient_records SET result_grade = {RESULT_GRADE_SQL.format(column='result')}")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_grade_insert
+        AFTER INSERT ON patient_records
+        WHEN NEW.result_grade IS NULL
+        BEGIN
+            UPDATE patient_records
+            SET result_grade = {RESULT_GRADE_SQL.format(column='NEW.result')}
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_grade_update
+        AFTER UPDATE OF result ON patient_records
+        BEGIN
+            UPDATE patient_records
+            SET result_grade = {RESULT_GRADE_SQL.format(column='NEW.result')}
+            WHERE id = NEW.id;
+        END
+    """)
+
+
+def _index_patient_records(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_patient_records_patient_id "
+        "ON patient_records(patient_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_patient_records_archived_id "
+        "ON patient_records(archived_at, id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_patient_records_grade "
+        "ON patient_records(result_grade, archived_at, id)"
+    )
+
+
+def _create_search_index(conn: sqlite3.Connection) -> None:
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"OLD.{column}" for column in SEARCH_COLUMNS)
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+                {columns},
+                content='patient_records',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='1 2 3'
+            )
+        """)
+    except sqlite3.OperationalError as err:
+        # SQLite builds without FTS5 keep working with LIKE-based search.
+        if "fts5" not in str(err).lower():
+            raise
+        print(f"[EyeShield] Full-text search unavailable: {err}")
+        return
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_fts_insert
+        AFTER INSERT ON patient_records
+        BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_fts_delete
+        AFTER DELETE ON patient_records
+        BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_fts_update
+        AFTER UPDATE OF {columns} ON patient_records
+        BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, {columns})
+            VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    conn.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+def _create_dashboard_summary(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dashboard_summary (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_active INTEGER NOT NULL DEFAULT 0,
+            high_attention INTEGER NOT NULL DEFAULT 0,
+            pending INTEGER NOT NULL DEFAULT 0,
+            confidence_count INTEGER NOT NULL DEFAULT 0,
+            confidence_sum REAL NOT NULL DEFAULT 0
+        )
+    """)
+    # confidence_value does not exist yet at this version; step 14 switches to it
+    _create_summary_triggers(conn, CONFIDENCE_VALUE_SQL, "archived_at, result, confidence")
+    rebuild_dashboard_summary(conn, _summary_aggregate_sql(CONFIDENCE_VALUE_SQL.format(row="")))
+
+
+def _create_summary_triggers(conn: sqlite3.Connection, confidence_sql: str, update_columns: str) -> None:
+    def delta(sign: str, row: str) -> str:
+        active = f"({row}.archived_at IS NULL)"
+        confidence = confidence_sql.format(row=f"{row}.")
+        return (
+            f"total_active = total_active {sign} {active}, "
+            f"high_attention = high_attention {sign} {active} * {HIGH_ATTENTION_SQL.format(row=f'{row}.')}, "
+            f"pending = pending {sign} {active} * {PENDING_SQL.format(row=f'{row}.')}, "
+            f"confidence_count = confidence_count {sign} {active} * ({confidence} IS NOT NULL), "
+            f"confidence_sum = confidence_sum {sign} {active} * COALESCE({confidence}, 0.0)"
+        )
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dashboard_summary_insert
+        AFTER INSERT ON patient_records
+        BEGIN
+            UPDATE dashboard_summary SET {delta('+', 'NEW')} WHERE id = 1;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dashboard_summary_delete
+        AFTER DELETE ON patient_records
+        BEGIN
+            UPDATE dashboard_summary SET {delta('-', 'OLD')} WHERE id = 1;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_dashboard_summary_update
+        AFTER UPDATE OF {update_columns} ON patient_records
+        BEGIN
+            UPDATE dashboard_summary SET {delta('-', 'OLD')} WHERE id = 1;
+            UPDATE dashboard_summary SET {delta('+', 'NEW')} WHERE id = 1;
+        END
+    """)
+
+
+def rebuild_dashboard_summary(conn: sqlite3.Connection, aggregate_sql: str = DASHBOARD_SUMMARY_SQL) -> tuple:
+    """Recompute dashboard_summary from patient_records; caller owns the transaction."""
+    values = tuple(conn.execute(aggregate_sql).fetchone())
+    columns = ", ".join(DASHBOARD_SUMMARY_COLUMNS)
+    placeholders = ", ".join("?" for _ in DASHBOARD_SUMMARY_COLUMNS)
+    conn.execute(
+        f"INSERT OR REPLACE INTO dashboard_summary (id, {columns}) VALUES (1, {placeholders})",
+        values,
+    )
+    return values
+
+
+def _add_numeric_columns(conn: sqlite3.Connection) -> None:
+    # Existing rows are filled in afterwards by run_backfills() in short chunks.
+    _add_columns(conn, "patient_records", {"confidence_value": "REAL", "hba1c_value": "REAL"})
+    conn.execute(
+        "INSERT OR IGNORE INTO schema_backfills (name, last_id) VALUES (?, 0)",
+        ("numeric_columns",),
+    )
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_numeric_insert
+        AFTER INSERT ON patient_records
+        WHEN NEW.confidence_value IS NULL AND NEW.hba1c_value IS NULL
+        BEGIN
+            UPDATE patient_records
+            SET confidence_value = {CONFIDENCE_VALUE_SQL.format(row='NEW.')},
+                hba1c_value = {HBA1C_VALUE_SQL.format(row='NEW.')}
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_patient_records_numeric_update
+        AFTER UPDATE OF confidence, hba1c ON patient_records
+        BEGIN
+            UPDATE patient_records
+            SET confidence_value = {CONFIDENCE_VALUE_SQL.format(row='NEW.')},
+                hba1c_value = {HBA1C_VALUE_SQL.format(row='NEW.')}
+            WHERE id = NEW.id;
+        END
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_patient_records_archived_hba1c "
+        "ON patient_records(archived_at, hba1c_value)"
+    )
+
+
+def _add_annotations_column(conn: sqlite3.Connection) -> None:
+    # Freehand strokes drawn on the source image, packed by annotations.encode_annotations().
+    _add_columns(conn, "patient_records", {"annotations": "BLOB"})
+
+
+def _add_image_ref_column(conn: sqlite3.Connection) -> None:
+    # SHA-256 reference into image_store.ImageStore; many records may share one image.
+    _add_columns(conn, "patient_records", {"image_ref": "TEXT"})
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_patient_records_image_ref "
+        "ON patient_records(image_ref) WHERE image_ref IS NOT NULL"
+    )
+
+
+def _create_change_log(conn: sqlite3.Connection) -> None:
+    # AUTOINCREMENT keeps sequence numbers monotonic even after the log is pruned.
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_record_changes_insert
+        AFTER INSERT ON patient_records
+        BEGIN
+            INSERT INTO {CHANGE_LOG_TABLE} (record_id, op) VALUES (NEW.id, 'insert');
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_record_changes_update
+        AFTER UPDATE OF {', '.join(CHANGE_LOG_COLUMNS)} ON patient_records
+        BEGIN
+            INSERT INTO {CHANGE_LOG_TABLE} (record_id, op) VALUES (NEW.id, 'update');
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_record_changes_delete
+        AFTER DELETE ON patient_records
+        BEGIN
+            INSERT INTO {CHANGE_LOG_TABLE} (record_id, op) VALUES (OLD.id, 'delete');
+        END
+    """)
+
+
+def _create_patient_id_renames(conn: sqlite3.Connection) -> None:
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PATIENT_ID_RENAMES_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id INTEGER NOT NULL,
+            old_patient_id TEXT NOT NULL,
+            new_patient_id TEXT NOT NULL,
+            renamed_at TEXT NOT NULL
+        )
+    """)
+
+
+def _report_renames(renames: list) -> None:
+    if not renames:
+        return
+    print(
+        f"[EyeShield] {len(renames)} duplicate patient IDs renamed; "
+        f"the full list is in the {PATIENT_ID_RENAMES_TABLE} table:"
+    )
+    for record_id, old_id, new_id in renames[:RENAMES_PRINT_LIMIT]:
+        print(f"[EyeShield]   record {record_id}: {old_id} -> {new_id}")
+    if len(renames) > RENAMES_PRINT_LIMIT:
+        print(f"[EyeShield]   ... and {len(renames) - RENAMES_PRINT_LIMIT} more")
+
+
+def _unique_patient_ids(conn: sqlite3.Connection) -> None:
+    # Blank IDs become NULL (UNIQUE allows any number of NULLs); later copies of a
+    # duplicated ID are renamed so the earliest record keeps it, and every
+    # rename is recorded so it can be reconciled with paper records.
+    _create_patient_id_renames(conn)
+    conn.execute("UPDATE patient_records SET patient_id = NULL WHERE TRIM(patient_id) = ''")
+    duplicates = conn.execute("""
+        SELECT id, patient_id FROM patient_records
+        WHERE patient_id IN (
+            SELECT patient_id FROM patient_records
+            WHERE patient_id IS NOT NULL GROUP BY patient_id HAVING COUNT(*) > 1
+        )
+        ORDER BY patient_id, id
+    """).fetchall()
+
+    renames = []
+    if duplicates:
+        taken = {row[0] for row in conn.execute(
+            "SELECT DISTINCT patient_id FROM patient_records WHERE patient_id IS NOT NULL"
+        )}
+        renamed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        previous = None
+        for record_id, patient_id in duplicates:
+            if patient_id != previous:
+                # The earliest record keeps the ID
+                previous = patient_id
+                continue
+            # "<id>-<record id>", with a counter appended if even that is taken
+            new_id = f"{patient_id}-{record_id}"
+            counter = 2
+            while new_id in taken:
+                new_id = f"{patient_id}-{record_id}-{counter}"
+                counter += 1
+            taken.add(new_id)
+            conn.execute("UPDATE patient_records SET patient_id = ? WHERE id = ?", (new_id, record_id))
+            conn.execute(
+                f"INSERT INTO {PATIENT_ID_RENAMES_TABLE} "
+                "(record_id, old_patient_id, new_patient_id, renamed_at) VALUES (?, ?, ?, ?)",
+                (record_id, patient_id, new_id, renamed_at),
+            )
+            renames.append((record_id, patient_id, new_id))
+
+    conn.execute("DROP INDEX IF EXISTS idx_patient_records_patient_id")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_patient_records_patient_id_unique "
+        "ON patient_records(patient_id)"
+    )
+    _report_renames(renames)
+
+
+def _create_maintenance_log(conn: sqlite3.Connection) -> None:
+    # One row per maintenance step; size and freelist columns track growth and fragmentation.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_at TEXT NOT NULL,
+            step TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            longest_lock_ms REAL NOT NULL DEFAULT 0,
+            page_size INTEGER NOT NULL,
+            page_count INTEGER NOT NULL,
+            freelist_count INTEGER NOT NULL,
+            wal_bytes INTEGER NOT NULL DEFAULT 0,
+            detail TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_maintenance_log_step ON maintenance_log(step, id)")
+
+
+def _create_audit_log(conn: sqlite3.Connection) -> None:
+    # Append-only: rows are written in batches by audit.AuditLogWriter and never edited.
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {AUDIT_LOG_TABLE} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            logged_at TEXT NOT NULL,
+            username TEXT NOT NULL DEFAULT '',
+            action TEXT NOT NULL,
+            target_type TEXT NOT NULL DEFAULT '',
+            target_id TEXT NOT NULL DEFAULT '',
+            detail TEXT NOT NULL DEFAULT ''
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_audit_log_username ON {AUDIT_LOG_TABLE}(username, id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_audit_log_action ON {AUDIT_LOG_TABLE}(action, id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_audit_log_logged_at ON {AUDIT_LOG_TABLE}(logged_at)")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_update
+        BEFORE UPDATE ON {AUDIT_LOG_TABLE}
+        BEGIN
+            SELECT RAISE(ABORT, 'audit_log is append-only');
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_delete
+        BEFORE DELETE ON {AUDIT_LOG_TABLE}
+        BEGIN
+            SELECT RAISE(ABORT, 'audit_log is append-only');
+        END
+    """)
+
+
+def _summary_from_confidence_value(conn: sqlite3.Connection) -> None:
+    # Count from the typed column instead of re-parsing confidence text in every trigger,
+    # and recount with the corrected high-attention match. Rows the numeric backfill
+    # has not reached yet are added as it fills confidence_value.
+    for name in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_dashboard_summary_{name}")
+    _create_summary_triggers(conn, "{row}confidence_value", "archived_at, result, confidence_value")
+    rebuild_dashboard_summary(conn)
+
+
+MIGRATIONS: tuple[tuple[int, str, Callable[[sqlite3.Connection], None]], ...] = (
+    (1, "create_base_tables", _create_base_tables),
+    (2, "add_archive_columns", _add_archive_columns),
+    (3, "add_result_grade", _add_result_grade),
+    (4, "index_patient_records", _index_patient_records),
+    (5, "create_search_index", _create_search_index),
+    (6, "create_dashboard_summary", _create_dashboard_summary),
+    (7, "add_numeric_columns", _add_numeric_columns),
+    (8, "add_annotations_column", _add_annotations_column),
+    (9, "add_image_ref_column", _add_image_ref_column),
+    (10, "create_change_log", _create_change_log),
+    (11, "unique_patient_ids", _unique_patient_ids),
+    (12, "create_maintenance_log", _create_maintenance_log),
+    (13, "create_audit_log", _create_audit_log),
+    (14, "summary_from_confidence_value", _summary_from_confidence_value),
+)
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def _ensure_version_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_backfills (
+            name TEXT PRIMARY KEY,
+            last_id INTEGER NOT NULL DEFAULT 0,
+            finished_at TEXT
+        )
+    """)
+    conn.commit()
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()
+    return int(row[0] or 0)
+
+
+def apply_migrations(conn: sqlite3.Connection) -> list[int]:
+    """Apply every pending migration, each in its own transaction.
+
+    Returns the versions that were applied. A failing step is rolled back
+    and re-raised so the application never runs against a half-migrated
+    schema.
+    """
+    applied = []
+    version = current_version(conn)
+    for step_version, name, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            step(conn)
+            conn.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+                (step_version, name, datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(step_version)
+    return applied
+
+
+# ============================================================
+# BACKFILLS
+# ============================================================
+
+BACKFILL_CHUNK_SIZE = 500
+
+# name -> SET clause recomputing derived columns from their source text.
+BACKFILLS = {
+    "numeric_columns": (
+        f"confidence_value = {CONFIDENCE_VALUE_SQL.format(row='')}, "
+        f"hba1c_value = {HBA1C_VALUE_SQL.format(row='')}"
+    ),
+}
+
+
+def run_backfills(conn: sqlite3.Connection, chunk_size: int = BACKFILL_CHUNK_SIZE, pause: float = 0.0) -> int:
+    """Fill derived columns for pre-existing rows, one short write transaction per chunk.
+
+    Progress is stored in schema_backfills so an interrupted run resumes
+    where it stopped. Returns the number of rows updated.
+    """
+    updated = 0
+    pending = conn.execute(
+        "SELECT name, last_id FROM schema_backfills WHERE finished_at IS NULL ORDER BY name"
+    ).fetchall()
+    for name, last_id in pending:
+        set_clause = BACKFILLS.get(name)
+        if set_clause is None:
+            continue
+        while True:
+            if conn.in_transaction:
+                conn.commit()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT MAX(id), COUNT(*) FROM ("
+                    "SELECT id FROM patient_records WHERE id > ? ORDER BY id LIMIT ?)",
+                    (last_id, chunk_size),
+                ).fetchone()
+                upper_id, count = row
+                if not count:
+                    conn.execute(
+                        "UPDATE schema_backfills SET finished_at = ? WHERE name = ?",
+                        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), name),
+                    )
+                    conn.commit()
+                    break
+                conn.execute(
+                    f"UPDATE patient_records SET {set_clause} WHERE id > ? AND id <= ?",
+                    (last_id, upper_id),
+                )
+                conn.execute("UPDATE schema_backfills SET last_id = ? WHERE name = ?", (upper_id, name))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            updated += count
+            last_id = upper_id
+            if pause:
+                time.sleep(pause)
+    return updated
+
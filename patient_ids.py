@@ -0,0 +1,86 @@
+"""
+Patient IDs module for EyeShield EMR application.
+Hands out collision-free patient IDs from memory and retries the rare insert that still collides.
+"""
+
+import secrets
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Sequence
+
+PATIENT_ID_PREFIX = "ES"
+# IDs per second per station before the allocator borrows the next second
+IDS_PER_SECOND = 256
+MAX_INSERT_ATTEMPTS = 5
+
+
+class PatientIdAllocator:
+    """Monotonic ``ES-YYYYMMDD-HHMMSS-SSSSNN`` IDs without database lookups.
+
+    ``SSSS`` is a random tag drawn once per process (station) and ``NN`` a
+    sequence within the second, so one station never repeats an ID and two
+    stations only collide if they share a tag and a second. That remainder
+    is caught by the UNIQUE index on patient_records.patient_id and
+    ``insert_patient_record`` retries with a fresh ID.
+    """
+
+    def __init__(self, prefix: str = PATIENT_ID_PREFIX):
+        self.prefix = prefix
+        self.station = f"{secrets.randbits(16):04X}"
+        self._lock = threading.Lock()
+        self._second = None
+        self._stamp = ""
+        self._sequence = 0
+
+    def allocate(self) -> str:
+        now = datetime.now().replace(microsecond=0)
+        with self._lock:
+            if self._second is None or now > self._second:
+                self._start_second(now)
+            elif self._sequence >= IDS_PER_SECOND:
+                # Sequence exhausted within one second: keep going on the next one
+                self._start_second(self._second + timedelta(seconds=1))
+            stamp, sequence = self._stamp, self._sequence
+            self._sequence += 1
+        return f"{stamp}{sequence:02X}"
+
+    def _start_second(self, second: datetime) -> None:
+        self._second = second
+        self._stamp = f"{self.prefix}-{second:%Y%m%d-%H%M%S}-{self.station}"
+        self._sequence = 0
+
+
+patient_ids = PatientIdAllocator()
+
+
+def is_patient_id_conflict(err: sqlite3.IntegrityError) -> bool:
+    return "patient_records.patient_id" in str(err)
+
+
+def insert_patient_record(conn: sqlite3.Connection, columns: Sequence[str], values: Sequence) -> str:
+    """INSERT one patient_records row whose first column is patient_id; returns the ID saved.
+
+    A blank ID is allocated; an ID already taken by another record (another
+    station, or a manifest reusing an ID) is replaced with a fresh one. A
+    failed statement leaves the caller's transaction open, so retries stay
+    inside it.
+    """
+    if columns[0] != "patient_id":
+        raise ValueError("patient_id must be the first column")
+    values = list(values)
+    values[0] = str(values[0] or "").strip() or patient_ids.allocate()
+    sql = (
+        f"INSERT INTO patient_records ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    for _ in range(MAX_INSERT_ATTEMPTS - 1):
+        try:
+            conn.execute(sql, values)
+            return values[0]
+        except sqlite3.IntegrityError as err:
+            if not is_patient_id_conflict(err):
+                raise
+            values[0] = patient_ids.allocate()
+    conn.execute(sql, values)
+    return values[0]
@@ -0,0 +1,102 @@
+"""
+Preprocessing module for EyeShield EMR application.
+Turns fundus image files into model input tensors; light enough to import in worker processes.
+"""
+
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QImage, QImageReader
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+INPUT_SIZE = 224
+CHANNEL_MEAN = (0.485, 0.456, 0.406)
+CHANNEL_STD = (0.229, 0.224, 0.225)
+# Pixels darker than this (0-255, max channel) are treated as the black fundus border
+BORDER_THRESHOLD = 20
+
+
+# ============================================================
+# DECODING
+# ============================================================
+
+def _decode(path: str, max_size: tuple) -> QImage:
+    """Decode ``path``, letting the codec downscale to fit ``max_size``"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    bounds = QSize(*max_size)
+    if original.isValid() and (original.width() > bounds.width() or original.height() > bounds.height()):
+        reader.setScaledSize(original.scaled(bounds, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Unable to read image: {path}")
+    return image
+
+
+def _rgb_array(image: QImage):
+    """Copy a QImage into an HxWx3 uint8 array"""
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    width, height = image.width(), image.height()
+    # Rows may be padded to 4-byte boundaries
+    buffer = np.frombuffer(image.constBits(), dtype=np.uint8, count=image.sizeInBytes())
+    return buffer.reshape(height, image.bytesPerLine())[:, :width * 3].reshape(height, width, 3).copy()
+
+
+def _fundus_bounds(image: QImage) -> tuple:
+    """Bounding box (x, y, w, h) of the illuminated fundus, found on a thumbnail"""
+    probe = image.scaled(64, 64, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+    lit = _rgb_array(probe).max(axis=2) > BORDER_THRESHOLD
+    rows = np.flatnonzero(lit.any(axis=1))
+    cols = np.flatnonzero(lit.any(axis=0))
+    if not rows.size:
+        return 0, 0, image.width(), image.height()
+
+    scale_x = image.width() / probe.width()
+    scale_y = image.height() / probe.height()
+    left = int(cols[0] * scale_x)
+    top = int(rows[0] * scale_y)
+    right = int((cols[-1] + 1) * scale_x)
+    bottom = int((rows[-1] + 1) * scale_y)
+    return left, top, right - left, bottom - top
+
+
+# ============================================================
+# TENSORS
+# ============================================================
+
+def preprocess_image(path: str, size: int = INPUT_SIZE):
+    """Load, crop to the fundus, square-pad, resize and normalise to a 1x3xHxW float32 tensor.
+
+    Uses QImageReader/QImage (safe off the GUI thread) so no imaging library is required.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed")
+
+    # Let the codec downscale during decode; the crop only needs a few times the input size
+    image = _decode(path, (size * 4, size * 4))
+
+    x, y, width, height = _fundus_bounds(image)
+    side = max(width, height)
+    image = image.copy(x - (side - width) // 2, y - (side - height) // 2, side, side)
+    image = image.scaled(
+        size, size,
+        Qt.AspectRatioMode.IgnoreAspectRatio,
+        Qt.TransformationMode.SmoothTransformation,
+    )
+
+    tensor = _rgb_array(image).astype(np.float32) / 255.0
+    tensor -= np.asarray(CHANNEL_MEAN, dtype=np.float32)
+    tensor /= np.asarray(CHANNEL_STD, dtype=np.float32)
+    return np.ascontiguousarray(tensor.transpose(2, 0, 1)[np.newaxis])
+
+
+def preprocess_in_worker(image_path: str, size: int):
+    """Process-pool entry point; returns (tensor, error) so one bad file never stops the batch"""
+    try:
+        return preprocess_image(image_path, size), ""
+    except Exception as err:
+        return None, str(err)
@@ -0,0 +1,393 @@
+"""
+Record repository module for EyeShield EMR application.
+Single data-access path for patient_records: listings, searches, aggregates, inserts and archive changes.
+"""
+
+import functools
+import re
+import sqlite3
+from typing import NamedTuple, Optional, Sequence
+
+from auth import DatabaseConnection
+from image_store import image_store
+from migrations import SEARCH_TABLE, has_search_index
+from patient_ids import insert_patient_record, is_patient_id_conflict, patient_ids
+
+RECORD_PAGE_SIZE = 200
+
+
+# ============================================================
+# RECORD TYPES
+# ============================================================
+
+class PatientRecord(NamedTuple):
+    """One patient_records row as listed by the reports pages"""
+
+    id: int
+    patient_id: Optional[str]
+    name: Optional[str]
+    result: Optional[str]
+    confidence: Optional[str]
+    diabetes_type: Optional[str]
+    hba1c: Optional[str]
+    archived_at: Optional[str]
+    archived_by: Optional[str]
+    archive_reason: Optional[str]
+    result_grade: Optional[int]
+    image_ref: Optional[str]
+
+
+RECORD_FIELDS = PatientRecord._fields
+
+
+class RecentRecord(NamedTuple):
+    patient_id: Optional[str]
+    name: Optional[str]
+    result: Optional[str]
+    confidence_value: Optional[float]
+
+
+class RecordSummary(NamedTuple):
+    total: int
+    unique_patients: int
+    no_dr: int
+    avg_hba1c: Optional[float]
+
+
+class RecordQuery(NamedTuple):
+    """Filter and order of a patient_records listing"""
+
+    archived: bool = False
+    search_text: str = ""
+    search_fields: tuple = ()
+    grade: Optional[int] = None
+    sort_field: Optional[str] = None
+    descending: bool = True
+
+
+def _record_row(_cursor, row) -> PatientRecord:
+    return PatientRecord._make(row)
+
+
+def _keyed_record_row(_cursor, row) -> tuple:
+    """Listing rows carry their keyset sort key as one extra trailing column"""
+    return PatientRecord._make(row[:-1]), row[-1]
+
+
+def build_match_query(text, columns=()):
+    """Translate free text into an FTS5 query: every word must match as a prefix.
+
+    Words are split on punctuation the same way the unicode61 tokenizer does,
+    so "ES-2026" becomes the prefix phrase "es 2026"*.
+    """
+    phrases = []
+    for word in str(text or "").split():
+        tokens = re.findall(r"\w+", word)
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"*')
+    if not phrases:
+        return ""
+    query = " ".join(phrases)
+    if columns:
+        query = "{" + " ".join(columns) + "} : (" + query + ")"
+    return query
+
+
+# ============================================================
+# STATEMENTS
+# ============================================================
+
+_SELECT_FIELDS = ", ".join(RECORD_FIELDS)
+
+SELECT_RECORD_SQL = f"SELECT {_SELECT_FIELDS} FROM patient_records WHERE id = ?"
+SELECT_ANNOTATIONS_SQL = "SELECT annotations FROM patient_records WHERE id = ?"
+RECENT_ACTIVE_SQL = (
+    "SELECT patient_id, name, result, confidence_value "
+    "FROM patient_records WHERE archived_at IS NULL ORDER BY id DESC LIMIT ?"
+)
+STATUS_COUNTS_SQL = "SELECT COUNT(*) - COUNT(archived_at), COUNT(archived_at) FROM patient_records"
+ARCHIVE_SQL = """
+    UPDATE patient_records
+    SET archived_at = ?, archived_by = ?, archive_reason = ?
+    WHERE id = ? AND archived_at IS NULL
+"""
+RESTORE_SQL = """
+    UPDATE patient_records
+    SET archived_at = NULL, archived_by = NULL, archive_reason = NULL
+    WHERE id = ? AND archived_at IS NOT NULL
+"""
+DELETE_ARCHIVED_SQL = "DELETE FROM patient_records WHERE id = ? AND archived_at IS NOT NULL"
+ARCHIVED_IMAGE_REF_SQL = "SELECT image_ref FROM patient_records WHERE id = ? AND archived_at IS NOT NULL"
+IMAGE_REF_IN_USE_SQL = "SELECT 1 FROM patient_records WHERE image_ref = ? LIMIT 1"
+
+
+@functools.lru_cache(maxsize=None)
+def _insert_sql(columns: tuple) -> str:
+    return (
+        f"INSERT INTO patient_records ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+
+
+# ============================================================
+# REPOSITORY
+# ============================================================
+
+class PatientRecordRepository:
+    """Typed queries over patient_records on the shared connection pool.
+
+    SQL text depends only on a query's shape (archived or not, search mode,
+    which filters are set, sort order), never on its values, and each
+    shape's text is built once. Every pooled connection therefore prepares
+    a statement once and serves repeats from its statement cache
+    (``DatabaseConnection.STATEMENT_CACHE_SIZE``). Listing rows come back
+    as ``PatientRecord`` tuples through a cursor row factory. Methods block;
+    call them from the database executor.
+    """
+
+    def __init__(self):
+        self._use_fts: Optional[bool] = None
+
+    # ---------- query shape ----------
+
+    def search_index_available(self) -> bool:
+        if self._use_fts is None:
+            with DatabaseConnection.connection() as conn:
+                self._use_fts = has_search_index(conn)
+        return self._use_fts
+
+    def _search_mode(self, query: RecordQuery) -> str:
+        if not (query.search_text and query.search_fields):
+            return ""
+        if not self.search_index_available():
+            return "like"
+        return "fts" if build_match_query(query.search_text, query.search_fields) else "none"
+
+    def ranked(self, query: RecordQuery) -> bool:
+        """True when a search orders rows by bm25 relevance instead of a column"""
+        return (
+            query.sort_field is None
+            and bool(query.search_fields)
+            and bool(build_match_query(query.search_text))
+            and self.search_index_available()
+        )
+
+    def _sort_expression(self, query: RecordQuery) -> Optional[str]:
+        if self.ranked(query):
+            return "search_rank"
+        if query.sort_field in (None, "id"):
+            return None
+        if query.sort_field not in RECORD_FIELDS:
+            raise ValueError(f"Unknown sort field: {query.sort_field}")
+        return f"COALESCE({query.sort_field}, '')"
+
+    def keeps_id_order(self, query: RecordQuery) -> bool:
+        """True when rows are listed by id, so an edit never moves a row"""
+        return self._sort_expression(query) is None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _source_sql(archived: bool, search_mode: str, search_fields: tuple, with_grade: bool) -> str:
+        clauses = ["archived_at IS NOT NULL" if archived else "archived_at IS NULL"]
+        source = "patient_records"
+        if search_mode == "fts":
+            source = (
+                f"patient_records JOIN ("
+                f"SELECT rowid AS match_id, rank AS search_rank FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH ?) ON match_id = id"
+            )
+        elif search_mode == "none":
+            clauses.append("0")
+        elif search_mode == "like":
+            likes = " OR ".join(f"{field} LIKE ? ESCAPE '\\'" for field in search_fields)
+            clauses.append(f"({likes})")
+        if with_grade:
+            clauses.append("result_grade = ?")
+        return f"{source} WHERE {' AND '.join(clauses)}"
+
+    def filtered_source(self, query: RecordQuery) -> tuple:
+        """Return the FROM/WHERE SQL (and parameters) matching ``query``."""
+        mode = self._search_mode(query)
+        params = []
+        if mode == "fts":
+            params.append(build_match_query(query.search_text, query.search_fields))
+        elif mode == "like":
+            escaped = query.search_text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.extend([f"%{escaped}%"] * len(query.search_fields))
+        if query.grade is not None:
+            params.append(query.grade)
+        source = self._source_sql(query.archived, mode, tuple(query.search_fields), query.grade is not None)
+        return source, params
+
+    def order_by(self, query: RecordQuery) -> str:
+        direction = "DESC" if query.descending else "ASC"
+        sort_expr = self._sort_expression(query)
+        if sort_expr is None:
+            return f"id {direction}"
+        if self.ranked(query):
+            return f"{sort_expr} ASC, id DESC"
+        return f"{sort_expr} {direction}, id {direction}"
+
+    def ordered_source(self, query: RecordQuery) -> tuple:
+        """Return the FROM/WHERE SQL, its parameters and the ORDER BY of ``query``."""
+        source, params = self.filtered_source(query)
+        return source, params, self.order_by(query)
+
+    # ---------- reads ----------
+
+    def page(self, query: RecordQuery, after: Optional[tuple] = None, limit: int = RECORD_PAGE_SIZE) -> tuple:
+        """One keyset page of records; returns (records, key to pass as ``after`` for the next page)"""
+        source, params = self.filtered_source(query)
+        sort_expr = self._sort_expression(query)
+        id_comparison = "<" if query.descending else ">"
+        key_comparison = ">" if self.ranked(query) else id_comparison
+
+        if after is not None:
+            if sort_expr is None:
+                source += f" AND id {id_comparison} ?"
+                params.append(after[1])
+            else:
+                source += f" AND ({sort_expr} {key_comparison} ? OR ({sort_expr} = ? AND id {id_comparison} ?))"
+                params.extend([after[0], after[0], after[1]])
+
+        sql = f"""
+            SELECT {_SELECT_FIELDS}, {sort_expr or 'id'}
+            FROM {source}
+            ORDER BY {self.order_by(query)}
+            LIMIT ?
+        """
+        with DatabaseConnection.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _keyed_record_row
+            rows = cursor.execute(sql, params + [limit]).fetchall()
+        if not rows:
+            return [], after
+        last_record, last_key = rows[-1]
+        return [record for record, _ in rows], (last_key, last_record.id)
+
+    def fetch_ids(self, query: RecordQuery, record_ids: Sequence[int]) -> list:
+        """Records among ``record_ids`` that still match ``query``"""
+        source, params = self.filtered_source(query)
+        placeholders = ", ".join("?" for _ in record_ids)
+        with DatabaseConnection.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _record_row
+            return cursor.execute(
+                f"SELECT {_SELECT_FIELDS} FROM {source} AND id IN ({placeholders})",
+                params + list(record_ids),
+            ).fetchall()
+
+    def get(self, record_id: int) -> Optional[PatientRecord]:
+        with DatabaseConnection.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = _record_row
+            return cursor.execute(SELECT_RECORD_SQL, (record_id,)).fetchone()
+
+    def count(self, query: RecordQuery) -> int:
+        source, params = self.filtered_source(query)
+        with DatabaseConnection.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {source}", params).fetchone()[0]
+
+    def summary(self, query: RecordQuery) -> RecordSummary:
+        """Report card aggregates over the records matching ``query``"""
+        source, params = self.filtered_source(query)
+        with DatabaseConnection.connection() as conn:
+            row = conn.execute(
+                f"""
+                SELECT COUNT(*),
+                       COUNT(DISTINCT NULLIF(TRIM(patient_id), '')),
+                       COUNT(CASE WHEN result_grade = 0 THEN 1 END),
+                       AVG(hba1c_value)
+                FROM {source}
+                """,
+                params,
+            ).fetchone()
+        return RecordSummary._make(row)
+
+    def status_counts(self) -> tuple:
+        """(active, archived) record counts"""
+        with DatabaseConnection.connection() as conn:
+            return tuple(conn.execute(STATUS_COUNTS_SQL).fetchone())
+
+    def recent_active(self, limit: int, conn: Optional[sqlite3.Connection] = None) -> list:
+        """Newest active records, for the dashboard activity list"""
+        if conn is None:
+            with DatabaseConnection.connection() as pooled:
+                return self.recent_active(limit, pooled)
+        return [RecentRecord._make(row) for row in conn.execute(RECENT_ACTIVE_SQL, (limit,)).fetchall()]
+
+    def annotations(self, record_id: int) -> Optional[bytes]:
+        with DatabaseConnection.connection() as conn:
+            row = conn.execute(SELECT_ANNOTATIONS_SQL, (record_id,)).fetchone()
+        return row[0] if row else None
+
+    # ---------- writes ----------
+
+    def insert(self, columns: Sequence[str], values: Sequence, conn: Optional[sqlite3.Connection] = None) -> str:
+        """Insert one record (patient_id first) and return the patient ID saved"""
+        if conn is None:
+            with DatabaseConnection.transaction() as owned:
+                return self.insert(columns, values, owned)
+        return insert_patient_record(conn, tuple(columns), values)
+
+    def insert_many(self, columns: Sequence[str], rows: Sequence[Sequence], conn: Optional[sqlite3.Connection] = None) -> list:
+        """Insert many records in one executemany call; returns the patient IDs saved.
+
+        Blank IDs are allocated up front. If any ID is already taken, the
+        batch is rolled back to a savepoint and retried row by row, where
+        each conflicting ID is replaced with a fresh one.
+        """
+        if conn is None:
+            with DatabaseConnection.transaction() as owned:
+                return self.insert_many(columns, rows, owned)
+        columns = tuple(columns)
+        if not rows:
+            return []
+        if columns[0] != "patient_id":
+            raise ValueError("patient_id must be the first column")
+        prepared = []
+        for values in rows:
+            values = list(values)
+            values[0] = str(values[0] or "").strip() or patient_ids.allocate()
+            prepared.append(values)
+
+        conn.execute("SAVEPOINT insert_many")
+        try:
+            conn.executemany(_insert_sql(columns), prepared)
+        except sqlite3.IntegrityError as err:
+            conn.execute("ROLLBACK TO insert_many")
+            conn.execute("RELEASE insert_many")
+            if not is_patient_id_conflict(err):
+                raise
+            return [insert_patient_record(conn, columns, values) for values in prepared]
+        conn.execute("RELEASE insert_many")
+        return [values[0] for values in prepared]
+
+    @staticmethod
+    def _write(sql: str, params: tuple) -> int:
+        with DatabaseConnection.transaction() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def archive(self, record_id: int, archived_at: str, archived_by: str, reason: Optional[str] = None) -> int:
+        """Archive an active record; returns the number of rows changed"""
+        return self._write(ARCHIVE_SQL, (archived_at, archived_by, reason, record_id))
+
+    def restore(self, record_id: int) -> int:
+        return self._write(RESTORE_SQL, (record_id,))
+
+    def delete_archived(self, record_id: int) -> int:
+        """Delete a record only if it is archived, and its image once no record references it"""
+        with DatabaseConnection.transaction() as conn:
+            row = conn.execute(ARCHIVED_IMAGE_REF_SQL, (record_id,)).fetchone()
+            deleted = conn.execute(DELETE_ARCHIVED_SQL, (record_id,)).rowcount
+        if deleted and row and row[0]:
+            image_store.remove(row[0], self.image_ref_in_use)
+        return deleted
+
+    @staticmethod
+    def image_ref_in_use(image_ref: str) -> bool:
+        with DatabaseConnection.connection() as conn:
+            return conn.execute(IMAGE_REF_IN_USE_SQL, (image_ref,)).fetchone() is not None
+
+
+record_repository = PatientRecordRepository()
@@ -3,9 +3,9 @@ Reports module for EyeShield EMR application.
 Provides offline summary analytics from local patient_records data.
 """
 
-import csv
+import bisect
 import os
-import sqlite3
+import threading
 from datetime import datetime
 
 from PySide6.QtWidgets import (
@@ -15,18 +15,242 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QPushButton,
     QGroupBox,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
+    QAbstractItemView,
     QLineEdit,
     QComboBox,
     QHeaderView,
     QFileDialog,
     QDialog,
     QMessageBox,
+    QProgressDialog,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QTimer, Signal
+from PySide6.QtGui import QPixmap
+
+from audit import audit_log
+from data_changes import data_changes
+from annotations import decode_annotations
+from db_executor import LoadingBar, database_executor
+from exporter import EXPORT_FORMATS, RecordExportJob, available_formats, format_for_filter, with_extension
+from image_cache import read_image
+from image_store import image_store
+from migrations import RESULT_GRADES, is_high_attention
+from record_repository import RECORD_FIELDS, RECORD_PAGE_SIZE, RecordQuery, record_repository
+
+SEARCH_DEBOUNCE_MS = 150
+
+
+class PatientRecordsTableModel(QAbstractTableModel):
+    """Read-only patient_records model that loads rows in keyset-paged batches.
+
+    Only ``PAGE_SIZE`` rows are fetched up front; the view pulls further
+    pages through ``fetchMore`` as the user scrolls, so the first paint costs
+    the same regardless of how many records exist. Search text is resolved
+    through the FTS5 index and, unless the user picked a sort column,
+    results are ranked by bm25 relevance. Pages come from the record
+    repository on the database executor; pages from superseded queries are
+    discarded.
+    """
+
+    PAGE_SIZE = RECORD_PAGE_SIZE
+
+    load_failed = Signal(str)
+
+    def __init__(self, columns, archived=False, search_fields=(), parent=None):
+        super().__init__(parent)
+        self._columns = list(columns)
+        self._field_index = {field: idx for idx, field in enumerate(RECORD_FIELDS)}
+        self._query = RecordQuery(archived=archived, search_fields=tuple(search_fields))
+        self._rows = []
+        self._has_more = False
+        self._last_key = None
+        self._loading = False
+        self._generation = 0
+        self.loading_indicator = None
+
+    # ── Qt model interface ───────────────────────────────────────────
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self._columns):
+            return self._columns[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        field = self._columns[index.column()][1]
+        value = row[self._field_index[field]]
+
+        if role == Qt.DisplayRole:
+            return str(value or "")
+        if role == Qt.UserRole:
+            return row.id
+        if role == Qt.ForegroundRole and field == "result" and not self._query.archived:
+            if is_high_attention(value):
+                return Qt.darkRed
+            if row.result_grade == 0:
+                return Qt.darkGreen
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more or self._loading:
+            return
+        self._request_page(reset=False)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if 0 <= column < len(self._columns):
+            self._query = self._query._replace(
+                sort_field=self._columns[column][1], descending=order == Qt.DescendingOrder
+            )
+        else:
+            self._query = self._query._replace(sort_field=None, descending=True)
+        self.refresh()
+
+    # ── Query state ──────────────────────────────────────────────────
+
+    @property
+    def query(self):
+        return self._query
+
+    def set_filters(self, search_text="", grade=None):
+        self._query = self._query._replace(search_text=str(search_text or "").strip(), grade=grade)
+        self.refresh()
+
+    def refresh(self):
+        """Replace loaded rows with the first page of the current query once it arrives."""
+        self._generation += 1
+        self._last_key = None
+        self._request_page(reset=True)
+
+    def apply_changes(self, record_ids):
+        """Patch loaded rows for changed records instead of reloading every page.
+
+        Only the default id ordering keeps a row's position fixed when it is
+        edited; any other ordering, or a very large change set, refreshes.
+        """
+        record_ids = list(record_ids)
+        if not record_ids:
+            return
+        if not record_repository.keeps_id_order(self._query) or len(record_ids) > self.PAGE_SIZE:
+            self.refresh()
+            return
+
+        generation = self._generation
+        database_executor.submit(
+            record_repository.fetch_ids,
+            self._query,
+            record_ids,
+            on_result=lambda rows: self._apply_delta(generation, set(record_ids), rows),
+            on_error=lambda err: self.load_failed.emit(str(err)),
+            context=self,
+            indicator=self.loading_indicator,
+        )
+
+    def is_loading(self):
+        return self._loading
+
+    def record_at(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row]._asdict()
+        return None
+
+    def filtered_source(self):
+        """Return the FROM/WHERE SQL (and parameters) matching the current query."""
+        return record_repository.filtered_source(self._query)
+
+    def ordered_source(self):
+        """Return the FROM/WHERE SQL, its parameters and the ORDER BY of the current query."""
+        return record_repository.ordered_source(self._query)
+
+    def _request_page(self, reset):
+        generation = self._generation
+        self._loading = True
+        database_executor.submit(
+            record_repository.page,
+            self._query,
+            None if reset else self._last_key,
+            self.PAGE_SIZE,
+            on_result=lambda page: self._apply_page(generation, page, reset),
+            on_error=lambda err: self._page_failed(generation, err),
+            context=self,
+            indicator=self.loading_indicator,
+        )
+
+    def _apply_page(self, generation, page, reset):
+        if generation != self._generation:
+            return
+        records, self._last_key = page
+        self._loading = False
+        self._has_more = len(records) == self.PAGE_SIZE
+
+        if reset:
+            self.beginResetModel()
+            self._rows = records
+            self.endResetModel()
+        elif records:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(records) - 1)
+            self._rows.extend(records)
+            self.endInsertRows()
+
+    def _apply_delta(self, generation, record_ids, rows):
+        if generation != self._generation:
+            return
+        fresh = {row.id: row for row in rows}
+        last_column = len(self._columns) - 1
+
+        for position in range(len(self._rows) - 1, -1, -1):
+            record_id = self._rows[position].id
+            if record_id not in record_ids:
+                continue
+            row = fresh.pop(record_id, None)
+            if row is None:
+                # Deleted, or no longer matches the filters (e.g. archived)
+                self.beginRemoveRows(QModelIndex(), position, position)
+                del self._rows[position]
+                self.endRemoveRows()
+            else:
+                self._rows[position] = row
+                self.dataChanged.emit(self.index(position, 0), self.index(position, last_column))
+
+        # Newly matching rows go to their id position; rows past the loaded
+        # pages are left for fetchMore to bring in.
+        sign = -1 if self._query.descending else 1
+        for record_id in sorted(fresh, key=lambda value: sign * value):
+            position = bisect.bisect_left(self._rows, sign * record_id, key=lambda row: sign * row.id)
+            if position == len(self._rows) and self._has_more:
+                continue
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, fresh[record_id])
+            self.endInsertRows()
+
+    def _page_failed(self, generation, err):
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._has_more = False
+        self.load_failed.emit(str(err))
+
 
-from auth import DB_FILE
+def _configure_records_view(view):
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setAlternatingRowColors(True)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setSelectionMode(QAbstractItemView.SingleSelection)
+    view.verticalHeader().setVisible(False)
+    view.verticalHeader().setDefaultSectionSize(30)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
 
 class ArchivedRecordsDialog(QDialog):
@@ -35,9 +259,6 @@ class ArchivedRecordsDialog(QDialog):
     def __init__(self, reports_page: "ReportsPage"):
         super().__init__(reports_page)
         self.reports_page = reports_page
-        self._rows = []
-        self._filtered_rows = []
-        self._record_lookup = {}
 
         self.setWindowTitle("Archived Patient Records")
         self.resize(980, 620)
@@ -59,7 +280,11 @@ class ArchivedRecordsDialog(QDialog):
 
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search archived records by patient ID, name, result, or archived by")
-        self.search_input.textChanged.connect(self.apply_filters)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self._search_timer.start)
         controls.addWidget(self.search_input, 1)
 
         self.count_label = QLabel("0 archived")
@@ -67,24 +292,32 @@ class ArchivedRecordsDialog(QDialog):
         controls.addWidget(self.count_label)
         layout.addLayout(controls)
 
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels([
-            "Patient ID",
-            "Name",
-            "Result",
-            "Archived At",
-            "Archived By",
-        ])
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.loading_bar = LoadingBar()
+        layout.addWidget(self.loading_bar)
+
+        self.model = PatientRecordsTableModel(
+            [
+                ("Patient ID", "patient_id"),
+                ("Name", "name"),
+                ("Result", "result"),
+                ("Archived At", "archived_at"),
+                ("Archived By", "archived_by"),
+            ],
+            archived=True,
+            search_fields=("patient_id", "name", "result", "archived_at", "archived_by", "archive_reason"),
+            parent=self,
+        )
+        self.model.loading_indicator = self.loading_bar
+        self.model.load_failed.connect(self._show_load_error)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        _configure_records_view(self.table)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        self.table.itemSelectionChanged.connect(self._update_restore_button)
+        self.table.selectionModel().selectionChanged.connect(self._update_restore_button)
+        self.model.modelReset.connect(self._update_restore_button)
+        self.model.rowsRemoved.connect(self._update_restore_button)
         layout.addWidget(self.table)
 
         actions = QHBoxLayout()
@@ -110,59 +343,47 @@ class ArchivedRecordsDialog(QDialog):
         actions.addWidget(close_btn)
         layout.addLayout(actions)
 
+        data_changes.records_changed.connect(self._on_records_changed)
+        data_changes.resync_required.connect(self.reload_rows)
         self.reload_rows()
 
+    def disconnect_changes(self):
+        """Stop following the change bus (the dialog's window is closing for good)"""
+        data_changes.records_changed.disconnect(self._on_records_changed)
+        data_changes.resync_required.disconnect(self.reload_rows)
+
     def reload_rows(self):
-        self._rows = [row for row in self.reports_page._all_result_rows if row["archived_at"]]
-        self._record_lookup = {row["id"]: row for row in self._rows}
         self.apply_filters()
 
+    def _on_records_changed(self, changes):
+        self.model.apply_changes(changes)
+        self._refresh_count()
+
     def apply_filters(self):
-        query = self.search_input.text().strip().lower()
-        filtered = []
-        for row in self._rows:
-            haystack = " ".join([
-                str(row["patient_id"] or ""),
-                str(row["name"] or ""),
-                str(row["result"] or ""),
-                str(row["archived_at"] or ""),
-                str(row["archived_by"] or ""),
-            ]).lower()
-            if query and query not in haystack:
-                continue
-            filtered.append(row)
-
-        self._filtered_rows = filtered
-        self._render_table()
-
-    def _render_table(self):
-        self.table.setRowCount(0)
-        for row in self._filtered_rows:
-            row_idx = self.table.rowCount()
-            self.table.insertRow(row_idx)
-
-            patient_id_item = QTableWidgetItem(str(row["patient_id"] or ""))
-            patient_id_item.setData(Qt.UserRole, row["id"])
-            self.table.setItem(row_idx, 0, patient_id_item)
-            self.table.setItem(row_idx, 1, QTableWidgetItem(str(row["name"] or "")))
-            self.table.setItem(row_idx, 2, QTableWidgetItem(str(row["result"] or "")))
-            self.table.setItem(row_idx, 3, QTableWidgetItem(str(row["archived_at"] or "")))
-            self.table.setItem(row_idx, 4, QTableWidgetItem(str(row["archived_by"] or "")))
-
-        self.count_label.setText(f"{len(self._filtered_rows)} archived")
+        self._search_timer.stop()
+        self.model.set_filters(self.search_input.text())
+        self._refresh_count()
         self._update_restore_button()
 
-    def _get_selected_record(self):
-        current_row = self.table.currentRow()
-        if current_row < 0:
-            return None
+    def _refresh_count(self):
+        database_executor.submit(
+            record_repository.count,
+            self.model.query,
+            on_result=lambda count: self.count_label.setText(f"{count} archived"),
+            on_error=lambda err: self._show_load_error(str(err)),
+            key="archived-count",
+            context=self,
+            indicator=self.loading_bar,
+        )
 
-        record_item = self.table.item(current_row, 0)
-        if record_item is None:
-            return None
+    def _show_load_error(self, message):
+        QMessageBox.warning(self, "Archived Records", f"Failed to load archived records: {message}")
 
-        record_id = record_item.data(Qt.UserRole)
-        return self._record_lookup.get(record_id)
+    def _get_selected_record(self):
+        current = self.table.currentIndex()
+        if not current.isValid() or not self.table.selectionModel().isSelected(current):
+            return None
+        return self.model.record_at(current.row())
 
     def _update_restore_button(self):
         has_selection = self._get_selected_record() is not None
@@ -175,11 +396,7 @@ class ArchivedRecordsDialog(QDialog):
             QMessageBox.information(self, "Restore Record", "Select an archived patient record to restore.")
             return
 
-        if not self.reports_page.restore_record(record):
-            return
-
-        self.reports_page.refresh_report()
-        self.reload_rows()
+        self.reports_page.restore_record(record)
 
     def delete_selected_record(self):
         record = self._get_selected_record()
@@ -200,12 +417,14 @@ class ArchivedRecordsDialog(QDialog):
         if warning_box.exec() != QMessageBox.StandardButton.Yes:
             return
 
-        if not self.reports_page.delete_archived_record(record):
-            QMessageBox.warning(self, "Delete Record", "Unable to permanently delete the selected archived record.")
-            return
+        self.reports_page.delete_archived_record(record, on_failed=lambda: QMessageBox.warning(
+            self, "Delete Record", "Unable to permanently delete the selected archived record."
+        ))
 
-        self.reports_page.refresh_report()
-        self.reload_rows()
+
+class _ExportSignals(QObject):
+    progress = Signal(int, int)
+    finished = Signal(object)
 
 
 class ReportsPage(QWidget):
@@ -216,17 +435,18 @@ class ReportsPage(QWidget):
         self.username = username or os.environ.get("EYESHIELD_CURRENT_USER", "")
         self.role = role or os.environ.get("EYESHIELD_CURRENT_ROLE", "clinician")
         self.is_admin = self.role == "admin"
-        self.records_changed_callback = None
         self.archived_records_dialog = None
+        self.export_job = None
+        self.export_progress = None
+        self._export_signals = _ExportSignals(self)
+        self._export_signals.progress.connect(self._on_export_progress)
+        self._export_signals.finished.connect(self._on_export_finished)
         self._summary_cache = {}
-        self._all_result_rows = []
-        self._filtered_rows = []
-        self._record_lookup = {}
         self.setStyleSheet("""
             QWidget { background: #f8f9fa; color: #212529; font-family: 'Calibri', 'Inter', 'Arial'; }
             QGroupBox { background: #ffffff; border: 1px solid #dee2e6; border-radius: 8px; }
-            QLineEdit, QComboBox, QTableWidget { background: #ffffff; border: 1px solid #ced4da; border-radius: 8px; }
-            QPushButton:focus, QTableWidget:focus { border: 1px solid #0d6efd; }
+            QLineEdit, QComboBox, QTableView { background: #ffffff; border: 1px solid #ced4da; border-radius: 8px; }
+            QPushButton:focus, QTableView:focus { border: 1px solid #0d6efd; }
             QPushButton { background: #e9ecef; color: #212529; border: 1px solid #ced4da; border-radius: 8px; padding: 8px 16px; font-weight: 600; }
             QPushButton:hover { background: #dee2e6; }
             QPushButton#primaryAction { background: #0d6efd; color: #ffffff; border: 1px solid #0b5ed7; border-radius: 8px; padding: 8px 16px; font-weight: 600; }
@@ -270,6 +490,8 @@ class ReportsPage(QWidget):
         self.status_label = QLabel("Ready")
         self.status_label.setObjectName("statusLabel")
         root.addWidget(self.status_label)
+        self.loading_bar = LoadingBar()
+        root.addWidget(self.loading_bar)
 
         controls_group = QGroupBox("Quick Filters")
         controls_layout = QHBoxLayout(controls_group)
@@ -279,7 +501,11 @@ class ReportsPage(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search by patient ID, name, result, diabetes type, or HbA1c")
         self.search_input.setMinimumHeight(36)
-        self.search_input.textChanged.connect(self.apply_filters)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self._search_timer.start)
         controls_layout.addWidget(self.search_input, 1)
 
         self.result_filter = QComboBox()
@@ -316,30 +542,50 @@ class ReportsPage(QWidget):
         results_layout.setContentsMargins(16, 16, 16, 16)
         results_layout.setSpacing(12)
 
-        if self.is_admin:
-            actions_layout = QHBoxLayout()
-            actions_layout.setSpacing(8)
-            actions_layout.addStretch(1)
+        actions_layout = QHBoxLayout()
+        actions_layout.setSpacing(8)
+        actions_layout.addStretch(1)
+
+        self.view_image_btn = QPushButton("View Image")
+        self.view_image_btn.setToolTip("Open the stored fundus image and its annotations")
+        self.view_image_btn.clicked.connect(self.view_selected_image)
+        self.view_image_btn.setEnabled(False)
+        actions_layout.addWidget(self.view_image_btn)
 
+        if self.is_admin:
             self.archive_btn = QPushButton("Archive Selected")
             self.archive_btn.clicked.connect(self.archive_selected_record)
             self.archive_btn.setEnabled(False)
             actions_layout.addWidget(self.archive_btn)
-
-            results_layout.addLayout(actions_layout)
         else:
             self.archive_btn = None
 
-        self.results_table = QTableWidget(0, 6)
-        self.results_table.setHorizontalHeaderLabels(["Patient ID", "Name", "Result", "Confidence", "Diabetes Type", "HbA1c"])
-        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.results_table.setAlternatingRowColors(True)
+        results_layout.addLayout(actions_layout)
+
+        self.results_model = PatientRecordsTableModel(
+            [
+                ("Patient ID", "patient_id"),
+                ("Name", "name"),
+                ("Result", "result"),
+                ("Confidence", "confidence"),
+                ("Diabetes Type", "diabetes_type"),
+                ("HbA1c", "hba1c"),
+            ],
+            search_fields=("patient_id", "name", "result", "confidence", "diabetes_type", "hba1c"),
+            parent=self,
+        )
+        self.results_model.loading_indicator = self.loading_bar
+        self.results_model.load_failed.connect(self._show_load_error)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        _configure_records_view(self.results_table)
+        # Sorting is delegated to the model (ORDER BY + keyset), default newest first.
+        self.results_table.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
         self.results_table.setSortingEnabled(True)
-        self.results_table.verticalHeader().setVisible(False)
-        self.results_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.results_table.setSelectionMode(QTableWidget.SingleSelection)
-        self.results_table.itemSelectionChanged.connect(self._update_action_buttons)
-        self.results_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.results_table.selectionModel().selectionChanged.connect(self._update_action_buttons)
+        self.results_model.modelReset.connect(self._update_action_buttons)
+        self.results_model.rowsRemoved.connect(self._update_action_buttons)
+        self.results_model.dataChanged.connect(self._update_action_buttons)
         self.results_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.results_table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
         results_layout.addWidget(self.results_table)
@@ -351,8 +597,17 @@ class ReportsPage(QWidget):
         self.setTabOrder(self.search_input, self.result_filter)
         self.setTabOrder(self.result_filter, self.results_table)
 
+        data_changes.records_changed.connect(self._on_records_changed)
+        data_changes.resync_required.connect(self.refresh_report)
         self.refresh_report()
 
+    def disconnect_changes(self):
+        """Stop following the change bus; called when the main window closes"""
+        data_changes.records_changed.disconnect(self._on_records_changed)
+        data_changes.resync_required.disconnect(self.refresh_report)
+        if self.archived_records_dialog is not None:
+            self.archived_records_dialog.disconnect_changes()
+
     def _make_stat_card(self, title: str, value: str) -> tuple[QWidget, QLabel]:
         container = QWidget()
         container.setObjectName("dashTile")
@@ -373,146 +628,65 @@ class ReportsPage(QWidget):
         return container, value_label
 
     def refresh_report(self):
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT id, patient_id, name, result, confidence, diabetes_type, hba1c,
-                       archived_at, archived_by, archive_reason
-                FROM patient_records
-                ORDER BY id DESC
-                """
-            )
-            rows = [
-                {
-                    "id": row[0],
-                    "patient_id": row[1],
-                    "name": row[2],
-                    "result": row[3],
-                    "confidence": row[4],
-                    "diabetes_type": row[5],
-                    "hba1c": row[6],
-                    "archived_at": row[7],
-                    "archived_by": row[8],
-                    "archive_reason": row[9],
-                }
-                for row in cur.fetchall()
-            ]
-            conn.close()
-        except Exception as err:
-            QMessageBox.warning(self, "Reports", f"Failed to load report data: {err}")
-            return
-
-        self._all_result_rows = rows
-        self._record_lookup = {row["id"]: row for row in rows}
-
+        self.status_label.setText("Loading records...")
         self.apply_filters()
 
         if self.archived_records_dialog is not None:
             self.archived_records_dialog.reload_rows()
+        self._refresh_status_counts()
+
+    def _on_records_changed(self, changes):
+        """Apply committed record changes as row deltas and recount the summaries."""
+        self.results_model.apply_changes(changes)
+        self._refresh_summary()
+        self._refresh_status_counts()
+
+    def _refresh_status_counts(self):
+        database_executor.submit(
+            record_repository.status_counts,
+            on_result=self._update_status_counts,
+            on_error=lambda err: self._show_load_error(str(err)),
+            key="reports-status",
+            context=self,
+            indicator=self.loading_bar,
+        )
 
-        active_rows = [row for row in rows if not row["archived_at"]]
-        archived_count = len(rows) - len(active_rows)
+    def _update_status_counts(self, counts):
+        active_count, archived_count = counts
         if self.is_admin:
             self.status_label.setText(
-                f"Updated {len(active_rows)} active and {archived_count} archived records at {datetime.now().strftime('%H:%M:%S')}"
+                f"Updated {active_count} active and {archived_count} archived records at {datetime.now().strftime('%H:%M:%S')}"
             )
         else:
-            self.status_label.setText(f"Updated {len(active_rows)} screenings at {datetime.now().strftime('%H:%M:%S')}")
+            self.status_label.setText(f"Updated {active_count} screenings at {datetime.now().strftime('%H:%M:%S')}")
+
+    def _show_load_error(self, message):
+        QMessageBox.warning(self, "Reports", f"Failed to load report data: {message}")
 
     def apply_filters(self):
-        query = self.search_input.text().strip().lower() if hasattr(self, "search_input") else ""
+        self._search_timer.stop()
+        query = self.search_input.text()
         result_mode = self.result_filter.currentText() if hasattr(self, "result_filter") else "All"
 
-        filtered = []
-        for row in self._all_result_rows:
-            if row["archived_at"]:
-                continue
-
-            patient_id = row["patient_id"]
-            name = row["name"]
-            result = row["result"]
-            confidence = row["confidence"]
-            diabetes_type = row["diabetes_type"]
-            hba1c = row["hba1c"]
-            result_text = str(result or "")
-            normalized = " ".join([
-                str(patient_id or ""),
-                str(name or ""),
-                result_text,
-                str(confidence or ""),
-                str(diabetes_type or ""),
-                str(hba1c or ""),
-            ]).lower()
-
-            if query and query not in normalized:
-                continue
-
-            result_lower = result_text.lower()
-            if result_mode == "No DR" and "no dr" not in result_lower:
-                continue
-            if result_mode == "Mild DR" and "mild" not in result_lower:
-                continue
-            if result_mode == "Moderate DR" and "moderate" not in result_lower:
-                continue
-            if result_mode == "Severe DR" and "severe" not in result_lower:
-                continue
-            if result_mode == "Proliferative DR" and "proliferative" not in result_lower:
-                continue
-
-            filtered.append(row)
-
-        self._filtered_rows = filtered
-        self._update_summary_cards(filtered)
-        self._render_results_table()
-
-    def _render_results_table(self):
-        self.results_table.setSortingEnabled(False)
-        self.results_table.setRowCount(0)
-
-        for row in self._filtered_rows:
-            row_idx = self.results_table.rowCount()
-            self.results_table.insertRow(row_idx)
-
-            patient_id_item = QTableWidgetItem(str(row["patient_id"] or ""))
-            patient_id_item.setData(Qt.UserRole, row["id"])
-            self.results_table.setItem(row_idx, 0, patient_id_item)
-            self.results_table.setItem(row_idx, 1, QTableWidgetItem(str(row["name"] or "")))
-
-            result_item = QTableWidgetItem(str(row["result"] or ""))
-            if self._is_high_attention_result(row["result"]):
-                result_item.setForeground(Qt.darkRed)
-            elif "no dr" in str(row["result"] or "").lower():
-                result_item.setForeground(Qt.darkGreen)
-            self.results_table.setItem(row_idx, 2, result_item)
-
-            self.results_table.setItem(row_idx, 3, QTableWidgetItem(str(row["confidence"] or "")))
-            self.results_table.setItem(row_idx, 4, QTableWidgetItem(str(row["diabetes_type"] or "")))
-            self.results_table.setItem(row_idx, 5, QTableWidgetItem(str(row["hba1c"] or "")))
-
-        self.results_table.setSortingEnabled(True)
-        self.filtered_count_label.setText(f"{len(self._filtered_rows)} shown")
+        self.results_model.set_filters(query, RESULT_GRADES.get(result_mode))
+        self._refresh_summary()
         self._update_action_buttons()
 
-    def _update_summary_cards(self, rows):
-        total = len(rows)
-        unique_patients = len({str(row["patient_id"]).strip() for row in rows if str(row["patient_id"]).strip()})
-        no_dr = 0
-        hba1c_values = []
-
-        for row in rows:
-            result_text = str(row["result"] or "").lower()
-            if "no dr" in result_text:
-                no_dr += 1
-            raw_hba1c = str(row["hba1c"] or "").replace("%", "").strip()
-            try:
-                hba1c_values.append(float(raw_hba1c))
-            except ValueError:
-                pass
+    def _refresh_summary(self):
+        database_executor.submit(
+            record_repository.summary,
+            self.results_model.query,
+            on_result=self._update_summary_cards,
+            on_error=lambda err: self._show_load_error(str(err)),
+            key="reports-summary",
+            context=self,
+            indicator=self.loading_bar,
+        )
 
+    def _update_summary_cards(self, summary):
+        total, unique_patients, no_dr, avg_hba1c = summary
         needs_review = max(0, total - no_dr)
-        avg_hba1c = (sum(hba1c_values) / len(hba1c_values)) if hba1c_values else 0.0
+        avg_hba1c = avg_hba1c or 0.0
 
         self._summary_cache = {
             "total_screenings": total,
@@ -527,31 +701,76 @@ class ReportsPage(QWidget):
         self.no_dr_label.setText(str(no_dr))
         self.review_label.setText(str(needs_review))
         self.hba1c_label.setText(f"{avg_hba1c:.1f}%")
+        self.filtered_count_label.setText(f"{total} shown")
 
     def _get_selected_record(self):
-        current_row = self.results_table.currentRow()
-        if current_row < 0:
-            return None
-
-        record_item = self.results_table.item(current_row, 0)
-        if record_item is None:
+        current = self.results_table.currentIndex()
+        if not current.isValid() or not self.results_table.selectionModel().isSelected(current):
             return None
-
-        record_id = record_item.data(Qt.UserRole)
-        return self._record_lookup.get(record_id)
+        return self.results_model.record_at(current.row())
 
     def _update_action_buttons(self):
+        record = self._get_selected_record()
+        self.view_image_btn.setEnabled(bool(record and record["image_ref"]))
         if not self.is_admin:
             return
 
-        record = self._get_selected_record()
         self.archive_btn.setEnabled(bool(record and not record["archived_at"]))
 
+    def view_selected_image(self):
+        record = self._get_selected_record()
+        if not record or not record["image_ref"]:
+            return
+        self.view_image_btn.setEnabled(False)
+        audit_log.record(
+            "record.view_image",
+            "record",
+            record["patient_id"] or record["id"],
+            f"record id {record['id']}",
+            username=self.username or None,
+        )
+        database_executor.submit(
+            self._load_stored_image,
+            record["id"],
+            record["image_ref"],
+            on_result=lambda loaded: self._show_stored_image(record, loaded),
+            on_error=lambda err: self._show_stored_image(record, err),
+            context=self,
+            indicator=self.loading_bar,
+        )
+
+    @staticmethod
+    def _load_stored_image(record_id, image_ref):
+        """Decode the stored image and its annotations on a worker thread."""
+        try:
+            device = image_store.open(image_ref)
+        except FileNotFoundError:
+            raise FileNotFoundError("The image for this record is missing from the image store.") from None
+        try:
+            image = read_image(device)
+        finally:
+            device.close()
+        strokes, _ = decode_annotations(record_repository.annotations(record_id))
+        return image, strokes
+
+    def _show_stored_image(self, record, loaded):
+        self._update_action_buttons()
+        if isinstance(loaded, Exception):
+            QMessageBox.warning(self, "View Image", f"Unable to open the stored image.\n{loaded}")
+            return
+        from screening import ImageZoomDialog
+
+        image, strokes = loaded
+        title = f"{record['patient_id']} - {record['name']}".strip(" -")
+        dialog = ImageZoomDialog(QPixmap.fromImage(image), title or "Stored Image", self, strokes=strokes)
+        dialog.exec()
+
     def open_archived_records_window(self):
-        self.refresh_report()
         if self.archived_records_dialog is None:
             self.archived_records_dialog = ArchivedRecordsDialog(self)
-        self.archived_records_dialog.reload_rows()
+        else:
+            # The open dialog keeps itself current from the change bus
+            data_changes.poll()
         self.archived_records_dialog.show()
         self.archived_records_dialog.raise_()
         self.archived_records_dialog.activateWindow()
@@ -575,16 +794,16 @@ class ReportsPage(QWidget):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        if not self._set_record_archive_state(record["id"], archived=True):
-            QMessageBox.warning(self, "Archive Record", "Unable to archive the selected patient record.")
-            return
-
-        self.refresh_report()
+        self._set_record_archive_state(
+            record,
+            archived=True,
+            on_failed=lambda: QMessageBox.warning(self, "Archive Record", "Unable to archive the selected patient record."),
+        )
 
     def restore_record(self, record):
         if not record or not record["archived_at"]:
             QMessageBox.information(self, "Restore Record", "The selected patient record is already active.")
-            return False
+            return
 
         patient_label = f"{record['name'] or 'Unknown Patient'} ({record['patient_id'] or 'No ID'})"
         reply = QMessageBox.question(
@@ -594,112 +813,132 @@ class ReportsPage(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
         )
         if reply != QMessageBox.StandardButton.Yes:
-            return False
-
-        if not self._set_record_archive_state(record["id"], archived=False):
-            QMessageBox.warning(self, "Restore Record", "Unable to restore the selected patient record.")
-            return False
+            return
 
-        return True
+        self._set_record_archive_state(
+            record,
+            archived=False,
+            on_failed=lambda: QMessageBox.warning(self, "Restore Record", "Unable to restore the selected patient record."),
+        )
 
-    def delete_archived_record(self, record):
+    def delete_archived_record(self, record, on_failed=None):
         if not record or not record["archived_at"]:
             QMessageBox.information(self, "Delete Record", "Only archived patient records can be deleted.")
-            return False
+            return
 
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            cur.execute("DELETE FROM patient_records WHERE id = ? AND archived_at IS NOT NULL", (record["id"],))
-            conn.commit()
-            success = cur.rowcount > 0
-            conn.close()
-        except Exception:
-            return False
-
-        if success and callable(self.records_changed_callback):
-            self.records_changed_callback()
-        return success
-
-    def _set_record_archive_state(self, record_id, archived: bool) -> bool:
-        actor = self.username or os.environ.get("EYESHIELD_CURRENT_USER", "")
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            if archived:
-                cur.execute(
-                    """
-                    UPDATE patient_records
-                    SET archived_at = ?, archived_by = ?, archive_reason = ?
-                    WHERE id = ?
-                    """,
-                    (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), actor, None, record_id),
-                )
-            else:
-                cur.execute(
-                    """
-                    UPDATE patient_records
-                    SET archived_at = NULL, archived_by = NULL, archive_reason = NULL
-                    WHERE id = ?
-                    """,
-                    (record_id,),
-                )
-            conn.commit()
-            success = cur.rowcount > 0
-            conn.close()
-        except Exception:
-            return False
-
-        if success and callable(self.records_changed_callback):
-            self.records_changed_callback()
-        return success
+        self._submit_record_write(
+            record_repository.delete_archived,
+            (record["id"],),
+            on_failed,
+            audit=("record.delete", record),
+        )
 
-    @staticmethod
-    def _is_high_attention_result(result_text):
-        text = str(result_text or "").lower()
-        keywords = ("moderate", "severe", "proliferative", "refer", "urgent", "dr detected")
-        return any(keyword in text for keyword in keywords)
+    def _set_record_archive_state(self, record, archived: bool, on_failed=None):
+        record_id = record["id"]
+        if archived:
+            actor = self.username or os.environ.get("EYESHIELD_CURRENT_USER", "")
+            write = record_repository.archive
+            params = (record_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), actor)
+        else:
+            write = record_repository.restore
+            params = (record_id,)
+        self._submit_record_write(write, params, on_failed, audit=("record.archive" if archived else "record.restore", record))
+
+    def _submit_record_write(self, write, params, on_failed=None, audit=None):
+        """Run a single-record write in the background, then audit and publish it to dependent views."""
+        def finished(rowcount):
+            if rowcount > 0:
+                if audit is not None:
+                    action, record = audit
+                    audit_log.record(
+                        action,
+                        "record",
+                        record["patient_id"] or record["id"],
+                        f"record id {record['id']}, {record['name'] or 'Unknown Patient'}",
+                        username=self.username or None,
+                    )
+                data_changes.poll()
+            elif on_failed is not None:
+                on_failed()
+
+        database_executor.submit(
+            write,
+            *params,
+            on_result=finished,
+            on_error=lambda err: on_failed() if on_failed is not None else None,
+            context=self,
+            indicator=self.loading_bar,
+        )
 
     def export_summary(self):
+        if self.export_job is not None:
+            self.status_label.setText("An export is already running")
+            return
         if not self._summary_cache:
             self.status_label.setText("No report data to export")
             return
 
-        path, _ = QFileDialog.getSaveFileName(self, "Export DR Screening Results", "", "CSV Files (*.csv)")
+        filters = ";;".join(EXPORT_FORMATS[name][0] for name in available_formats())
+        path, name_filter = QFileDialog.getSaveFileName(self, "Export DR Screening Results", "", filters)
         if not path:
             return
 
-        rows_to_export = list(self._filtered_rows)
-        if not rows_to_export:
+        if not self._summary_cache.get("total_screenings"):
             self.status_label.setText("No visible report data to export")
             return
 
+        export_format = format_for_filter(name_filter)
+        source, params, order_by = self.results_model.ordered_source()
+        self.export_job = RecordExportJob(
+            with_extension(path, export_format),
+            export_format,
+            source,
+            params,
+            order_by,
+            progress=self._export_signals.progress.emit,
+        )
+
+        self.export_progress = QProgressDialog("Preparing export...", "Cancel", 0, 0, self)
+        self.export_progress.setWindowTitle("Export Results")
+        self.export_progress.setWindowModality(Qt.WindowModal)
+        self.export_progress.setMinimumDuration(300)
+        self.export_progress.canceled.connect(self.export_job.cancel)
+        self.export_btn.setEnabled(False)
+        self.status_label.setText("Exporting records...")
+        threading.Thread(target=self._run_export, args=(self.export_job,), name="EyeShieldExport", daemon=True).start()
+
+    def _run_export(self, job):
         try:
-            with open(path, "w", newline="", encoding="utf-8") as file:
-                writer = csv.writer(file)
-                writer.writerow([
-                    "Patient ID",
-                    "Name",
-                    "Result",
-                    "Confidence",
-                    "Diabetes Type",
-                    "HbA1c",
-                    "Record Status",
-                    "Archived At",
-                    "Archived By",
-                ])
-                for row in rows_to_export:
-                    writer.writerow([
-                        row["patient_id"],
-                        row["name"],
-                        row["result"],
-                        row["confidence"],
-                        row["diabetes_type"],
-                        row["hba1c"],
-                        "Archived" if row["archived_at"] else "Active",
-                        row["archived_at"],
-                        row["archived_by"],
-                    ])
-            self.status_label.setText(f"Exported {len(rows_to_export)} rows to {path}")
-        except OSError as err:
-            QMessageBox.warning(self, "Export", f"Failed to export summary: {err}")
+            summary = job.run()
+        except Exception as err:
+            summary = {"error": str(err), "path": job.path}
+        self._export_signals.finished.emit(summary)
+
+    def _on_export_progress(self, written, total):
+        if self.export_progress is None:
+            return
+        self.export_progress.setMaximum(max(1, total))
+        self.export_progress.setValue(written)
+        self.export_progress.setLabelText(f"Exported {written:,} of {total:,} records")
+
+    def _on_export_finished(self, summary):
+        self.export_job = None
+        self.export_btn.setEnabled(True)
+        if self.export_progress is not None:
+            self.export_progress.canceled.disconnect()
+            self.export_progress.close()
+            self.export_progress.deleteLater()
+            self.export_progress = None
+
+        if summary.get("error"):
+            self.status_label.setText("Export failed")
+            QMessageBox.warning(self, "Export", f"Failed to export results: {summary['error']}")
+        elif summary["cancelled"]:
+            self.status_label.setText("Export cancelled; no file was written")
+        else:
+            audit_log.record(
+                "record.export", "file", summary["path"], f"{summary['rows']} rows", username=self.username or None
+            )
+            self.status_label.setText(
+                f"Exported {summary['rows']} rows to {summary['path']} in {summary['elapsed']:.1f} s"
+            )
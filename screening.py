@@ -4,119 +4,38 @@ Handles patient screening functionality and image analysis with fixed UI styling
 """
 
 
-from datetime import datetime
-import secrets
-import sqlite3
 from PySide6.QtWidgets import (
     QWidget, QLabel, QPushButton, QLineEdit, QVBoxLayout, QHBoxLayout,
     QFileDialog, QFormLayout, QGroupBox, QComboBox, QDateEdit, QMessageBox,
     QDoubleSpinBox, QSpinBox, QCheckBox, QTextEdit, QCalendarWidget, QStackedWidget,
-    QGridLayout, QFrame, QStyle, QDialog, QScrollArea
+    QGridLayout, QFrame, QStyle, QDialog
+)
+from PySide6.QtGui import QPixmap, QFont, QRegularExpressionValidator
+from PySide6.QtCore import Qt, QDate, QRegularExpression, QSize
+from annotations import encode_annotations
+from audit import audit_log
+from batch_screening import BatchScreeningDialog
+from data_changes import data_changes
+from db_executor import LoadingBar, database_executor
+from image_cache import RESULTS_PREVIEW_SIZE, UPLOAD_PREVIEW_SIZE, image_decoder
+from image_store import image_store
+from inference import inference_service
+from migrations import numeric_value
+from patient_ids import patient_ids
+from record_repository import record_repository
+from tiled_viewer import TiledImageView
+
+# Column order of the patient_data list built by ScreeningPage.save_screening
+SCREENING_COLUMNS = (
+    "patient_id", "name", "birthdate", "age", "sex", "contact", "eyes", "diabetes_type", "duration",
+    "hba1c", "prev_treatment", "notes", "result", "confidence", "confidence_value", "hba1c_value",
+    "annotations", "image_ref",
 )
-from PySide6.QtGui import QPixmap, QFont, QRegularExpressionValidator, QPainter, QPen, QColor
-from PySide6.QtCore import Qt, QDate, QRegularExpression, QSize, QEvent
-from auth import DB_FILE
-
-
-class DrawableZoomLabel(QLabel):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.base_pixmap = QPixmap()
-        self.zoom_factor = 1.0
-        self.draw_enabled = False
-        self.strokes = []
-        self.current_stroke = []
-        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-    def set_base_pixmap(self, pixmap):
-        self.base_pixmap = pixmap
-        self.strokes = []
-        self.current_stroke = []
-        self._update_display()
-
-    def set_zoom_factor(self, factor):
-        self.zoom_factor = factor
-        self._update_display()
-
-    def set_draw_enabled(self, enabled):
-        self.draw_enabled = enabled
-        self.setCursor(Qt.CursorShape.CrossCursor if enabled else Qt.CursorShape.ArrowCursor)
-
-    def clear_drawings(self):
-        self.strokes = []
-        self.current_stroke = []
-        self._update_display()
-
-    def _map_to_image_point(self, position):
-        if self.base_pixmap.isNull():
-            return (0.0, 0.0)
-
-        max_x = max(0.0, float(self.base_pixmap.width() - 1))
-        max_y = max(0.0, float(self.base_pixmap.height() - 1))
-        point_x = min(max(position.x() / self.zoom_factor, 0.0), max_x)
-        point_y = min(max(position.y() / self.zoom_factor, 0.0), max_y)
-        return (point_x, point_y)
-
-    def _update_display(self):
-        if self.base_pixmap.isNull():
-            self.setPixmap(QPixmap())
-            return
-
-        canvas = self.base_pixmap.scaled(
-            max(1, int(self.base_pixmap.width() * self.zoom_factor)),
-            max(1, int(self.base_pixmap.height() * self.zoom_factor)),
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
-
-        painter = QPainter(canvas)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        pen = QPen(QColor("#c81e1e"), max(2, int(2 * self.zoom_factor)), Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin)
-        painter.setPen(pen)
-
-        for stroke in self.strokes + ([self.current_stroke] if self.current_stroke else []):
-            for index in range(1, len(stroke)):
-                start_x, start_y = stroke[index - 1]
-                end_x, end_y = stroke[index]
-                painter.drawLine(
-                    int(start_x * self.zoom_factor),
-                    int(start_y * self.zoom_factor),
-                    int(end_x * self.zoom_factor),
-                    int(end_y * self.zoom_factor),
-                )
-
-        painter.end()
-        self.setPixmap(canvas)
-        self.resize(canvas.size())
-
-    def mousePressEvent(self, event):
-        if self.draw_enabled and event.button() == Qt.MouseButton.LeftButton and not self.base_pixmap.isNull():
-            self.current_stroke = [self._map_to_image_point(event.position())]
-            self._update_display()
-            return
-        super().mousePressEvent(event)
-
-    def mouseMoveEvent(self, event):
-        if self.draw_enabled and event.buttons() & Qt.MouseButton.LeftButton and self.current_stroke:
-            self.current_stroke.append(self._map_to_image_point(event.position()))
-            self._update_display()
-            return
-        super().mouseMoveEvent(event)
-
-    def mouseReleaseEvent(self, event):
-        if self.draw_enabled and event.button() == Qt.MouseButton.LeftButton and self.current_stroke:
-            self.current_stroke.append(self._map_to_image_point(event.position()))
-            self.strokes.append(self.current_stroke)
-            self.current_stroke = []
-            self._update_display()
-            return
-        super().mouseReleaseEvent(event)
-
 
 class ImageZoomDialog(QDialog):
-    ZOOM_STEP = 1.2
+    ZOOM_STEP = TiledImageView.ZOOM_STEP
 
-    def __init__(self, pixmap, title, parent=None):
+    def __init__(self, pixmap, title, parent=None, strokes=None):
         super().__init__(parent)
         self.original_pixmap = pixmap
         self.zoom_factor = 1.0
@@ -178,40 +97,28 @@ class ImageZoomDialog(QDialog):
 
         layout.addLayout(controls)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(False)
-        self.scroll_area.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.scroll_area, 1)
-
-        self.image_label = DrawableZoomLabel()
-        self.scroll_area.setWidget(self.image_label)
-        self.scroll_area.viewport().installEventFilter(self)
-        self.image_label.installEventFilter(self)
-        self.image_label.set_base_pixmap(self.original_pixmap)
+        # Tiles are painted from a mip pyramid, so zooming never rescales the whole image
+        self.image_view = TiledImageView()
+        self.image_view.zoom_changed.connect(self._on_zoom_changed)
+        self.image_view.set_image(self.original_pixmap)
+        if strokes:
+            self.image_view.set_strokes(strokes)
+        layout.addWidget(self.image_view, 1)
 
         self._update_preview()
 
-    def eventFilter(self, watched, event):
-        if watched in (self.scroll_area.viewport(), self.image_label) and event.type() == QEvent.Type.Wheel:
-            if event.angleDelta().y() > 0:
-                self.zoom_in()
-            elif event.angleDelta().y() < 0:
-                self.zoom_out()
-            return True
-        return super().eventFilter(watched, event)
+    def _on_zoom_changed(self, factor):
+        self.zoom_factor = factor
 
     def _update_preview(self):
-        if self.original_pixmap.isNull():
-            self.image_label.setPixmap(QPixmap())
-            return
-        self.image_label.set_zoom_factor(self.zoom_factor)
+        self.image_view.set_zoom_factor(self.zoom_factor)
 
     def zoom_in(self):
-        self.zoom_factor = min(5.0, self.zoom_factor * self.ZOOM_STEP)
+        self.zoom_factor = min(TiledImageView.MAX_ZOOM, self.zoom_factor * self.ZOOM_STEP)
         self._update_preview()
 
     def zoom_out(self):
-        self.zoom_factor = max(0.2, self.zoom_factor / self.ZOOM_STEP)
+        self.zoom_factor = max(TiledImageView.MIN_ZOOM, self.zoom_factor / self.ZOOM_STEP)
         self._update_preview()
 
     def reset_zoom(self):
@@ -219,10 +126,14 @@ class ImageZoomDialog(QDialog):
         self._update_preview()
 
     def toggle_draw_mode(self, enabled):
-        self.image_label.set_draw_enabled(enabled)
+        self.image_view.set_draw_enabled(enabled)
 
     def clear_drawings(self):
-        self.image_label.clear_drawings()
+        self.image_view.clear_drawings()
+
+    def annotations(self):
+        """Strokes drawn on the image, in source-image pixel coordinates."""
+        return [list(stroke) for stroke in self.image_view.strokes]
 
 
 class ClickableImageLabel(QLabel):
@@ -230,6 +141,8 @@ class ClickableImageLabel(QLabel):
         super().__init__(empty_text, parent)
         self.viewer_title = viewer_title
         self.full_pixmap = QPixmap()
+        self.image_handle = None
+        self.annotations = []
         self.setCursor(Qt.CursorShape.ArrowCursor)
         self.open_badge = QLabel(self)
         self.open_badge.setPixmap(self.style().standardIcon(QStyle.StandardPixmap.SP_DirOpenIcon).pixmap(16, 16))
@@ -240,13 +153,26 @@ class ClickableImageLabel(QLabel):
 
     def set_viewable_pixmap(self, pixmap, max_width, max_height):
         self.full_pixmap = pixmap
+        self.image_handle = None
+        self.annotations = []
         scaled = pixmap.scaled(
             max_width,
             max_height,
             Qt.AspectRatioMode.KeepAspectRatio,
             Qt.TransformationMode.SmoothTransformation,
         )
-        self.setPixmap(scaled)
+        self._show_preview(scaled)
+
+    def set_image_handle(self, handle, max_size):
+        """Show a pre-scaled preview; full resolution is decoded only if the viewer is opened."""
+        if self.image_handle is None or self.image_handle.key != handle.key:
+            self.full_pixmap = QPixmap()
+            self.annotations = []
+        self.image_handle = handle
+        self._show_preview(handle.pixmap(max_size))
+
+    def _show_preview(self, pixmap):
+        self.setPixmap(pixmap)
         self.setText("")
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setToolTip("Click to open and zoom")
@@ -256,6 +182,8 @@ class ClickableImageLabel(QLabel):
 
     def clear_view(self, text):
         self.full_pixmap = QPixmap()
+        self.image_handle = None
+        self.annotations = []
         self.setPixmap(QPixmap())
         self.setText(text)
         self.setCursor(Qt.CursorShape.ArrowCursor)
@@ -274,11 +202,33 @@ class ClickableImageLabel(QLabel):
 
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and not self.full_pixmap.isNull():
-            dialog = ImageZoomDialog(self.full_pixmap, self.viewer_title, self)
-            dialog.exec()
+            self._open_viewer()
+            return
+        if event.button() == Qt.MouseButton.LeftButton and self.image_handle is not None:
+            handle = self.image_handle
+            image_decoder.load_full(
+                handle,
+                on_result=lambda image: self._on_full_image(handle, image),
+                context=self,
+            )
             return
         super().mousePressEvent(event)
 
+    def _on_full_image(self, handle, image):
+        if handle is not self.image_handle:
+            return
+        self.full_pixmap = QPixmap.fromImage(image)
+        self._open_viewer()
+
+    def _open_viewer(self):
+        dialog = ImageZoomDialog(self.full_pixmap, self.viewer_title, self, strokes=self.annotations)
+        dialog.exec()
+        self.annotations = dialog.annotations()
+        self.setToolTip(
+            f"Click to open and zoom ({len(self.annotations)} annotation(s))" if self.annotations
+            else "Click to open and zoom"
+        )
+
 
 class ScreeningPage(QWidget):
     """Patient screening page for DR detection with two-step workflow"""
@@ -286,14 +236,23 @@ class ScreeningPage(QWidget):
     def __init__(self):
         super().__init__()
         self.current_image = None
+        self.current_image_handle = None
         self.patient_counter = 0
         self.min_dob_date = QDate(1900, 1, 1)
         self.max_dob_date = QDate.currentDate()
         self.last_result_class = "Pending"
         self.last_result_conf = "Pending"
+        self._saving = False
+        self._analyzing = False
+        self.batch_dialog = None
         self.stacked_widget = QStackedWidget()
         self.init_ui()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Load the model in the background the first time screening is opened
+        inference_service.warm_up()
+
     def init_ui(self):
         """Initialize the revised UI: patient info and image upload in one window, results in new window"""
         self._apply_ui_polish()
@@ -305,6 +264,8 @@ class ScreeningPage(QWidget):
         self.results_page = ResultsWindow(self)
         self.stacked_widget.addWidget(unified_page)
         self.stacked_widget.addWidget(self.results_page)
+        self.loading_bar = LoadingBar()
+        main_layout.addWidget(self.loading_bar)
         main_layout.addWidget(self.stacked_widget)
         self._setup_validators()
 
@@ -610,6 +571,10 @@ class ScreeningPage(QWidget):
         grid.setRowStretch(1, 1)
         # Analyze Button at bottom right
         analyze_layout = QHBoxLayout()
+        self.btn_batch = QPushButton("Batch Screening...")
+        self.btn_batch.setToolTip("Grade a folder or CSV manifest of fundus images")
+        self.btn_batch.clicked.connect(self.open_batch_screening)
+        analyze_layout.addWidget(self.btn_batch)
         analyze_layout.addStretch()
         self.btn_analyze = QPushButton("Analyze Image")
         self.btn_analyze.setObjectName("primaryAction")
@@ -938,36 +903,10 @@ class ScreeningPage(QWidget):
     # ==================== LOGIC FUNCTIONS ====================
 
     def generate_patient_id(self):
-        pid = self._next_unique_patient_id()
+        pid = patient_ids.allocate()
         self.p_id.setText(pid)
         return pid
 
-    def _next_unique_patient_id(self):
-        for _ in range(25):
-            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            suffix = secrets.token_hex(2).upper()
-            candidate = f"ES-{stamp}-{suffix}"
-            if not self._patient_id_exists(candidate):
-                return candidate
-
-        fallback = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
-        return f"ES-{fallback}"
-
-    def _patient_id_exists(self, patient_id):
-        patient_id = str(patient_id or "").strip()
-        if not patient_id:
-            return False
-
-        try:
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            cur.execute("SELECT 1 FROM patient_records WHERE patient_id = ? LIMIT 1", (patient_id,))
-            exists = cur.fetchone() is not None
-            conn.close()
-            return exists
-        except Exception:
-            return False
-
     def update_age_from_dob(self, date):
         if not date.isValid():
             self.p_age.setValue(0)
@@ -1020,6 +959,8 @@ class ScreeningPage(QWidget):
         self.prev_treatment.setChecked(False)
         self.notes.clear()
         self.current_image = None
+        self.current_image_handle = None
+        self.results_page.source_label.clear_view("")
         self.image_label.clear()
         self.image_label.setText("No image loaded")
         self.image_label.setStyleSheet("border: 2px dashed #ccc; background-color: #f9f9f9;")
@@ -1033,15 +974,39 @@ class ScreeningPage(QWidget):
             self, "Select Fundus Image", "", "Images (*.jpg *.png *.jpeg)"
         )
         if path:
-            self.current_image = path
-            pixmap = QPixmap(path).scaled(
-                450,
-                400,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            self.image_label.setPixmap(pixmap)
-            self.btn_analyze.setEnabled(True)
+            self._load_image(path)
+
+    def _load_image(self, path, on_loaded=None):
+        """Decode once off the GUI thread; the upload and results panels share the handle."""
+        self.current_image = path
+        self.current_image_handle = None
+        self.btn_analyze.setEnabled(False)
+        self.image_label.clear()
+        self.image_label.setText("Loading image...")
+        image_decoder.load(
+            path,
+            (UPLOAD_PREVIEW_SIZE, RESULTS_PREVIEW_SIZE),
+            on_result=lambda handle: self._on_image_loaded(handle, on_loaded),
+            on_error=lambda error: self._on_image_failed(path, error),
+            key="screening-image",
+            context=self,
+            indicator=self.loading_bar,
+        )
+
+    def _on_image_loaded(self, handle, on_loaded=None):
+        if handle.path != self.current_image:
+            return  # cleared or reset while decoding
+        self.current_image_handle = handle
+        self.image_label.setPixmap(handle.pixmap(UPLOAD_PREVIEW_SIZE))
+        self.btn_analyze.setEnabled(True)
+        if on_loaded is not None:
+            on_loaded()
+
+    def _on_image_failed(self, path, error):
+        if path != self.current_image:
+            return
+        self.clear_image()
+        QMessageBox.warning(self, "Image Error", f"Unable to open the selected image.\n{error}")
 
     def screen_another_image(self):
         """Pick a new image from the results page, re-run analysis, update results in place."""
@@ -1050,29 +1015,13 @@ class ScreeningPage(QWidget):
         )
         if not path:
             return
-        self.current_image = path
         # Update the upload panel too so it stays in sync
-        pixmap = QPixmap(path).scaled(
-            450, 400,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation,
-        )
-        self.image_label.setPixmap(pixmap)
-        self.btn_analyze.setEnabled(True)
-        # Re-run analysis (placeholder — replace with real model call when ready)
-        self.last_result_class = "No DR Detected"
-        self.last_result_conf = "Confidence: 93.8%"
-        self.results_page.set_results(
-            self.p_name.text(),
-            path,
-            self.last_result_class,
-            self.last_result_conf,
-        )
+        self._load_image(path, on_loaded=lambda: self._run_analysis(self.current_image_handle))
 
     def open_results_window(self):
         if not self._validate_patient_basics():
             return
-        if not self.current_image:
+        if not self.current_image_handle:
             QMessageBox.warning(self, "Error", "No image loaded")
             return
         confirm_box = QMessageBox(self)
@@ -1085,31 +1034,57 @@ class ScreeningPage(QWidget):
         if confirm_box.clickedButton() != proceed_button:
             return
         # Show results inside the same window
-        self.last_result_class = "No DR Detected"
-        self.last_result_conf = "Confidence: 93.8%"
+        self.stacked_widget.setCurrentIndex(1)
+        self._run_analysis(self.current_image_handle)
+
+    def _run_analysis(self, image_handle):
+        """Classify the image on the inference worker and fill the results page when done."""
+        self._analyzing = True
+        self.last_result_class = "Pending"
+        self.last_result_conf = "Pending"
+        self.results_page.set_analyzing(self.p_name.text(), image_handle)
+        inference_service.classify(
+            image_handle.path,
+            on_result=lambda result: self._on_analysis_finished(image_handle, result),
+            context=self,
+            indicator=self.loading_bar,
+        )
+
+    def _on_analysis_finished(self, image_handle, result):
+        self._analyzing = False
+        self.last_result_class = result.result_class
+        self.last_result_conf = result.confidence_text
         self.results_page.set_results(
             self.p_name.text(),
-            self.current_image,
+            image_handle,
             self.last_result_class,
             self.last_result_conf,
+            result.latency_text or f"Automated grading unavailable: {result.error}",
         )
-        self.stacked_widget.setCurrentIndex(1)
+
+    def open_batch_screening(self):
+        if self.batch_dialog is None:
+            self.batch_dialog = BatchScreeningDialog(self)
+        self.batch_dialog.show()
+        self.batch_dialog.raise_()
+        self.batch_dialog.activateWindow()
 
     def clear_image(self):
         self.current_image = None
+        self.current_image_handle = None
         self.image_label.clear()
         self.image_label.setText("No image loaded")
         self.image_label.setStyleSheet("border: 2px dashed #ccc; background-color: #f9f9f9;")
         self.btn_analyze.setEnabled(False)
 
     def save_screening(self):
+        if self._saving or self._analyzing:
+            return
         if not self._validate_patient_basics():
             return
         name = self.p_name.text().strip()
 
         pid = self.p_id.text().strip()
-        if not pid or self._patient_id_exists(pid):
-            pid = self.generate_patient_id()
 
         dob_date = self._get_dob_date()
         dob_str = dob_date.toString("yyyy-MM-dd") if dob_date.isValid() else ""
@@ -1125,6 +1100,11 @@ class ScreeningPage(QWidget):
         notes = self.notes.toPlainText().strip()
         result = self.last_result_class
         confidence = self.last_result_conf
+        source_label = self.results_page.source_label
+        annotations = encode_annotations(
+            source_label.annotations,
+            source_label.image_handle.source_size.toTuple() if source_label.image_handle else (0, 0),
+        )
 
         patient_data = [
             pid,
@@ -1141,31 +1121,44 @@ class ScreeningPage(QWidget):
             notes,
             result,
             confidence,
+            numeric_value(confidence),
+            round(self.hba1c.value(), 1),
+            annotations,
         ]
 
-        if not self._save_screening_to_db(patient_data):
+        self._saving = True
+        self.results_page.set_saving(True)
+        database_executor.submit(
+            self._save_screening_to_db,
+            patient_data,
+            self.current_image,
+            on_result=self._on_screening_saved,
+            context=self,
+            indicator=self.loading_bar,
+        )
+
+    def _on_screening_saved(self, saved_pid):
+        self._saving = False
+        self.results_page.set_saving(False)
+        if not saved_pid:
             QMessageBox.warning(self, "Save Failed", "Unable to save screening record. Please try again.")
             return
 
+        audit_log.record("record.create", "record", saved_pid, "Screening saved")
+        data_changes.poll()
         self.reset_screening()
 
-    def _save_screening_to_db(self, patient_data):
+    @classmethod
+    def _save_screening_to_db(cls, patient_data, image_path=None):
+        """Insert a screening on a worker thread; returns the saved patient ID or None."""
+        patient_data = list(patient_data)
         try:
-            conn = sqlite3.connect(DB_FILE)
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO patient_records (
-                    patient_id, name, birthdate, age, sex, contact, eyes, diabetes_type, duration, hba1c, prev_treatment, notes, result, confidence
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                patient_data,
-            )
-            conn.commit()
-            conn.close()
-            return True
+            # Only saved screenings reach the store; identical content is stored once
+            with image_store.holding([image_path] if image_path else []) as refs:
+                patient_data.append(refs[0] if refs else None)
+                return record_repository.insert(SCREENING_COLUMNS, patient_data)
         except Exception:
-            return False
+            return None
 class ResultsWindow(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -1319,7 +1312,15 @@ class ResultsWindow(QWidget):
         card_layout.addWidget(value)
         return card, value
 
-    def set_results(self, patient_name, image_path, result_class="Pending", confidence_text="Pending"):
+    def set_analyzing(self, patient_name, image_handle):
+        self.set_results(patient_name, image_handle, "Analyzing...", "Pending")
+        self.recommendation_value.setText("Pending")
+        self.btn_save.setEnabled(False)
+        self.btn_screen_another.setEnabled(False)
+
+    def set_results(self, patient_name, image_handle, result_class="Pending", confidence_text="Pending", analysis_detail=""):
+        self.btn_save.setEnabled(True)
+        self.btn_screen_another.setEnabled(True)
         if patient_name:
             self.title_label.setText(f"Results for {patient_name}")
         else:
@@ -1336,9 +1337,8 @@ class ResultsWindow(QWidget):
             f"Current output shows {result_class.lower()} with {confidence_text.lower()}. The layout is ready for the final heatmap and explanation output."
         )
 
-        if image_path:
-            source_pixmap = QPixmap(image_path)
-            self.source_label.set_viewable_pixmap(source_pixmap, 460, 360)
+        if image_handle is not None:
+            self.source_label.set_image_handle(image_handle, RESULTS_PREVIEW_SIZE)
             self.heatmap_label.clear_view("")
         else:
             self.source_label.clear_view("")
@@ -1347,6 +1347,9 @@ class ResultsWindow(QWidget):
         self.explanation.setText(
             f"Screening result: {result_class}. Confidence: {confidence_text}. This output area is structured for a clinician-friendly review flow, with the original image on the left, the explainability heatmap on the right, and a written summary below for findings and next-step guidance."
         )
+        self.explanation_hint.setText(
+            analysis_detail or "Use this area for screening rationale, referral guidance, and any findings tied to the future heatmap."
+        )
 
     def go_back(self):
         if self.parent_page and hasattr(self.parent_page, "stacked_widget"):
@@ -1356,6 +1359,10 @@ class ResultsWindow(QWidget):
         if self.parent_page and hasattr(self.parent_page, "save_screening"):
             self.parent_page.save_screening()
 
+    def set_saving(self, saving):
+        self.btn_save.setEnabled(not saving)
+        self.btn_save.setText("Saving..." if saving else "Save Patient")
+
     def new_patient(self):
         if self.parent_page and hasattr(self.parent_page, "reset_screening"):
             self.parent_page.reset_screening()
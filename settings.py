@@ -13,8 +13,15 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QComboBox,
     QMessageBox,
+    QFormLayout,
+    QSpinBox,
 )
 
+from auth import DatabaseConnection
+from backup import backup_runner, backup_scheduler, format_backup_result
+from maintenance import maintenance_scheduler
+from storage import JOURNAL_MODES, SYNCHRONOUS_MODES, TEMP_STORE_MODES, StorageConfig, checkpoint_scheduler
+
 DARK_STYLESHEET = """
     /* ---- Base ---- */
     QWidget {
@@ -48,7 +55,7 @@ DARK_STYLESHEET = """
     }
 
     /* ---- Tables ---- */
-    QTableWidget {
+    QTableView {
         background: #313244;
         alternate-background-color: #2a2a3c;
         color: #cdd6f4;
@@ -65,7 +72,7 @@ DARK_STYLESHEET = """
         font-weight: 600;
         font-size: 13px;
     }
-    QTableWidget::item {
+    QTableView::item {
         padding: 8px;
     }
 
@@ -310,14 +317,14 @@ class SettingsPage(QWidget):
                 padding: 0 6px;
                 color: #0d6efd;
             }
-            QComboBox {
+            QComboBox, QSpinBox {
                 background: #ffffff;
                 border: 1px solid #ced4da;
                 border-radius: 8px;
                 padding: 8px;
                 min-height: 20px;
             }
-            QComboBox:focus {
+            QComboBox:focus, QSpinBox:focus {
                 border: 1px solid #0d6efd;
             }
             QCheckBox:focus {
@@ -410,6 +417,80 @@ class SettingsPage(QWidget):
 
         layout.addWidget(pref_group)
 
+        # ── Storage (SQLite journaling and caching) ───────────────────────
+        storage_group = QGroupBox("Storage")
+        self.storage_group = storage_group
+        storage_form = QFormLayout(storage_group)
+        storage_form.setSpacing(8)
+
+        self.journal_combo = QComboBox()
+        self.journal_combo.addItems(JOURNAL_MODES)
+        self.synchronous_combo = QComboBox()
+        self.synchronous_combo.addItems(SYNCHRONOUS_MODES)
+        self.temp_store_combo = QComboBox()
+        self.temp_store_combo.addItems(TEMP_STORE_MODES)
+        self.cache_size_spin = QSpinBox()
+        self.cache_size_spin.setRange(2, 512)
+        self.cache_size_spin.setSuffix(" MiB")
+        self.mmap_size_spin = QSpinBox()
+        self.mmap_size_spin.setRange(0, 1024)
+        self.mmap_size_spin.setSuffix(" MiB")
+        self.checkpoint_spin = QSpinBox()
+        self.checkpoint_spin.setRange(10, 3600)
+        self.checkpoint_spin.setSuffix(" s")
+        self.maintenance_interval_spin = QSpinBox()
+        self.maintenance_interval_spin.setRange(5, 1440)
+        self.maintenance_interval_spin.setSuffix(" min")
+        self.maintenance_budget_spin = QSpinBox()
+        self.maintenance_budget_spin.setRange(10, 2000)
+        self.maintenance_budget_spin.setSuffix(" ms")
+
+        storage_form.addRow("Journal mode:", self.journal_combo)
+        storage_form.addRow("Synchronous:", self.synchronous_combo)
+        storage_form.addRow("Page cache:", self.cache_size_spin)
+        storage_form.addRow("Memory map:", self.mmap_size_spin)
+        storage_form.addRow("Temp store:", self.temp_store_combo)
+        storage_form.addRow("WAL checkpoint every:", self.checkpoint_spin)
+        storage_form.addRow("Maintenance every:", self.maintenance_interval_spin)
+        storage_form.addRow("Maintenance lock budget:", self.maintenance_budget_spin)
+
+        self.storage_status_label = QLabel("")
+        self.storage_status_label.setObjectName("statusLabel")
+        self.storage_status_label.setWordWrap(True)
+        storage_form.addRow(self.storage_status_label)
+
+        layout.addWidget(storage_group)
+
+        # ── Backups (online snapshots of the database) ────────────────────
+        backup_group = QGroupBox("Backups")
+        self.backup_group = backup_group
+        backup_form = QFormLayout(backup_group)
+        backup_form.setSpacing(8)
+
+        self.backup_interval_spin = QSpinBox()
+        self.backup_interval_spin.setRange(0, 168)
+        self.backup_interval_spin.setSuffix(" h")
+        self.backup_interval_spin.setSpecialValueText("Manual only")
+        self.backup_keep_spin = QSpinBox()
+        self.backup_keep_spin.setRange(1, 100)
+        self.backup_keep_spin.setSuffix(" snapshots")
+        self.backup_compress = QCheckBox("Compress snapshots (gzip)")
+        self.backup_compress.setStyleSheet(checkbox_style)
+        self.backup_now_btn = QPushButton("Back Up Now")
+        self.backup_now_btn.clicked.connect(self.back_up_now)
+
+        backup_form.addRow("Back up every:", self.backup_interval_spin)
+        backup_form.addRow("Keep:", self.backup_keep_spin)
+        backup_form.addRow(self.backup_compress)
+        backup_form.addRow(self.backup_now_btn)
+
+        self.backup_status_label = QLabel("")
+        self.backup_status_label.setObjectName("statusLabel")
+        self.backup_status_label.setWordWrap(True)
+        backup_form.addRow(self.backup_status_label)
+
+        layout.addWidget(backup_group)
+
         # ── Action buttons (right after preferences) ──────────────────────
         button_row = QHBoxLayout()
         button_row.addStretch(1)
@@ -490,7 +571,19 @@ class SettingsPage(QWidget):
         self.setTabOrder(self.lang_combo, self.auto_logout)
         self.setTabOrder(self.auto_logout, self.confirm_deletions)
         self.setTabOrder(self.confirm_deletions, self.compact_tables)
-        self.setTabOrder(self.compact_tables, self.reset_btn)
+        self.setTabOrder(self.compact_tables, self.journal_combo)
+        self.setTabOrder(self.journal_combo, self.synchronous_combo)
+        self.setTabOrder(self.synchronous_combo, self.cache_size_spin)
+        self.setTabOrder(self.cache_size_spin, self.mmap_size_spin)
+        self.setTabOrder(self.mmap_size_spin, self.temp_store_combo)
+        self.setTabOrder(self.temp_store_combo, self.checkpoint_spin)
+        self.setTabOrder(self.checkpoint_spin, self.maintenance_interval_spin)
+        self.setTabOrder(self.maintenance_interval_spin, self.maintenance_budget_spin)
+        self.setTabOrder(self.maintenance_budget_spin, self.backup_interval_spin)
+        self.setTabOrder(self.backup_interval_spin, self.backup_keep_spin)
+        self.setTabOrder(self.backup_keep_spin, self.backup_compress)
+        self.setTabOrder(self.backup_compress, self.backup_now_btn)
+        self.setTabOrder(self.backup_now_btn, self.reset_btn)
         self.setTabOrder(self.reset_btn, self.save_btn)
 
         layout.addStretch()
@@ -506,6 +599,8 @@ class SettingsPage(QWidget):
                 "auto_logout": "Enable auto-logout after inactivity",
                 "confirm": "Ask confirmation before destructive actions",
                 "compact": "Use compact table rows",
+                "storage": "Storage",
+                "backups": "Backups",
                 "about": "About",
                 "terms": "Terms of Use",
                 "privacy": "Privacy Policy",
@@ -521,6 +616,8 @@ class SettingsPage(QWidget):
                 "auto_logout": "Activar cierre automático por inactividad",
                 "confirm": "Pedir confirmación antes de acciones destructivas",
                 "compact": "Usar filas compactas en tablas",
+                "storage": "Almacenamiento",
+                "backups": "Copias de seguridad",
                 "about": "Acerca de",
                 "terms": "Términos de Uso",
                 "privacy": "Política de Privacidad",
@@ -536,6 +633,8 @@ class SettingsPage(QWidget):
                 "auto_logout": "Activer la déconnexion automatique après inactivité",
                 "confirm": "Demander confirmation avant les actions destructrices",
                 "compact": "Utiliser des lignes de tableau compactes",
+                "storage": "Stockage",
+                "backups": "Sauvegardes",
                 "about": "À propos",
                 "terms": "Conditions d'utilisation",
                 "privacy": "Politique de confidentialité",
@@ -568,6 +667,8 @@ class SettingsPage(QWidget):
         self.auto_logout.setText(pack["auto_logout"])
         self.confirm_deletions.setText(pack["confirm"])
         self.compact_tables.setText(pack["compact"])
+        self.storage_group.setTitle(pack["storage"])
+        self.backup_group.setTitle(pack["backups"])
         self.about_group.setTitle(pack["about"])
         self.terms_group.setTitle(pack["terms"])
         self.privacy_group.setTitle(pack["privacy"])
@@ -586,8 +687,91 @@ class SettingsPage(QWidget):
             "auto_logout": True,
             "confirm_deletions": True,
             "compact_tables": False,
+            "storage": StorageConfig.default_settings(),
         }
 
+    def _storage_settings(self) -> dict:
+        return StorageConfig.normalize({
+            "journal_mode": self.journal_combo.currentText(),
+            "synchronous": self.synchronous_combo.currentText(),
+            "cache_size_mib": self.cache_size_spin.value(),
+            "mmap_size_mib": self.mmap_size_spin.value(),
+            "temp_store": self.temp_store_combo.currentText(),
+            "checkpoint_interval_seconds": self.checkpoint_spin.value(),
+            "maintenance_interval_minutes": self.maintenance_interval_spin.value(),
+            "maintenance_budget_ms": self.maintenance_budget_spin.value(),
+            "backup_interval_hours": self.backup_interval_spin.value(),
+            "backup_keep": self.backup_keep_spin.value(),
+            "backup_compress": self.backup_compress.isChecked(),
+        })
+
+    def _set_storage_controls(self, storage: dict):
+        storage = StorageConfig.normalize(storage if isinstance(storage, dict) else {})
+        self.journal_combo.setCurrentText(storage["journal_mode"])
+        self.synchronous_combo.setCurrentText(storage["synchronous"])
+        self.cache_size_spin.setValue(storage["cache_size_mib"])
+        self.mmap_size_spin.setValue(storage["mmap_size_mib"])
+        self.temp_store_combo.setCurrentText(storage["temp_store"])
+        self.checkpoint_spin.setValue(storage["checkpoint_interval_seconds"])
+        self.maintenance_interval_spin.setValue(storage["maintenance_interval_minutes"])
+        self.maintenance_budget_spin.setValue(storage["maintenance_budget_ms"])
+        self.backup_interval_spin.setValue(storage["backup_interval_hours"])
+        self.backup_keep_spin.setValue(storage["backup_keep"])
+        self.backup_compress.setChecked(storage["backup_compress"])
+
+    def _refresh_storage_status(self, active=None):
+        if active is None:
+            try:
+                with DatabaseConnection.connection() as conn:
+                    active = StorageConfig.describe(conn)
+            except Exception:
+                self.storage_status_label.setText("Active storage settings unavailable")
+                return
+            active["checkpoint_interval_seconds"] = checkpoint_scheduler.interval_seconds
+            active["maintenance_interval_minutes"] = maintenance_scheduler.interval_minutes
+            active["maintenance_budget_ms"] = maintenance_scheduler.budget_ms
+            active["backup_interval_hours"] = backup_scheduler.interval_hours
+            active["backup_keep"] = backup_scheduler.keep
+            active["backup_compress"] = backup_scheduler.compress
+
+        text = f"Active: {StorageConfig.format_summary(active)}"
+        last = checkpoint_scheduler.last_result
+        if last:
+            text += (
+                f"\nLast checkpoint at {last['finished_at']}: "
+                f"{last['checkpointed_frames']}/{last['wal_frames']} frames in {last['duration_ms']} ms"
+            )
+        maintenance = maintenance_scheduler.last_result
+        if maintenance:
+            vacuum = maintenance["incremental_vacuum"]
+            text += (
+                f"\nLast maintenance: {vacuum['db_bytes'] // 1024:,} KiB, "
+                f"{vacuum['fragmentation']:.1%} free pages, longest lock {vacuum['longest_lock_ms']} ms"
+            )
+        self.storage_status_label.setText(text)
+        self.backup_status_label.setText(
+            f"{format_backup_result(backup_scheduler.last_result)}\nSnapshots are saved to {backup_scheduler.directory}"
+        )
+
+    def back_up_now(self):
+        """Take a snapshot with the saved settings; saves elsewhere in the app continue meanwhile"""
+        self.backup_now_btn.setEnabled(False)
+        self.backup_status_label.setText("Backing up...")
+        backup_runner.back_up_now(
+            on_result=self._on_backup_finished,
+            on_error=self._on_backup_failed,
+            context=self,
+        )
+
+    def _on_backup_finished(self, _result):
+        self.backup_now_btn.setEnabled(True)
+        self._refresh_storage_status()
+
+    def _on_backup_failed(self, error):
+        self.backup_now_btn.setEnabled(True)
+        self._refresh_storage_status()
+        self.backup_status_label.setText(f"Backup failed: {error}")
+
     def load_settings(self):
         settings = self._default_settings()
         path = self._settings_path()
@@ -605,6 +789,8 @@ class SettingsPage(QWidget):
         self.auto_logout.setChecked(bool(settings.get("auto_logout", True)))
         self.confirm_deletions.setChecked(bool(settings.get("confirm_deletions", True)))
         self.compact_tables.setChecked(bool(settings.get("compact_tables", False)))
+        self._set_storage_controls(settings.get("storage"))
+        self._refresh_storage_status()
         self.apply_live_preview()
         self.status_label.setText("Settings loaded")
 
@@ -615,6 +801,7 @@ class SettingsPage(QWidget):
             "auto_logout": self.auto_logout.isChecked(),
             "confirm_deletions": self.confirm_deletions.isChecked(),
             "compact_tables": self.compact_tables.isChecked(),
+            "storage": self._storage_settings(),
         }
         try:
             with open(self._settings_path(), "w", encoding="utf-8") as file:
@@ -624,6 +811,12 @@ class SettingsPage(QWidget):
         except OSError as err:
             self.status_label.setText("Save failed")
             QMessageBox.warning(self, "Settings", f"Failed to save settings: {err}")
+            return
+
+        try:
+            self._refresh_storage_status(StorageConfig.apply(settings["storage"]))
+        except Exception as err:
+            QMessageBox.warning(self, "Settings", f"Failed to apply storage settings: {err}")
 
     def reset_defaults(self):
         defaults = self._default_settings()
@@ -632,4 +825,5 @@ class SettingsPage(QWidget):
         self.auto_logout.setChecked(defaults["auto_logout"])
         self.confirm_deletions.setChecked(defaults["confirm_deletions"])
         self.compact_tables.setChecked(defaults["compact_tables"])
+        self._set_storage_controls(defaults["storage"])
         self.status_label.setText("Defaults restored (not yet saved)")
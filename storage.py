@@ -0,0 +1,273 @@
+"""
+Storage configuration module for EyeShield EMR application.
+Controls SQLite journaling, per-connection PRAGMAs and background WAL checkpoints.
+"""
+
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from auth import DatabaseConnection
+from backup import backup_scheduler
+from maintenance import maintenance_scheduler
+from migrations import run_backfills
+
+JOURNAL_MODES = ("WAL", "DELETE")
+SYNCHRONOUS_MODES = ("NORMAL", "FULL")
+TEMP_STORE_MODES = ("MEMORY", "DEFAULT", "FILE")
+
+
+# ============================================================
+# STORAGE SETTINGS
+# ============================================================
+
+class StorageConfig:
+    """Loads, validates and applies the SQLite storage settings"""
+
+    SETTINGS_FILE = "settings_data.json"
+    SETTINGS_KEY = "storage"
+
+    @staticmethod
+    def default_settings() -> dict:
+        return {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "cache_size_mib": 16,
+            "mmap_size_mib": 64,
+            "temp_store": "MEMORY",
+            "checkpoint_interval_seconds": 60,
+            "maintenance_interval_minutes": 60,
+            "maintenance_budget_ms": 100,
+            "backup_interval_hours": 24,
+            "backup_keep": 7,
+            "backup_compress": True,
+        }
+
+    @classmethod
+    def settings_path(cls) -> str:
+        return os.path.join(os.path.dirname(__file__), cls.SETTINGS_FILE)
+
+    @classmethod
+    def load(cls) -> dict:
+        """Read storage settings from the shared settings file, falling back to defaults"""
+        settings = cls.default_settings()
+        path = cls.settings_path()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    loaded = json.load(file)
+                if isinstance(loaded, dict) and isinstance(loaded.get(cls.SETTINGS_KEY), dict):
+                    settings.update(loaded[cls.SETTINGS_KEY])
+            except (OSError, json.JSONDecodeError):
+                pass
+        return cls.normalize(settings)
+
+    @classmethod
+    def normalize(cls, settings: dict) -> dict:
+        """Clamp user-supplied values to the supported ranges"""
+        defaults = cls.default_settings()
+
+        def choice(key, options):
+            value = str(settings.get(key, defaults[key])).upper()
+            return value if value in options else defaults[key]
+
+        def bounded_int(key, low, high):
+            try:
+                value = int(settings.get(key, defaults[key]))
+            except (TypeError, ValueError):
+                value = defaults[key]
+            return max(low, min(high, value))
+
+        def flag(key):
+            value = settings.get(key, defaults[key])
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+
+        return {
+            "journal_mode": choice("journal_mode", JOURNAL_MODES),
+            "synchronous": choice("synchronous", SYNCHRONOUS_MODES),
+            "cache_size_mib": bounded_int("cache_size_mib", 2, 512),
+            "mmap_size_mib": bounded_int("mmap_size_mib", 0, 1024),
+            "temp_store": choice("temp_store", TEMP_STORE_MODES),
+            "checkpoint_interval_seconds": bounded_int("checkpoint_interval_seconds", 10, 3600),
+            "maintenance_interval_minutes": bounded_int("maintenance_interval_minutes", 5, 1440),
+            "maintenance_budget_ms": bounded_int("maintenance_budget_ms", 10, 2000),
+            "backup_interval_hours": bounded_int("backup_interval_hours", 0, 168),
+            "backup_keep": bounded_int("backup_keep", 1, 100),
+            "backup_compress": flag("backup_compress"),
+        }
+
+    @staticmethod
+    def connection_pragmas(settings: dict) -> tuple:
+        """PRAGMAs that must be set on every connection (journal_mode is per-database)"""
+        return (
+            ("synchronous", settings["synchronous"]),
+            ("cache_size", str(-settings["cache_size_mib"] * 1024)),
+            ("mmap_size", str(settings["mmap_size_mib"] * 1024 * 1024)),
+            ("temp_store", settings["temp_store"]),
+        )
+
+    @classmethod
+    def apply(cls, settings: Optional[dict] = None) -> dict:
+        """Apply settings to the pool and the database file, returning the active values"""
+        settings = cls.normalize(settings or cls.load())
+        DatabaseConnection.set_pragmas(cls.connection_pragmas(settings))
+
+        with DatabaseConnection.connection() as conn:
+            with contextlib.suppress(sqlite3.OperationalError):
+                conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+            active = cls.describe(conn)
+
+        checkpoint_scheduler.set_interval(settings["checkpoint_interval_seconds"])
+        maintenance_scheduler.configure(settings["maintenance_interval_minutes"], settings["maintenance_budget_ms"])
+        backup_scheduler.configure(settings["backup_interval_hours"], settings["backup_keep"], settings["backup_compress"])
+        active["checkpoint_interval_seconds"] = settings["checkpoint_interval_seconds"]
+        active["maintenance_interval_minutes"] = settings["maintenance_interval_minutes"]
+        active["maintenance_budget_ms"] = settings["maintenance_budget_ms"]
+        active["backup_interval_hours"] = settings["backup_interval_hours"]
+        active["backup_keep"] = settings["backup_keep"]
+        active["backup_compress"] = settings["backup_compress"]
+        return active
+
+    @staticmethod
+    def describe(conn: sqlite3.Connection) -> dict:
+        """Read back the storage PRAGMAs actually in effect on a connection"""
+        def pragma(name):
+            row = conn.execute(f"PRAGMA {name}").fetchone()
+            return row[0] if row else None
+
+        synchronous_names = {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"}
+        temp_store_names = {0: "DEFAULT", 1: "FILE", 2: "MEMORY"}
+        cache_size = int(pragma("cache_size") or 0)
+        cache_kib = -cache_size if cache_size < 0 else cache_size * int(pragma("page_size") or 4096) // 1024
+        return {
+            "journal_mode": str(pragma("journal_mode") or "").upper(),
+            "synchronous": synchronous_names.get(pragma("synchronous"), "UNKNOWN"),
+            "cache_size_mib": cache_kib // 1024,
+            "mmap_size_mib": int(pragma("mmap_size") or 0) // (1024 * 1024),
+            "temp_store": temp_store_names.get(pragma("temp_store"), "UNKNOWN"),
+        }
+
+    @staticmethod
+    def format_summary(active: dict) -> str:
+        return (
+            f"journal={active.get('journal_mode', '?')} "
+            f"synchronous={active.get('synchronous', '?')} "
+            f"cache={active.get('cache_size_mib', '?')} MiB "
+            f"mmap={active.get('mmap_size_mib', '?')} MiB "
+            f"temp_store={active.get('temp_store', '?')} "
+            f"checkpoint={active.get('checkpoint_interval_seconds', '?')}s "
+            f"maintenance={active.get('maintenance_interval_minutes', '?')}min/"
+            f"{active.get('maintenance_budget_ms', '?')}ms "
+            f"backup={_backup_summary(active)}"
+        )
+
+
+def _backup_summary(active: dict) -> str:
+    if active.get("backup_interval_hours") == 0:
+        return "manual"
+    compressed = "gz" if active.get("backup_compress", True) else "raw"
+    return f"{active.get('backup_interval_hours', '?')}h/keep {active.get('backup_keep', '?')}/{compressed}"
+
+
+# ============================================================
+# WAL CHECKPOINTS
+# ============================================================
+
+class CheckpointScheduler:
+    """Runs passive WAL checkpoints on a background thread"""
+
+    def __init__(self, interval_seconds: int = 60):
+        self.interval_seconds = interval_seconds
+        self.last_result: Optional[dict] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_interval(self, interval_seconds: int) -> None:
+        self.interval_seconds = max(1, int(interval_seconds))
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="EyeShieldCheckpoint", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def checkpoint_now(self) -> Optional[dict]:
+        """Run one PASSIVE checkpoint; never waits on readers or writers"""
+        started = time.perf_counter()
+        try:
+            conn = DatabaseConnection.open_connection()
+            try:
+                row = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+
+        busy, log_frames, checkpointed = row if row else (0, -1, -1)
+        self.last_result = {
+            "busy": bool(busy),
+            "wal_frames": log_frames,
+            "checkpointed_frames": checkpointed,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "finished_at": time.strftime("%H:%M:%S"),
+        }
+        return self.last_result
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_seconds)
+            if self._wake.is_set():
+                self._wake.clear()
+                continue
+            if not self._stop.is_set():
+                self.checkpoint_now()
+
+
+checkpoint_scheduler = CheckpointScheduler()
+
+
+def start_backfills() -> threading.Thread:
+    """Fill derived columns for older rows on a daemon thread, in short transactions"""
+    def worker():
+        try:
+            conn = DatabaseConnection.open_connection()
+            try:
+                updated = run_backfills(conn, pause=0.01)
+            finally:
+                conn.close()
+        except sqlite3.Error as err:
+            print(f"[EyeShield] Backfill stopped: {err}")
+            return
+        if updated:
+            print(f"[EyeShield] Backfilled {updated} patient records")
+
+    thread = threading.Thread(target=worker, name="EyeShieldBackfill", daemon=True)
+    thread.start()
+    return thread
+
+
+def configure_storage() -> dict:
+    """Apply saved storage settings, start background work and report the result"""
+    active = StorageConfig.apply()
+    checkpoint_scheduler.start()
+    maintenance_scheduler.start()
+    backup_scheduler.start()
+    start_backfills()
+    print(f"[EyeShield] Storage: {StorageConfig.format_summary(active)}")
+    return active
@@ -0,0 +1,401 @@
+"""
+Tiled viewer module for EyeShield EMR application.
+Renders large fundus images from a mip-level tile pyramid, painting only the tiles in view.
+"""
+
+import math
+from collections import OrderedDict
+from typing import Optional
+
+from PySide6.QtCore import QPointF, QRect, QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPixmap, QPolygonF
+from PySide6.QtWidgets import QAbstractScrollArea
+
+from annotations import SIMPLIFY_TOLERANCE, simplify_stroke
+
+
+TILE_SIZE = 256
+TILE_CACHE_BUDGET_BYTES = 96 * 1024 * 1024
+
+
+# ============================================================
+# PYRAMID
+# ============================================================
+
+class ImagePyramid:
+    """Source image plus successive half-size levels down to a single tile.
+
+    Level ``n`` is the image scaled by ``1 / 2**n``; the renderer draws from the
+    smallest level that still has at least as many pixels as the screen needs.
+    """
+
+    def __init__(self, image: QImage, tile_size: int = TILE_SIZE):
+        self.tile_size = tile_size
+        base = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        self.levels = [base]
+        while max(self.levels[-1].width(), self.levels[-1].height()) > tile_size:
+            previous = self.levels[-1]
+            self.levels.append(previous.scaled(
+                max(1, previous.width() // 2),
+                max(1, previous.height() // 2),
+                Qt.AspectRatioMode.IgnoreAspectRatio,
+                Qt.TransformationMode.SmoothTransformation,
+            ))
+
+    @property
+    def width(self) -> int:
+        return self.levels[0].width()
+
+    @property
+    def height(self) -> int:
+        return self.levels[0].height()
+
+    def is_null(self) -> bool:
+        return self.levels[0].isNull()
+
+    def level_for(self, zoom: float) -> int:
+        """Coarsest level whose resolution is still >= the on-screen resolution"""
+        if zoom >= 1.0:
+            return 0
+        return min(len(self.levels) - 1, int(math.floor(math.log2(1.0 / zoom))))
+
+    def scale_of(self, level: int) -> float:
+        """Level pixels per source pixel"""
+        return self.levels[level].width() / self.width
+
+    def tile_rect(self, level: int, column: int, row: int) -> QRect:
+        image = self.levels[level]
+        x = column * self.tile_size
+        y = row * self.tile_size
+        return QRect(x, y, min(self.tile_size, image.width() - x), min(self.tile_size, image.height() - y))
+
+
+class TileCache:
+    """LRU of tile pixmaps bounded by pixel memory"""
+
+    def __init__(self, budget_bytes: int = TILE_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._tiles = OrderedDict()
+        self._used = 0
+
+    def tile(self, pyramid: ImagePyramid, level: int, column: int, row: int) -> QPixmap:
+        key = (level, column, row)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+
+        rect = pyramid.tile_rect(level, column, row)
+        pixmap = QPixmap.fromImage(pyramid.levels[level].copy(rect))
+        self._tiles[key] = pixmap
+        self._used += rect.width() * rect.height() * 4
+        while self._used > self.budget_bytes and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._used -= evicted.width() * evicted.height() * 4
+        return pixmap
+
+    def clear(self) -> None:
+        self._tiles.clear()
+        self._used = 0
+
+
+# ============================================================
+# VIEW
+# ============================================================
+
+class TiledImageView(QAbstractScrollArea):
+    """Zoomable, pannable image view with freehand annotation strokes.
+
+    Strokes are stored in source-image coordinates, so they stay put at any
+    zoom. Completed strokes are rendered once into a viewport-sized layer
+    that is rebuilt only when zoom, scroll or size change; the stroke being
+    drawn has its own layer that receives just the newest segment per
+    mouse move.
+    """
+
+    MIN_ZOOM = 0.2
+    MAX_ZOOM = 5.0
+    ZOOM_STEP = 1.2
+    STROKE_COLOR = "#c81e1e"
+
+    zoom_changed = Signal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pyramid: Optional[ImagePyramid] = None
+        self.tile_cache = TileCache()
+        self.zoom_factor = 1.0
+        self.draw_enabled = False
+        self.strokes = []
+        self.current_stroke = []
+        self._stroke_bounds = []
+        self._strokes_layer = QPixmap()
+        self._strokes_layer_key = None
+        self._active_layer = QPixmap()
+        self._active_layer_key = None
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.horizontalScrollBar().setSingleStep(32)
+        self.verticalScrollBar().setSingleStep(32)
+
+    # ---------- image & zoom ----------
+
+    def set_image(self, image) -> None:
+        if isinstance(image, QPixmap):
+            image = image.toImage()
+        self.pyramid = None if image is None or image.isNull() else ImagePyramid(image)
+        self.tile_cache.clear()
+        self.set_strokes([])
+        self._update_scrollbars()
+        self.viewport().update()
+
+    def set_zoom_factor(self, factor: float, anchor: Optional[QPointF] = None) -> None:
+        """Zoom keeping the image point under ``anchor`` (viewport coords; default centre) still"""
+        factor = min(self.MAX_ZOOM, max(self.MIN_ZOOM, factor))
+        if anchor is None:
+            anchor = QPointF(self.viewport().width() / 2, self.viewport().height() / 2)
+        image_point = self._to_image(anchor)
+
+        self.zoom_factor = factor
+        self._update_scrollbars()
+        # Scroll so the anchored image point lands back under the cursor
+        self.horizontalScrollBar().setValue(int(round(image_point[0] * factor - anchor.x())))
+        self.verticalScrollBar().setValue(int(round(image_point[1] * factor - anchor.y())))
+        self.viewport().update()
+        self.zoom_changed.emit(factor)
+
+    def _content_size(self) -> tuple:
+        if self.pyramid is None:
+            return 0, 0
+        return (
+            max(1, int(self.pyramid.width * self.zoom_factor)),
+            max(1, int(self.pyramid.height * self.zoom_factor)),
+        )
+
+    def _update_scrollbars(self) -> None:
+        width, height = self._content_size()
+        viewport = self.viewport().size()
+        for bar, content, visible in (
+            (self.horizontalScrollBar(), width, viewport.width()),
+            (self.verticalScrollBar(), height, viewport.height()),
+        ):
+            bar.setPageStep(visible)
+            bar.setRange(0, max(0, content - visible))
+
+    def _offset(self) -> QPointF:
+        """Viewport position of the image origin (centred when smaller than the view)"""
+        width, height = self._content_size()
+        viewport = self.viewport().size()
+        x = (viewport.width() - width) / 2 if width < viewport.width() else -self.horizontalScrollBar().value()
+        y = (viewport.height() - height) / 2 if height < viewport.height() else -self.verticalScrollBar().value()
+        return QPointF(x, y)
+
+    def _to_image(self, position: QPointF) -> tuple:
+        offset = self._offset()
+        return (
+            (position.x() - offset.x()) / self.zoom_factor,
+            (position.y() - offset.y()) / self.zoom_factor,
+        )
+
+    def _to_view(self, point: tuple) -> QPointF:
+        offset = self._offset()
+        return QPointF(point[0] * self.zoom_factor + offset.x(), point[1] * self.zoom_factor + offset.y())
+
+    # ---------- painting ----------
+
+    def _stroke_pen(self) -> QPen:
+        pen = QPen(
+            QColor(self.STROKE_COLOR), max(2, int(2 * self.zoom_factor)),
+            Qt.PenStyle.SolidLine, Qt.PenCapStyle.RoundCap, Qt.PenJoinStyle.RoundJoin,
+        )
+        pen.setCosmetic(True)
+        return pen
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        dirty = QRectF(event.rect())
+        painter.fillRect(dirty, self.palette().window())
+        if self.pyramid is None:
+            return
+
+        offset = self._offset()
+        zoom = self.zoom_factor
+        # Visible part of the source image, in source pixels
+        left = max(0.0, (dirty.left() - offset.x()) / zoom)
+        top = max(0.0, (dirty.top() - offset.y()) / zoom)
+        right = min(float(self.pyramid.width), (dirty.right() + 1 - offset.x()) / zoom)
+        bottom = min(float(self.pyramid.height), (dirty.bottom() + 1 - offset.y()) / zoom)
+
+        if right > left and bottom > top:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, zoom < 2.0)
+            level = self.pyramid.level_for(zoom)
+            level_scale = self.pyramid.scale_of(level)
+            tile = self.pyramid.tile_size
+            first_column = int(left * level_scale) // tile
+            last_column = int(math.ceil(right * level_scale - 1)) // tile
+            first_row = int(top * level_scale) // tile
+            last_row = int(math.ceil(bottom * level_scale - 1)) // tile
+            to_view = zoom / level_scale
+
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    rect = self.pyramid.tile_rect(level, column, row)
+                    if rect.isEmpty():
+                        continue
+                    target = QRectF(
+                        offset.x() + rect.x() * to_view,
+                        offset.y() + rect.y() * to_view,
+                        rect.width() * to_view,
+                        rect.height() * to_view,
+                    )
+                    painter.drawPixmap(target, self.tile_cache.tile(self.pyramid, level, column, row), QRectF(0, 0, rect.width(), rect.height()))
+
+        # Painting is clipped to the dirty rect, so blitting whole layers is cheap
+        if self.strokes:
+            painter.drawPixmap(0, 0, self._strokes_layer_for_view())
+        if self.current_stroke:
+            if self._active_layer_key != self._layer_key():
+                self._begin_active_layer()
+                self._draw_polyline(self._active_layer, self.current_stroke)
+            painter.drawPixmap(0, 0, self._active_layer)
+
+    # ---------- stroke layers ----------
+
+    def _layer_key(self) -> tuple:
+        offset = self._offset()
+        return (self.zoom_factor, offset.x(), offset.y(), self.viewport().size().toTuple(), self.devicePixelRatioF())
+
+    def _new_layer(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.viewport().size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(Qt.GlobalColor.transparent)
+        return layer
+
+    def _draw_polyline(self, layer: QPixmap, points: list) -> None:
+        painter = QPainter(layer)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._stroke_pen())
+        mapped = [self._to_view(point) for point in points]
+        if len(mapped) == 1:
+            painter.drawPoint(mapped[0])
+        else:
+            painter.drawPolyline(QPolygonF(mapped))
+        painter.end()
+
+    def _strokes_layer_for_view(self) -> QPixmap:
+        """Completed strokes rendered for the current zoom/scroll; rebuilt only when those change"""
+        key = self._layer_key()
+        if key != self._strokes_layer_key:
+            self._strokes_layer = self._new_layer()
+            self._strokes_layer_key = key
+            visible = QRectF(self.viewport().rect())
+            for stroke, bounds in zip(self.strokes, self._stroke_bounds):
+                if self._bounds_to_view(bounds).intersects(visible):
+                    self._draw_polyline(self._strokes_layer, stroke)
+        return self._strokes_layer
+
+    def _begin_active_layer(self) -> None:
+        self._active_layer = self._new_layer()
+        self._active_layer_key = self._layer_key()
+
+    @staticmethod
+    def _bounds_of(stroke: list) -> QRectF:
+        xs = [x for x, _ in stroke]
+        ys = [y for _, y in stroke]
+        return QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+    def _bounds_to_view(self, bounds: QRectF) -> QRectF:
+        margin = self._stroke_pen().widthF() + 2
+        return QRectF(
+            self._to_view((bounds.left(), bounds.top())),
+            self._to_view((bounds.right(), bounds.bottom())),
+        ).adjusted(-margin, -margin, margin, margin)
+
+    def _segment_rect(self, start: tuple, end: tuple) -> QRect:
+        margin = self._stroke_pen().widthF() + 2
+        return QRectF(self._to_view(start), self._to_view(end)).normalized().adjusted(
+            -margin, -margin, margin, margin
+        ).toAlignedRect()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if delta:
+            step = self.ZOOM_STEP if delta > 0 else 1 / self.ZOOM_STEP
+            self.set_zoom_factor(self.zoom_factor * step, event.position())
+        event.accept()
+
+    # ---------- drawing ----------
+
+    def set_draw_enabled(self, enabled: bool) -> None:
+        self.draw_enabled = enabled
+        self.viewport().setCursor(Qt.CursorShape.CrossCursor if enabled else Qt.CursorShape.ArrowCursor)
+
+    def clear_drawings(self) -> None:
+        self.set_strokes([])
+
+    def set_strokes(self, strokes: list) -> None:
+        """Replace all strokes (lists of (x, y) source-image points), e.g. when restoring saved annotations"""
+        self.strokes = [list(stroke) for stroke in strokes if stroke]
+        self._stroke_bounds = [self._bounds_of(stroke) for stroke in self.strokes]
+        self.current_stroke = []
+        self._strokes_layer_key = None
+        self.viewport().update()
+
+    def _map_to_image_point(self, position: QPointF) -> tuple:
+        x, y = self._to_image(position)
+        return (
+            min(max(x, 0.0), max(0.0, float(self.pyramid.width - 1))),
+            min(max(y, 0.0), max(0.0, float(self.pyramid.height - 1))),
+        )
+
+    def _extend_stroke(self, position: QPointF) -> None:
+        point = self._map_to_image_point(position)
+        previous = self.current_stroke[-1]
+        if point == previous:
+            return
+        self.current_stroke.append(point)
+        if self._active_layer_key == self._layer_key():
+            # Incremental: only the newest segment touches the layer
+            self._draw_polyline(self._active_layer, [previous, point])
+        self.viewport().update(self._segment_rect(previous, point))
+
+    def _finish_stroke(self) -> None:
+        stroke = simplify_stroke(self.current_stroke, SIMPLIFY_TOLERANCE)
+        self.strokes.append(stroke)
+        self._stroke_bounds.append(self._bounds_of(stroke))
+        self.current_stroke = []
+        self._active_layer = QPixmap()
+        self._active_layer_key = None
+        if self._strokes_layer_key == self._layer_key():
+            self._draw_polyline(self._strokes_layer, stroke)
+        self.viewport().update(self._bounds_to_view(self._stroke_bounds[-1]).toAlignedRect())
+
+    def mousePressEvent(self, event):
+        if self.draw_enabled and event.button() == Qt.MouseButton.LeftButton and self.pyramid is not None:
+            point = self._map_to_image_point(event.position())
+            self.current_stroke = [point]
+            self._begin_active_layer()
+            self._draw_polyline(self._active_layer, self.current_stroke)
+            self.viewport().update(self._segment_rect(point, point))
+            return
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.draw_enabled and event.buttons() & Qt.MouseButton.LeftButton and self.current_stroke:
+            self._extend_stroke(event.position())
+            return
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if self.draw_enabled and event.button() == Qt.MouseButton.LeftButton and self.current_stroke:
+            self._extend_stroke(event.position())
+            self._finish_stroke()
+            return
+        super().mouseReleaseEvent(event)
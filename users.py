@@ -10,11 +10,14 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
     QHBoxLayout, QPushButton, QLineEdit, QComboBox, QMessageBox,
     QGroupBox, QFormLayout, QAbstractItemView, QDialog,
-    QHeaderView, QGridLayout, QInputDialog
+    QHeaderView, QGridLayout, QInputDialog, QTableView, QDateEdit
 )
 from PySide6.QtGui import QFont, QAction, QIcon, QColor
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractTableModel, QDate, QModelIndex, Signal
 import user_store
+from audit import AUDIT_ACTIONS, AUDIT_PAGE_SIZE, audit_log, audit_usernames, query_audit_log
+from crypto_worker import crypto_worker
+from db_executor import LoadingBar, database_executor
 
 
 # â”€â”€ Role badge colours â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
@@ -150,17 +153,38 @@ def _add_eye_toggle(field):
 def _verify_acting_admin(current_username, acting_password):
     """Return True if acting_password matches the stored hash for current_username."""
     try:
-        from auth import get_connection, PasswordManager
-        conn = get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT password_hash FROM users WHERE username = ?", (current_username,))
-        row = cur.fetchone()
-        conn.close()
+        from auth import DatabaseConnection, PasswordManager
+        with DatabaseConnection.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT password_hash FROM users WHERE username = ?", (current_username,))
+            row = cur.fetchone()
         return bool(row and PasswordManager.verify_password(acting_password, row[0]))
     except Exception:
         return False
 
 
+def _confirm_acting_admin(widget, current_username, acting_password, on_confirmed, message,
+                          on_rejected=None, indicator=None):
+    """Check the admin password on the crypto worker, then continue on the GUI thread."""
+    def verified(ok):
+        if ok:
+            on_confirmed()
+            return
+        if on_rejected is not None:
+            on_rejected()
+        QMessageBox.warning(widget, "Incorrect Password", message)
+
+    crypto_worker.submit(
+        _verify_acting_admin,
+        current_username,
+        acting_password,
+        on_result=verified,
+        on_error=lambda err: verified(False),
+        context=widget,
+        indicator=indicator,
+    )
+
+
 # â”€â”€ User Manager â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
 class UserManager:
@@ -238,17 +262,19 @@ class NewUserDialog(QDialog):
         btn_row.addStretch()
         cancel_btn = QPushButton("Cancel")
         cancel_btn.setObjectName("cancelBtn")
-        create_btn = QPushButton("Create Account")
-        create_btn.setObjectName("okBtn")
-        create_btn.setDefault(True)
-        create_btn.clicked.connect(self._create_user)
+        self.create_btn = QPushButton("Create Account")
+        self.create_btn.setObjectName("okBtn")
+        self.create_btn.setDefault(True)
+        self.create_btn.clicked.connect(self._create_user)
         cancel_btn.clicked.connect(self.reject)
         self.confirm_password_input.returnPressed.connect(self._create_user)
         btn_row.addWidget(cancel_btn)
-        btn_row.addWidget(create_btn)
+        btn_row.addWidget(self.create_btn)
         layout.addLayout(btn_row)
 
     def _create_user(self):
+        if not self.create_btn.isEnabled():
+            return
         username = self.username_input.text().strip()
         password = self.password_input.text()
         role = self.role_input.currentText()
@@ -300,7 +326,7 @@ class NewUserDialog(QDialog):
             return
 
         # ── Duplicate check ───────────────────────────────────────────
-        existing_names = {u["username"].lower() for u in user_store.get_all_users()}
+        existing_names = {u["username"].lower() for u in getattr(parent, "loaded_users", [])}
         if username.lower() in existing_names:
             QMessageBox.warning(
                 self, "Username Taken",
@@ -313,26 +339,44 @@ class NewUserDialog(QDialog):
         acting_password = UsersPage.prompt_for_admin_password(self, "create this account")
         if acting_password is None:
             return
-        if not _verify_acting_admin(acting_username, acting_password):
-            QMessageBox.warning(
-                self, "Incorrect Password",
-                "The admin password you entered is incorrect.\n"
-                "Please try again.",
-            )
-            return
 
+        self.create_btn.setEnabled(False)
+        self.create_btn.setText("Verifying...")
+
+        def rejected():
+            self.create_btn.setEnabled(True)
+            self.create_btn.setText("Create Account")
+
+        _confirm_acting_admin(
+            self, acting_username, acting_password,
+            lambda: self._submit_create(username, password, role, acting_username, acting_role, acting_password),
+            "The admin password you entered is incorrect.\nPlease try again.",
+            on_rejected=rejected,
+        )
+
+    def _submit_create(self, username, password, role, acting_username, acting_role, acting_password):
         # ── Create ────────────────────────────────────────────────────
-        success = UserManager.create_user(
+        self.create_btn.setText("Creating...")
+        crypto_worker.submit(
+            UserManager.create_user,
             username, password, role,
             acting_username=acting_username,
             acting_role=acting_role,
             acting_password=acting_password,
+            on_result=lambda success: self._on_user_created(success, username, role),
+            on_error=lambda err: self._on_user_created(False, username, role),
+            context=self,
         )
+
+    def _on_user_created(self, success, username, role):
+        self.create_btn.setEnabled(True)
+        self.create_btn.setText("Create Account")
+        parent = self.parent()
         if success:
             if hasattr(parent, "refresh_users"):
                 parent.refresh_users()
             if hasattr(parent, "log_activity"):
-                parent.log_activity(username, f"Created as {role}")
+                parent.log_activity(username, "user.create", f"Created as {role}")
             if hasattr(parent, "_set_status"):
                 parent._set_status(f"User '{username}' created successfully")
             QMessageBox.information(
@@ -459,6 +503,108 @@ class ResetPasswordDialog(QDialog):
 
 # â”€â”€ Users Page â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
+class AuditLogTableModel(QAbstractTableModel):
+    """Read-only audit_log model, newest first, loaded in keyset-paged batches.
+
+    Filters are pushed into the query so each page is an indexed range scan;
+    the view pulls older pages through ``fetchMore`` as the user scrolls.
+    """
+
+    COLUMNS = (("Time", 1), ("User", 2), ("Action", 3), ("Target", 5), ("Detail", 6))
+
+    load_failed = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filters = {}
+        self._rows = []
+        self._has_more = False
+        self._loading = False
+        self._generation = 0
+        self.loading_indicator = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.COLUMNS):
+            return self.COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        row = self._rows[index.row()]
+        field = self.COLUMNS[index.column()][1]
+        if role == Qt.DisplayRole:
+            if field == 1:
+                return row[1][:19]
+            if field == 3:
+                return AUDIT_ACTIONS.get(row[3], row[3])
+            if field == 5:
+                return f"{row[4]} {row[5]}".strip()
+            return row[field]
+        if role == Qt.ToolTipRole and field == 6:
+            return row[6] or None
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more or self._loading:
+            return
+        self._request_page(before_id=self._rows[-1][0] if self._rows else None)
+
+    def set_filters(self, username=None, action=None, since=None, until=None):
+        self._filters = {"username": username, "action": action, "since": since, "until": until}
+        self.refresh()
+
+    def refresh(self):
+        """Replace loaded rows with the newest page matching the filters once it arrives."""
+        self._generation += 1
+        self._request_page(before_id=None)
+
+    def _request_page(self, before_id):
+        generation = self._generation
+        self._loading = True
+        database_executor.submit(
+            query_audit_log,
+            before_id=before_id,
+            limit=AUDIT_PAGE_SIZE,
+            on_result=lambda rows: self._apply_page(generation, rows, before_id is None),
+            on_error=lambda err: self._page_failed(generation, err),
+            context=self,
+            indicator=self.loading_indicator,
+            **self._filters,
+        )
+
+    def _apply_page(self, generation, rows, reset):
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._has_more = len(rows) == AUDIT_PAGE_SIZE
+        if reset:
+            self.beginResetModel()
+            self._rows = list(rows)
+            self.endResetModel()
+        elif rows:
+            start = len(self._rows)
+            self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def _page_failed(self, generation, err):
+        if generation != self._generation:
+            return
+        self._loading = False
+        self._has_more = False
+        self.load_failed.emit(str(err))
+
+
 class UsersPage(QWidget):
     """User Management page."""
 
@@ -466,6 +612,7 @@ class UsersPage(QWidget):
         super().__init__()
         self.setObjectName("usersPage")
         self.setStyleSheet(_PAGE_STYLE)
+        self.loaded_users = []
 
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -494,6 +641,9 @@ class UsersPage(QWidget):
         header_row.addWidget(add_btn)
         main_layout.addLayout(header_row)
 
+        self.loading_bar = LoadingBar()
+        main_layout.addWidget(self.loading_bar)
+
         # â”€â”€ Grid â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
         grid = QGridLayout()
         grid.setSpacing(16)
@@ -536,20 +686,55 @@ class UsersPage(QWidget):
         table_vbox.addLayout(action_row)
         grid.addWidget(table_group, 0, 0)
 
-        # Activity log card
-        log_group = QGroupBox("Activity Log")
+        # Audit log card (persistent; filtered and paged in the database)
+        log_group = QGroupBox("Audit Log")
         log_vbox = QVBoxLayout(log_group)
-        self.activity_log = QTableWidget(0, 3)
-        self.activity_log.setHorizontalHeaderLabels(["User", "Action", "Time"])
+        log_vbox.setSpacing(8)
+
+        filter_row = QGridLayout()
+        filter_row.setSpacing(6)
+        self.audit_user_filter = QComboBox()
+        self.audit_user_filter.addItem("All users", None)
+        self.audit_action_filter = QComboBox()
+        self.audit_action_filter.addItem("All actions", None)
+        for action, label in AUDIT_ACTIONS.items():
+            self.audit_action_filter.addItem(label, action)
+        today = QDate.currentDate()
+        self.audit_from_date = QDateEdit(today.addDays(-30))
+        self.audit_from_date.setCalendarPopup(True)
+        self.audit_from_date.setDisplayFormat("yyyy-MM-dd")
+        self.audit_to_date = QDateEdit(today)
+        self.audit_to_date.setCalendarPopup(True)
+        self.audit_to_date.setDisplayFormat("yyyy-MM-dd")
+        filter_row.addWidget(self.audit_user_filter, 0, 0)
+        filter_row.addWidget(self.audit_action_filter, 0, 1)
+        filter_row.addWidget(self.audit_from_date, 1, 0)
+        filter_row.addWidget(self.audit_to_date, 1, 1)
+        log_vbox.addLayout(filter_row)
+
+        self.audit_model = AuditLogTableModel(self)
+        self.audit_model.loading_indicator = self.loading_bar
+        self.audit_model.load_failed.connect(
+            lambda err: self._set_status(f"Failed to load audit log: {err}", ok=False)
+        )
+        self.activity_log = QTableView()
+        self.activity_log.setModel(self.audit_model)
         self.activity_log.setSelectionMode(QAbstractItemView.NoSelection)
-        self.activity_log.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.activity_log.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.activity_log.verticalHeader().setVisible(False)
         self.activity_log.setShowGrid(False)
-        self.activity_log.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.activity_log.setWordWrap(False)
+        self.activity_log.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.activity_log.horizontalHeader().setStretchLastSection(True)
         self.activity_log.setMinimumHeight(240)
         log_vbox.addWidget(self.activity_log)
         grid.addWidget(log_group, 0, 1)
 
+        self.audit_user_filter.currentIndexChanged.connect(self.refresh_audit_log)
+        self.audit_action_filter.currentIndexChanged.connect(self.refresh_audit_log)
+        self.audit_from_date.dateChanged.connect(self.refresh_audit_log)
+        self.audit_to_date.dateChanged.connect(self.refresh_audit_log)
+
         main_layout.addLayout(grid)
 
         # Status bar
@@ -559,6 +744,7 @@ class UsersPage(QWidget):
         main_layout.addWidget(self.status_label)
 
         self.refresh_users()
+        self.refresh_audit_log()
 
     # â”€â”€ Helpers â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
@@ -594,19 +780,42 @@ class UsersPage(QWidget):
             return None
         return pw
 
-    def _check_admin_password(self, acting_password):
-        """Verify the acting admin's password and show an error if wrong. Returns True on success."""
+    def _check_admin_password(self, acting_password, on_confirmed):
+        """Verify the acting admin's password in the background; run on_confirmed if it matches."""
         current_username, _ = self._actor_context()
-        if not _verify_acting_admin(current_username, acting_password):
-            QMessageBox.warning(self, "Incorrect Password", "Your admin password is incorrect.")
-            return False
-        return True
+        _confirm_acting_admin(
+            self, current_username, acting_password, on_confirmed,
+            "Your admin password is incorrect.",
+            indicator=self.loading_bar,
+        )
 
     # â”€â”€ User Table â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€â”€
 
     def refresh_users(self):
+        database_executor.submit(
+            user_store.get_all_users,
+            on_result=self._populate_users,
+            on_error=lambda err: self._set_status(f"Failed to load users: {err}", ok=False),
+            key="users",
+            context=self,
+            indicator=self.loading_bar,
+        )
+
+    def _submit_user_change(self, fn, *args, on_success, on_failure, executor=database_executor, **kwargs):
+        """Run a user_store change in the background and dispatch on its result."""
+        executor.submit(
+            fn,
+            *args,
+            on_result=lambda success: on_success() if success else on_failure(),
+            on_error=lambda err: on_failure(),
+            context=self,
+            indicator=self.loading_bar,
+            **kwargs,
+        )
+
+    def _populate_users(self, users):
+        self.loaded_users = users
         self.users_table.setRowCount(0)
-        users = user_store.get_all_users()
         n = len(users)
         self.count_label.setText(f"{n} user{'s' if n != 1 else ''}")
         for user in users:
@@ -671,19 +880,22 @@ class UsersPage(QWidget):
         acting_password = self.prompt_for_admin_password(self, f"delete user '{username}'")
         if acting_password is None:
             return
-        if not self._check_admin_password(acting_password):
-            return
-
-        success = user_store.delete_user(username, acting_username=current_username, acting_role=current_role)
-        if success:
+        def deleted():
             self._set_status(f"User '{username}' deleted")
-            self.log_activity(username, "Deleted")
+            self.log_activity(username, "user.delete", "Deleted")
             self.refresh_users()
             QMessageBox.information(self, "User Deleted", f"User '{username}' was successfully deleted.")
-        else:
+
+        def failed():
             self._set_status(f"Failed to delete '{username}'", ok=False)
             QMessageBox.warning(self, "Deletion Failed", f"Could not delete user '{username}'.")
 
+        self._check_admin_password(acting_password, lambda: self._submit_user_change(
+            user_store.delete_user, username,
+            acting_username=current_username, acting_role=current_role,
+            on_success=deleted, on_failure=failed,
+        ))
+
     def change_selected_role(self):
         row = self.users_table.currentRow()
         if row == -1:
@@ -710,25 +922,27 @@ class UsersPage(QWidget):
         )
         if acting_password is None:
             return
-        if not self._check_admin_password(acting_password):
-            return
-
         acting_username, acting_role = self._actor_context()
-        success = user_store.update_user_role(
-            username, new_role, acting_username=acting_username, acting_role=acting_role
-        )
-        if success:
+
+        def updated():
             self._set_status(f"Role updated: {username} \u2192 {new_role}")
-            self.log_activity(username, f"Role changed to {new_role}")
+            self.log_activity(username, "user.role", f"Role changed to {new_role}")
             self.refresh_users()
             QMessageBox.information(
                 self, "Role Updated",
                 f"'{username}' has been changed to <b>{new_role}</b>.",
             )
-        else:
+
+        def failed():
             self._set_status(f"Failed to update role for '{username}'", ok=False)
             QMessageBox.warning(self, "Update Failed", f"Could not update role for '{username}'.")
 
+        self._check_admin_password(acting_password, lambda: self._submit_user_change(
+            user_store.update_user_role, username, new_role,
+            acting_username=acting_username, acting_role=acting_role,
+            on_success=updated, on_failure=failed,
+        ))
+
     def reset_selected_password(self):
         row = self.users_table.currentRow()
         if row == -1:
@@ -746,30 +960,63 @@ class UsersPage(QWidget):
         acting_password = self.prompt_for_admin_password(self, f"reset '{username}' password")
         if acting_password is None:
             return
-        if not self._check_admin_password(acting_password):
-            return
-
         acting_username, acting_role = self._actor_context()
-        success = user_store.reset_password(
-            username, dlg.new_password(),
-            acting_username=acting_username, acting_role=acting_role,
-        )
-        if success:
+        new_password = dlg.new_password()
+
+        def reset():
             self._set_status(f"Password reset for '{username}'")
-            self.log_activity(username, "Password reset")
+            self.log_activity(username, "user.password_reset", "Password reset")
             QMessageBox.information(
                 self, "Password Reset",
                 f"Password for '{username}' was successfully reset.",
             )
-        else:
+
+        def failed():
             self._set_status(f"Failed to reset password for '{username}'", ok=False)
             QMessageBox.warning(self, "Reset Failed", f"Could not reset password for '{username}'.")
 
-    def log_activity(self, user, action):
-        from datetime import datetime
-        row = self.activity_log.rowCount()
-        self.activity_log.insertRow(row)
-        self.activity_log.setItem(row, 0, QTableWidgetItem(user))
-        self.activity_log.setItem(row, 1, QTableWidgetItem(action))
-        self.activity_log.setItem(row, 2, QTableWidgetItem(datetime.now().strftime("%H:%M:%S")))
+        self._check_admin_password(acting_password, lambda: self._submit_user_change(
+            user_store.reset_password, username, new_password,
+            acting_username=acting_username, acting_role=acting_role,
+            on_success=reset, on_failure=failed,
+            executor=crypto_worker,
+        ))
+
+    # ── Audit Log ─────────────────────────────────────────────────────
+
+    def log_activity(self, username, action, detail=""):
+        """Append a user-management action to the audit log and show it."""
+        acting_username, _ = self._actor_context()
+        audit_log.record(action, "user", username, detail, username=acting_username or "")
+        self.refresh_audit_log()
+
+    def refresh_audit_log(self, _value=None):
+        since = self.audit_from_date.date()
+        until = self.audit_to_date.date().addDays(1)
+        self.audit_model.set_filters(
+            username=self.audit_user_filter.currentData(),
+            action=self.audit_action_filter.currentData(),
+            since=since.toString("yyyy-MM-dd"),
+            until=until.toString("yyyy-MM-dd"),
+        )
+        database_executor.submit(
+            audit_usernames,
+            on_result=self._populate_audit_users,
+            key="audit-users",
+            context=self,
+        )
+
+    def _populate_audit_users(self, usernames):
+        selected = self.audit_user_filter.currentData()
+        known = [self.audit_user_filter.itemData(i) for i in range(1, self.audit_user_filter.count())]
+        if known == usernames:
+            return
+        self.audit_user_filter.blockSignals(True)
+        self.audit_user_filter.clear()
+        self.audit_user_filter.addItem("All users", None)
+        for username in usernames:
+            self.audit_user_filter.addItem(username, username)
+        index = self.audit_user_filter.findData(selected)
+        self.audit_user_filter.setCurrentIndex(max(index, 0))
+        self.audit_user_filter.blockSignals(False)
 